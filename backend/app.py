@@ -2,32 +2,69 @@
 Flask API for Smart Farmer Recommender System
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import hmac
 import pandas as pd
 import numpy as np
-import joblib
+import time
+import threading
 import traceback
+from functools import partial, wraps
 
 from config import (
-    MODEL_DIR, CROP_MODEL_FILE, NUTRIENT_MODEL_FILE, WATER_MODEL_FILE,
+    CROP_MODEL_FILE, NUTRIENT_MODEL_FILE, WATER_MODEL_FILE,
     FERTILIZER_MODEL_FILE, ENCODER_FILE, SCALER_FILE, DEBUG, PORT, HOST,
     AGRICULTURAL_ZONES, ZONE_CHARACTERISTICS, MARKET_RATES, INPUT_COSTS,
-    EXPECTED_YIELDS, DATASET_PATH
+    EXPECTED_YIELDS, DATASET_PATH, PREDICTION_CUBE_DIR, USE_PREDICTION_CUBE,
+    CROP_FEATURES, NUTRIENT_FEATURES, WATER_FEATURES, FERTILIZER_FEATURES,
+    NUTRIENT_FEATURE_DEFAULTS, MAX_BATCH_RECORDS, INSIGHTS_CACHE_MAX_AGE,
+    USE_FOREST_ENGINE, FLAT_FOREST_DIRS, USE_MLP_ENGINE, MLP_ENGINE_DIR,
+    MODEL_BUNDLE_DIR, MODEL_LOAD_THREADS, MODEL_PREFETCH, MODEL_WATCH_INTERVAL, ADMIN_TOKEN,
+    WARM_UP_ON_START, RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_SHM_NAME, RESPONSE_CACHE_SLOT_BYTES, RESPONSE_CACHE_SQLITE_PATH,
+    SINGLE_FLIGHT, SINGLE_FLIGHT_TIMEOUT, SERVER_TIMING, METRICS_ENABLED, METRICS_DIR, METRICS_FLUSH_INTERVAL,
+    PROFILE_SAMPLE_RATE, PROFILE_BUFFER_SIZE, PROFILE_TOP_N,
+    REQUEST_LOG_PATH, REQUEST_LOG_MAX_BYTES, REQUEST_LOG_BACKUPS, REQUEST_LOG_MAX_PAYLOAD_BYTES
 )
 from validation import (
-    validate_prediction, get_region, filter_invalid_crops,
-    get_alternative_crops, validate_nutrients, get_region_characteristics
+    validate_prediction, get_region, get_alternative_crops, validate_nutrients,
+    get_region_characteristics, crop_class_bits, valid_class_mask, valid_class_masks
 )
 from utils.crop_prediction_calibrator import (
-    calibrate_crop_predictions, calibrate_comparison_results
+    calibrate_crop_predictions, calibrate_comparison_arrays
 )
 from utils.crop_suitability_validator import (
-    validate_crop_suitability, get_zone_from_district
+    validate_crop_suitability_batch, get_zone_from_district
 )
+from utils.prediction_cube import CUBE_SECTIONS, PredictionCube, load_or_build_cube_section, model_fingerprint
+from utils.feature_encoder import FeatureEncoder
+from utils.dataset_insights import DatasetInsights
+from utils.forest_engine import load_or_flatten_forest
+from utils.mlp_engine import load_or_export_mlp
+from utils.model_bundle import ModelBundle, load_pickle, MANIFEST_FILE
+from utils.model_context import ModelContext, ModelReloader, LazyComponents
+from utils.warm_up import WarmUp, WarmUpRequest
+from utils.response_cache import create_response_cache, response_cache_key
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+from utils.timing import span, start_timing, stop_timing, current_timings, TimingStats
+from utils.metrics import MetricsRegistry, BATCH_BUCKETS
+from utils.profiling import RequestProfiler, PROFILE_HEADER
+from utils.request_log import RequestLog
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify() with response serialization recorded as a 'jsonify' span"""
+    
+    def response(self, *args, **kwargs):
+        with span('jsonify'):
+            return super().response(*args, **kwargs)
+
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 
 # Production-ready CORS - Allow multiple origins
 cors_origins = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,https://smart-farmer-frontend.onrender.com').split(',')
@@ -39,43 +76,261 @@ CORS(app, resources={
     }
 })
 
-# Global variables for models and processors
-models = {}
-encoders = {}
-scalers = {}
-dataset = None
+# Current serving state (models, encoders, insights, cube). Handlers read this
+# reference once per request; reloads replace it with a new ModelContext.
+model_context = None
+model_reloader = None
+
+# Serialized responses of the POST inference endpoints (None = disabled)
+response_cache = create_response_cache(
+    RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_SHM_NAME, RESPONSE_CACHE_SLOT_BYTES, RESPONSE_CACHE_SQLITE_PATH
+) if RESPONSE_CACHE_SIZE > 0 else None
+
+# Coalesces identical concurrent inference requests (None = disabled)
+single_flight = SingleFlight(SINGLE_FLIGHT_TIMEOUT) if SINGLE_FLIGHT else None
+
+# Per-route stage timings of served requests (None = disabled)
+timing_stats = TimingStats() if SERVER_TIMING else None
+
+# Prometheus metrics (GET /metrics), merged across workers through METRICS_DIR
+metrics = MetricsRegistry(METRICS_DIR, METRICS_FLUSH_INTERVAL, enabled=METRICS_ENABLED)
+HTTP_REQUESTS = metrics.counter(
+    'smart_farmer_http_requests_total', 'HTTP requests by route, method and status code',
+    ['route', 'method', 'status']
+)
+HTTP_LATENCY = metrics.histogram(
+    'smart_farmer_http_request_duration_seconds', 'Request latency by route', ['route']
+)
+STAGE_LATENCY = metrics.histogram(
+    'smart_farmer_stage_duration_seconds', 'Time per request spent in each stage (see Server-Timing)',
+    ['route', 'stage']
+)
+INFERENCE_BATCH = metrics.histogram(
+    'smart_farmer_inference_batch_size', 'Rows per model evaluation or prediction cube lookup',
+    ['model'], BATCH_BUCKETS
+)
+CACHE_LOOKUPS = metrics.counter(
+    'smart_farmer_response_cache_lookups_total', 'Cached inference requests by route and result',
+    ['route', 'result']
+)
+COMPONENT_LOAD = metrics.gauge(
+    'smart_farmer_component_load_seconds', 'Load time of each model / dataset component',
+    ['component']
+)
+
+# cProfile captures of sampled / requested requests (GET /admin/profiles)
+profiler = RequestProfiler(PROFILE_SAMPLE_RATE, PROFILE_BUFFER_SIZE, PROFILE_TOP_N)
+
+# JSONL log of served requests for replay_traffic.py (None = disabled)
+request_log = RequestLog(
+    REQUEST_LOG_PATH, REQUEST_LOG_MAX_BYTES, REQUEST_LOG_BACKUPS, REQUEST_LOG_MAX_PAYLOAD_BYTES
+) if REQUEST_LOG_PATH else None
+
+
+def _load_model(bundle, name, model_file):
+    """Load one model file of the bundle (exported NumPy engines when enabled)"""
+    model_path = bundle.path(model_file)
+    if name == 'nutrient':
+        # Inputs are served unscaled (the calibrator is tuned to that), so no
+        # input scaler is folded into the first layer
+        if USE_MLP_ENGINE:
+            return load_or_export_mlp(model_path, bundle.path(MLP_ENGINE_DIR))
+    elif USE_FOREST_ENGINE:
+        return load_or_flatten_forest(model_path, bundle.path(FLAT_FOREST_DIRS[name]))
+    return load_pickle(model_path)
+
+
+def _load_dataset():
+    """Load dataset for insights (CSV instead of Excel)"""
+    if DATASET_PATH.endswith('.csv'):
+        return pd.read_csv(DATASET_PATH)
+    return pd.read_excel(DATASET_PATH)
+
+
+# Prediction cube section -> component name (one lazily built section per model)
+CUBE_COMPONENTS = {section: f'cube_{section}' for section in CUBE_SECTIONS}
+CUBE_MODEL_FILES = {'crop': CROP_MODEL_FILE, 'nutrient': NUTRIENT_MODEL_FILE, 'water': WATER_MODEL_FILE}
+
+
+def _load_cube_section(bundle, models, feature_encoder, section):
+    """
+    Precompute (or load cached) one model's outputs for all categorical
+    inputs. If this fails, the handlers call the model directly.
+    """
+    name = CUBE_SECTIONS[section]
+    # The model is only loaded when the cache is missing or stale
+    return load_or_build_cube_section(
+        os.path.join(bundle.path(PREDICTION_CUBE_DIR), section),
+        section,
+        lambda: models[name],
+        feature_encoder,
+        get_zone,
+        model_fingerprint([bundle.path(CUBE_MODEL_FILES[name]), bundle.path(ENCODER_FILE)])
+    )
+
+
+def _load_encoders(bundle):
+    encoders = load_pickle(bundle.path(ENCODER_FILE))
+    for column in bundle.check_encoders(encoders):
+        print(f"[WARNING] {ENCODER_FILE}: '{column}' classes differ from the bundle manifest")
+    return encoders
+
+
+def _load_feature_encoder(bundle, components):
+    """Compile the feature encoder (from the manifest classes when available)"""
+    if bundle.manifest and bundle.manifest.get('encoders'):
+        # No need to import sklearn to unpickle encoders.pkl; its checksum is
+        # verified against the manifest in the background
+        return FeatureEncoder.from_classes(bundle.manifest['encoders'])
+    return FeatureEncoder(components['encoders'])
+
+
+def bundle_fingerprint():
+    """Cheap fingerprint of the bundle files (watcher change detection)"""
+    files = [MANIFEST_FILE, CROP_MODEL_FILE, NUTRIENT_MODEL_FILE, WATER_MODEL_FILE,
+             FERTILIZER_MODEL_FILE, ENCODER_FILE, SCALER_FILE]
+    return model_fingerprint([os.path.join(MODEL_BUNDLE_DIR, f) for f in files] + [DATASET_PATH])
+
+
+def build_model_context():
+    """
+    Create a ModelContext for the bundle. Only the manifest is read here;
+    every component is loaded on first use (or by the prefetch).
+    """
+    bundle = ModelBundle(MODEL_BUNDLE_DIR)
+    print(f"Model bundle {bundle.version} (components load on first use)")
+    
+    serving_features = {
+        'crop': CROP_FEATURES, 'nutrient': NUTRIENT_FEATURES,
+        'water': WATER_FEATURES, 'fertilizer': FERTILIZER_FEATURES
+    }
+    for name in bundle.check_features(serving_features):
+        print(f"[WARNING] {name} model: serving feature order differs from the training order in the manifest")
+    
+    models = LazyComponents({
+        'crop': partial(_load_model, bundle, 'crop', CROP_MODEL_FILE),
+        'nutrient': partial(_load_model, bundle, 'nutrient', NUTRIENT_MODEL_FILE),
+        'water': partial(_load_model, bundle, 'water', WATER_MODEL_FILE),
+        'fertilizer': partial(_load_model, bundle, 'fertilizer', FERTILIZER_MODEL_FILE)
+    })
+    
+    # One component per prediction cube section: each only loads its own model
+    cube_sections = {
+        component: (
+            lambda section=section: _load_cube_section(bundle, models, components['feature_encoder'], section)
+        )
+        for section, component in CUBE_COMPONENTS.items()
+    } if USE_PREDICTION_CUBE else {}
+    
+    # Derived components look their inputs up in the same mapping
+    components = LazyComponents({
+        'encoders': partial(_load_encoders, bundle),
+        'scalers': partial(load_pickle, bundle.path(SCALER_FILE)),
+        'feature_encoder': lambda: _load_feature_encoder(bundle, components),
+        'crop_rule_bits': lambda: crop_class_bits(components['feature_encoder'].labels('Crop_Name')),
+        'dataset': _load_dataset,
+        # Materialize the insight endpoints
+        'dataset_insights': lambda: DatasetInsights(
+            components['dataset'], get_zone, lambda payload: app.json.response(payload).get_data()
+        ),
+        **cube_sections,
+        'prediction_cube': (
+            lambda: PredictionCube(components, CUBE_COMPONENTS)
+        ) if USE_PREDICTION_CUBE else (lambda: None)
+    })
+    
+    return ModelContext(
+        version=bundle.version,
+        bundle=bundle,
+        fingerprint=bundle_fingerprint(),
+        models=models,
+        components=components,
+        loaded_at=time.time()
+    )
+
+
+# What the handlers use; the raw encoders / scalers pickles (sklearn import)
+# are only loaded when something asks for them
+SERVING_COMPONENTS = [
+    'crop', 'nutrient', 'water', 'fertilizer',
+    'feature_encoder', 'crop_rule_bits', 'dataset_insights', 'prediction_cube',
+    *(CUBE_COMPONENTS.values() if USE_PREDICTION_CUBE else [])
+]
+
+
+def prefetch_components():
+    """Component names selected by MODEL_PREFETCH"""
+    if MODEL_PREFETCH == 'all':
+        return SERVING_COMPONENTS
+    if MODEL_PREFETCH in ('', 'none'):
+        return []
+    names = [name.strip() for name in MODEL_PREFETCH.split(',') if name.strip()]
+    if 'prediction_cube' in names and USE_PREDICTION_CUBE:
+        # The cube itself is only a view; prefetch builds all of its sections
+        names += [name for name in CUBE_COMPONENTS.values() if name not in names]
+    return names
+
+
+def warm_up_model_context(ctx):
+    """
+    Before a reload is published: load everything the serving context has
+    loaded so far and run each of those models once, so traffic does not
+    hit cold components after the swap
+    """
+    current = model_context
+    ctx.load(current.ready() if current is not None else None, MODEL_LOAD_THREADS)
+    for name in ctx.ready():
+        if name not in ctx.models:
+            continue
+        model = ctx.models[name]
+        X = np.zeros((1, model.n_features_in_))
+        if getattr(model, 'classes_', None) is not None:
+            model.predict_proba(X)
+        model.predict(X)
+
+
+def start_context_threads(ctx):
+    """Verify the checksums and prefetch the components of a published context"""
+    # Checksums are verified off the request path
+    ctx.bundle.verify_in_background(DATASET_PATH)
+    
+    names = prefetch_components()
+    if names:
+        ctx.prefetch(names, MODEL_LOAD_THREADS)
+
+
+def swap_model_context(ctx):
+    """
+    Publish a new context (single reference assignment; in-flight requests
+    keep theirs), then start its background threads
+    """
+    global model_context
+    model_context = ctx
+    start_context_threads(ctx)
 
 
 def load_models():
-    """Load all trained models"""
-    global models, encoders, scalers, dataset
+    """
+    Set up lazy loading of the trained models. No threads are started here
+    (see start_worker_threads)
+    """
+    global model_context, model_reloader
     
     try:
-        print("Loading models...")
-        
-        # Load models
-        models['crop'] = joblib.load(os.path.join(MODEL_DIR, CROP_MODEL_FILE))
-        models['nutrient'] = joblib.load(os.path.join(MODEL_DIR, NUTRIENT_MODEL_FILE))
-        models['water'] = joblib.load(os.path.join(MODEL_DIR, WATER_MODEL_FILE))
-        models['fertilizer'] = joblib.load(os.path.join(MODEL_DIR, FERTILIZER_MODEL_FILE))
-        
-        # Load encoders and scalers
-        encoders = joblib.load(os.path.join(MODEL_DIR, ENCODER_FILE))
-        scalers = joblib.load(os.path.join(MODEL_DIR, SCALER_FILE))
-        
-        # Load dataset for insights (CSV instead of Excel)
-        if DATASET_PATH.endswith('.csv'):
-            dataset = pd.read_csv(DATASET_PATH)
-        else:
-            dataset = pd.read_excel(DATASET_PATH)
-        
-        print("[SUCCESS] All models loaded successfully!")
+        model_context = build_model_context()
         return True
         
     except Exception as e:
         print(f"Error loading models: {str(e)}")
         print(traceback.format_exc())
         return False
+        
+    finally:
+        if model_reloader is None:
+            model_reloader = ModelReloader(
+                build_model_context, swap_model_context, bundle_fingerprint, warm_up_model_context
+            )
 
 
 def get_zone(district):
@@ -86,37 +341,716 @@ def get_zone(district):
     return 'Other'
 
 
+# Error messages for categorical inputs that were not seen during training
+UNKNOWN_INPUT_MESSAGES = {
+    'District': 'District "{}" not found in training data. Please select from available districts.',
+    'Soil_Type': 'Soil Type "{}" not found in training data. Please select from available soil types.',
+    'Weather': 'Weather condition "{}" not found in training data. Please select from available weather conditions.',
+    'Crop_Name': 'Crop "{}" not found in training data. Please select from available crops.'
+}
+
+
+def find_unknown_input(ctx, values):
+    """
+    Check categorical inputs against the training labels.
+    values: list of (column, value) pairs
+    Returns: error message for the first unknown value, or None
+    """
+    for column, value in values:
+        if column not in ctx.feature_encoder:
+            continue
+        # Lists/dicts from the JSON body are unknown labels (and unhashable)
+        if not isinstance(value, str) or not ctx.feature_encoder.is_known(column, value):
+            return UNKNOWN_INPUT_MESSAGES[column].format(value)
+    return None
+
+
+def build_crop_recommendations(ctx, probabilities, district, soil_type, weather, zone, valid_classes=None):
+    """
+    Turn crop model probabilities into the top 3 validated recommendations
+    valid_classes: optional precomputed valid_class_mask() (batch requests)
+    """
+    # Get all predictions sorted by probability
+    top_indices = np.argsort(probabilities)[::-1][:15]  # Check top 15
+    
+    # Apply validation filter (bitmask over all classes), keep the best 3
+    if valid_classes is None:
+        valid_classes = valid_class_mask(ctx.crop_rule_bits, district, soil_type, weather)
+    top_indices = top_indices[valid_classes[top_indices]][:3]
+    
+    top_3_crops = []
+    for crop_name, probability in zip(
+        ctx.feature_encoder.decode_many('Crop_Name', top_indices),
+        probabilities[top_indices].tolist()
+    ):
+        confidence = probability * 100
+        # Validation details are only built for the crops we return
+        validation_info = validate_prediction(district, soil_type, crop_name, weather)
+        
+        top_3_crops.append({
+            'crop_name': crop_name,
+            'confidence': round(confidence, 2),
+            'avg_yield': EXPECTED_YIELDS.get(crop_name, 'N/A'),
+            'market_rate': MARKET_RATES.get(crop_name, 'N/A'),
+            'suitable_for_zone': zone,
+            'validation': {
+                'is_valid': validation_info['is_valid'],
+                'region': validation_info['region'],
+                'reasoning': validation_info['reasoning']
+            }
+        })
+    
+    return top_3_crops
+
+
+
+# ============================================================================
+# INFERENCE HELPERS (shared by the single endpoints and /advisory)
+# ============================================================================
+
+def predict_crop_probabilities(ctx, district, soil_type, weather, zone):
+    """Crop class probabilities for one input (prediction cube or crop model)"""
+    INFERENCE_BATCH.observe(1, 'crop')
+    if ctx.prediction_cube is not None and ctx.prediction_cube.crop_proba is not None:
+        # Array lookup into the precomputed prediction cube
+        with span('cube'):
+            probabilities = ctx.prediction_cube.crop_probabilities(
+                ctx.feature_encoder.encode('District', district),
+                ctx.feature_encoder.encode('Soil_Type', soil_type),
+                ctx.feature_encoder.encode('Weather', weather)
+            )
+    else:
+        # Encode features
+        with span('encode'):
+            input_array = ctx.feature_encoder.encode_records([{
+                'District': district,
+                'Soil_Type': soil_type,
+                'Weather': weather,
+                'Zone': zone
+            }], CROP_FEATURES)
+        
+        # Get predictions with probabilities
+        with span('crop_model'):
+            probabilities = ctx.models['crop'].predict_proba(input_array)[0]
+    
+    return probabilities
+
+
+def predict_nutrient_requirements(ctx, district, soil_type, crop_name, weather, zone):
+    """N, P2O5, K2O, Zn, S requirements for one crop (prediction cube or nutrient model)"""
+    INFERENCE_BATCH.observe(1, 'nutrient')
+    if ctx.prediction_cube is not None and ctx.prediction_cube.nutrients is not None:
+        # Array lookup into the precomputed prediction cube
+        with span('cube'):
+            prediction = ctx.prediction_cube.nutrient_prediction(
+                ctx.feature_encoder.encode('District', district),
+                ctx.feature_encoder.encode('Soil_Type', soil_type),
+                ctx.feature_encoder.encode('Weather', weather),
+                ctx.feature_encoder.encode('Crop_Name', crop_name)
+            )
+    else:
+        # Encode input with computed features
+        # Use default values for NPK_Ratio and Total_Nutrients since we're predicting them
+        with span('encode'):
+            input_array = ctx.feature_encoder.encode_records([{
+                'District': district,
+                'Soil_Type': soil_type,
+                'Crop_Name': crop_name,
+                'Weather': weather,
+                'Zone': zone,
+                **NUTRIENT_FEATURE_DEFAULTS
+            }], NUTRIENT_FEATURES)
+        
+        # Predict
+        with span('nutrient_model'):
+            prediction = ctx.models['nutrient'].predict(input_array)[0]
+    
+    return prediction
+
+
+def predict_crop_nutrients(ctx, district_id, soil_id, weather_id, zone, crop_ids):
+    """Nutrient requirements of many crops for one farm (one encode + one predict)"""
+    n_crops = len(crop_ids)
+    INFERENCE_BATCH.observe(n_crops, 'nutrient')
+    if ctx.prediction_cube is not None and ctx.prediction_cube.nutrients is not None:
+        with span('cube'):
+            nutrients = ctx.prediction_cube.nutrient_prediction(district_id, soil_id, weather_id, crop_ids)
+    else:
+        with span('encode'):
+            columns = {
+                'District': np.full(n_crops, district_id),
+                'Soil_Type': np.full(n_crops, soil_id),
+                'Crop_Name': crop_ids,
+                'Weather': np.full(n_crops, weather_id),
+                'Zone': np.full(n_crops, ctx.feature_encoder.encode('Zone', zone))
+            }
+            for col, default in NUTRIENT_FEATURE_DEFAULTS.items():
+                columns[col] = np.full(n_crops, default)
+            
+            input_array = np.column_stack([columns[col] for col in NUTRIENT_FEATURES]).astype(float)
+        
+        with span('nutrient_model'):
+            nutrients = ctx.models['nutrient'].predict(input_array)
+    
+    return nutrients
+
+
+def predict_water_quality(ctx, district, weather, soil_type, zone):
+    """pH, turbidity and water temperature for one input (prediction cube or water model)"""
+    INFERENCE_BATCH.observe(1, 'water')
+    if ctx.prediction_cube is not None and ctx.prediction_cube.water is not None:
+        # Array lookup into the precomputed prediction cube
+        with span('cube'):
+            prediction = ctx.prediction_cube.water_prediction(
+                ctx.feature_encoder.encode('District', district),
+                ctx.feature_encoder.encode('Soil_Type', soil_type),
+                ctx.feature_encoder.encode('Weather', weather)
+            )
+    else:
+        # Encode features
+        with span('encode'):
+            input_array = ctx.feature_encoder.encode_records([{
+                'District': district,
+                'Weather': weather,
+                'Soil_Type': soil_type,
+                'Zone': zone
+            }], WATER_FEATURES)
+        
+        # Predict
+        with span('water_model'):
+            prediction = ctx.models['water'].predict(input_array)[0]
+    
+    return prediction
+
+
+def predict_fertilizers(ctx, records):
+    """Fertilizer class probabilities and predicted classes for many records"""
+    INFERENCE_BATCH.observe(len(records), 'fertilizer')
+    with span('encode'):
+        input_array = ctx.feature_encoder.encode_records(records, FERTILIZER_FEATURES)
+    with span('fertilizer_model'):
+        return (
+            ctx.models['fertilizer'].predict_proba(input_array),
+            ctx.models['fertilizer'].predict(input_array)
+        )
+
+
+def crop_recommendation_data(ctx, probabilities, district, soil_type, weather, zone):
+    """Top 3 validated crops plus region / zone context (/recommend-crop data)"""
+    # Build top 3 valid crops
+    top_3_crops = build_crop_recommendations(ctx, probabilities, district, soil_type, weather, zone)
+    
+    # Get region characteristics
+    region = get_region(district)
+    region_info = get_region_characteristics(region)
+    
+    # Get alternative crops
+    alternatives = get_alternative_crops(district, soil_type, weather)
+    
+    # Zone characteristics
+    zone_info = ZONE_CHARACTERISTICS.get(zone, {})
+    
+    # Check if no crops were found and provide helpful info
+    no_data_message = None
+    suitable_combinations = []
+    
+    if len(top_3_crops) == 0:
+        # Check what combinations exist for this district (precomputed index)
+        district_combinations = ctx.dataset_insights.combinations(district)
+        
+        if district_combinations is not None:
+            available_soils = district_combinations.available_soils
+            available_weather = district_combinations.available_weather
+            
+            # Suitable combinations with their top 5 crops
+            suitable_combinations = district_combinations.suggestions
+            
+            no_data_message = {
+                'title': 'No Crops Found for This Combination',
+                'reason': f'The combination of {soil_type} soil with {weather} weather is not typical for {district} district.',
+                'district_info': f'{district} is located in the {zone} zone.',
+                'available_soils': available_soils,
+                'available_weather': available_weather,
+                'suggestion': f'In {district}, the common soil types are {", ".join(available_soils)}. Please try selecting one of these soil types for better recommendations.'
+            }
+        else:
+            no_data_message = {
+                'title': 'No Data Available',
+                'reason': f'No agricultural data available for {district} district in our database.',
+                'suggestion': 'Please select a different district or contact support for assistance.'
+            }
+    
+    return {
+        'recommendations': top_3_crops,
+        'zone': zone,
+        'region': region,
+        'region_info': region_info,
+        'zone_info': zone_info,
+        'alternative_crops': alternatives[:5] if len(top_3_crops) < 3 else [],
+        'no_data_message': no_data_message,
+        'suitable_combinations': suitable_combinations[:6] if suitable_combinations else [],
+        'input': {
+            'district': district,
+            'soil_type': soil_type,
+            'weather': weather
+        }
+    }
+
+
+def nutrient_prediction_data(prediction, district, soil_type, crop_name, weather, zone):
+    """Nutrient needs, NPK ratio, alerts and validation of one crop (/predict-nutrients data)"""
+    nutrients = {
+        'N_kg_ha': round(float(prediction[0]), 2),
+        'P2O5_kg_ha': round(float(prediction[1]), 2),
+        'K2O_kg_ha': round(float(prediction[2]), 2),
+        'Zn_kg_ha': round(float(prediction[3]), 2),
+        'S_kg_ha': round(float(prediction[4]), 2)
+    }
+    
+    # Calculate NPK ratio
+    total = nutrients['N_kg_ha'] + nutrients['P2O5_kg_ha'] + nutrients['K2O_kg_ha']
+    npk_ratio = {
+        'N': round((nutrients['N_kg_ha'] / total) * 100, 1) if total > 0 else 0,
+        'P': round((nutrients['P2O5_kg_ha'] / total) * 100, 1) if total > 0 else 0,
+        'K': round((nutrients['K2O_kg_ha'] / total) * 100, 1) if total > 0 else 0
+    }
+    
+    # Validate crop-district-soil compatibility
+    crop_validation = validate_prediction(district, soil_type, crop_name, weather)
+    
+    # Validate nutrient predictions against research ranges
+    nutrient_validation_status, nutrient_warnings = validate_nutrients(crop_name, nutrients)
+    
+    # Deficiency alerts
+    alerts = []
+    
+    # Add validation warnings
+    for warning in nutrient_warnings:
+        alerts.append({
+            'type': warning['type'],
+            'nutrient': warning['nutrient'],
+            'message': warning['message'],
+            'expected_range': warning['expected_range']
+        })
+    
+    # Add standard alerts
+    if nutrients['Zn_kg_ha'] < 5:
+        alerts.append({
+            'type': 'warning',
+            'nutrient': 'Zinc',
+            'message': 'Zinc deficiency common in Maharashtra. Consider zinc sulfate application.'
+        })
+    
+    if nutrients['S_kg_ha'] < 10:
+        alerts.append({
+            'type': 'info',
+            'nutrient': 'Sulfur',
+            'message': 'Low sulfur requirement. Monitor crop development.'
+        })
+    
+    return {
+        'nutrients': nutrients,
+        'npk_ratio': npk_ratio,
+        'alerts': alerts,
+        'validation': {
+            'crop_compatibility': crop_validation,
+            'nutrient_accuracy': nutrient_validation_status
+        },
+        'input': {
+            'district': district,
+            'soil_type': soil_type,
+            'crop_name': crop_name,
+            'weather': weather,
+            'zone': zone
+        }
+    }
+
+
+def water_quality_data(prediction, district, weather, soil_type, zone):
+    """Water parameters with pH / turbidity / temperature advice (/water-quality-analysis data)"""
+    water_params = {
+        'recommended_pH': round(float(prediction[0]), 2),
+        'turbidity_NTU': round(float(prediction[1]), 2),
+        'water_temp_C': round(float(prediction[2]), 2)
+    }
+    
+    # pH recommendations
+    ph_status = 'Neutral'
+    ph_advice = 'pH level is optimal for most crops.'
+    
+    if water_params['recommended_pH'] < 6.0:
+        ph_status = 'Acidic'
+        ph_advice = 'Consider adding lime to increase pH for better nutrient availability.'
+    elif water_params['recommended_pH'] > 8.0:
+        ph_status = 'Alkaline'
+        ph_advice = 'Consider adding organic matter or sulfur to lower pH.'
+    
+    # Turbidity analysis
+    turbidity_status = 'Clear'
+    turbidity_advice = 'Water turbidity is acceptable for irrigation.'
+    
+    if water_params['turbidity_NTU'] > 10:
+        turbidity_status = 'Moderate'
+        turbidity_advice = 'Consider filtration or sedimentation for sensitive crops.'
+    elif water_params['turbidity_NTU'] > 15:
+        turbidity_status = 'High'
+        turbidity_advice = 'Pre-treatment recommended before irrigation.'
+    
+    # Temperature considerations
+    temp_status = 'Optimal'
+    temp_advice = 'Water temperature suitable for irrigation.'
+    
+    if water_params['water_temp_C'] > 35:
+        temp_status = 'High'
+        temp_advice = 'Consider early morning or evening irrigation to avoid thermal stress.'
+    
+    return {
+        'water_parameters': water_params,
+        'analysis': {
+            'pH': {
+                'status': ph_status,
+                'advice': ph_advice
+            },
+            'turbidity': {
+                'status': turbidity_status,
+                'advice': turbidity_advice
+            },
+            'temperature': {
+                'status': temp_status,
+                'advice': temp_advice
+            }
+        },
+        'input': {
+            'district': district,
+            'weather': weather,
+            'soil_type': soil_type,
+            'zone': zone
+        }
+    }
+
+
+def fertilizer_recommendation_data(ctx, probabilities, predicted_class, crop_name, soil_type,
+                                   n_kg_ha, p2o5_kg_ha, k2o_kg_ha):
+    """Top 3 fertilizers from the fertilizer model outputs (/fertilizer-recommendation data)"""
+    # Apply temperature scaling to smooth confidence
+    temperature = 1.5
+    probabilities = np.exp(np.log(probabilities + 1e-10) / temperature)
+    probabilities = probabilities / probabilities.sum()
+    
+    # Get top 3 fertilizers
+    top_3_indices = np.argsort(probabilities)[-3:][::-1]
+    recommendations = []
+    
+    for idx in top_3_indices:
+        fertilizer = ctx.feature_encoder.decode('Fertilizer', idx)
+        confidence = float(probabilities[idx] * 100)
+        
+        recommendations.append({
+            'fertilizer': fertilizer,
+            'confidence': round(confidence, 2),
+            'cost_per_hectare': INPUT_COSTS['Fertilizer'].get(fertilizer, 'N/A'),
+            'is_primary': bool(idx == predicted_class)
+        })
+    
+    return {
+        'recommendations': recommendations,
+        'input': {
+            'crop_name': crop_name,
+            'soil_type': soil_type,
+            'nutrients': {
+                'N': n_kg_ha,
+                'P': p2o5_kg_ha,
+                'K': k2o_kg_ha
+            }
+        }
+    }
+
+
+def cached_json_response(cached):
+    """Serve a pre-serialized JSON body with ETag / Cache-Control (304 on If-None-Match)"""
+    response = app.response_class(cached.body, mimetype='application/json')
+    response.set_etag(cached.etag)
+    response.headers['Cache-Control'] = f'public, max-age={INSIGHTS_CACHE_MAX_AGE}'
+    return response.make_conditional(request)
+
+
+def response_cache_version(ctx):
+    """Bundle version used in response cache keys"""
+    if ctx.bundle is not None and ctx.bundle.manifest:
+        return ctx.version
+    # Unversioned bundles may change on reload without changing the version
+    return f"{ctx.version}@{ctx.fingerprint}"
+
+
+def cached_inference(handler):
+    """
+    Serve a deterministic POST endpoint from the response cache (keyed on
+    path, bundle version and normalized body); on a miss, identical
+    concurrent requests share one computation (single flight)
+    """
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        ctx = model_context
+        # Warm-up and on-demand profiled requests always run the handler
+        if ctx is None or WarmUp.is_warm_up(request.environ) or g.get('profile_trigger') == 'requested':
+            return handler(*args, **kwargs)
+        
+        key = response_cache_key(request.path, response_cache_version(ctx), request.get_json(silent=True))
+        if key is None:
+            return handler(*args, **kwargs)
+        
+        if response_cache is not None:
+            with span('cache'):
+                body = response_cache.get(key)
+            if body is not None:
+                CACHE_LOOKUPS.inc(request.url_rule.rule, 'hit')
+                response = app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+        
+        def compute():
+            response = app.make_response(handler(*args, **kwargs))
+            body = response.get_data()
+            # Only cache what the current bundle computed
+            if response_cache is not None and response.status_code == 200 and model_context is ctx:
+                with span('cache'):
+                    response_cache.put(key, body)
+            return response.status_code, body
+        
+        if single_flight is not None:
+            try:
+                (status, body), shared = single_flight.do(key, compute)
+            except SingleFlightTimeout as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 504
+        else:
+            (status, body), shared = compute(), False
+        
+        # Followers get their own response object around the shared bytes
+        response = app.response_class(body, status=status, mimetype='application/json')
+        response.headers['X-Cache'] = 'COALESCED' if shared else 'MISS'
+        CACHE_LOOKUPS.inc(request.url_rule.rule, 'coalesced' if shared else 'miss')
+        return response
+    
+    return wrapper
+
+
+# ============================================================================
+# REQUEST TIMING
+# ============================================================================
+
+@app.before_request
+def start_request_timing():
+    if timing_stats is not None or metrics.enabled:
+        g.timing_token = start_timing()
+
+
+@app.after_request
+def add_server_timing(response):
+    """
+    Server-Timing header with the request's stages; timings also feed the
+    per-route aggregates and /metrics (warm-up traffic excluded)
+    """
+    timings = current_timings()
+    if timings is None:
+        return response
+    
+    total = timings.elapsed()
+    if timing_stats is not None:
+        response.headers['Server-Timing'] = timings.server_timing(total)
+    if WarmUp.is_warm_up(request.environ):
+        return response
+    
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    if timing_stats is not None and request.url_rule is not None:
+        timing_stats.record(route, timings, total)
+    if metrics.enabled:
+        metrics.ensure_flusher()
+        HTTP_REQUESTS.inc(route, request.method, response.status_code)
+        HTTP_LATENCY.observe(total, route)
+        for stage, seconds, _ in timings.items():
+            STAGE_LATENCY.observe(seconds, route, stage)
+    return response
+
+
+@app.teardown_request
+def stop_request_timing(exc):
+    token = g.pop('timing_token', None)
+    if token is not None:
+        stop_timing(token)
+
+
+# ============================================================================
+# REQUEST PROFILING
+# ============================================================================
+
+@app.before_request
+def start_request_profile():
+    """Profile sampled requests and those sent with 'X-Profile: 1' plus the admin token"""
+    if request.headers.get(PROFILE_HEADER) == '1' and has_admin_token():
+        trigger = 'requested'
+    elif profiler.should_sample() and not WarmUp.is_warm_up(request.environ):
+        trigger = 'sampled'
+    else:
+        return
+    
+    profile = profiler.start()
+    if profile is not None:
+        g.profile = profile
+        g.profile_trigger = trigger
+        g.profile_start = time.perf_counter()
+
+
+@app.after_request
+def store_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        record = profiler.stop(
+            profile, g.profile_trigger, request.method, request.path,
+            request.url_rule.rule if request.url_rule is not None else 'unmatched',
+            response.status_code, time.perf_counter() - g.profile_start
+        )
+        response.headers['X-Profile-Id'] = str(record.id)
+    return response
+
+
+@app.teardown_request
+def abort_request_profile(exc):
+    # after_request did not run (unhandled exception)
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.abort(profile)
+
+
+# ============================================================================
+# REQUEST LOG
+# ============================================================================
+
+@app.before_request
+def start_request_log():
+    if request_log is not None and not WarmUp.is_warm_up(request.environ):
+        g.request_log_start = time.perf_counter()
+
+
+@app.after_request
+def write_request_log(response):
+    """One JSON line per request: route, normalized payload, latency, status"""
+    start = g.pop('request_log_start', None)
+    if start is None:
+        return response
+    
+    request_log.log(
+        method=request.method,
+        route=request.url_rule.rule if request.url_rule is not None else 'unmatched',
+        path=request.path,
+        query=request.query_string.decode('utf-8', 'replace'),
+        payload=request.get_json(silent=True) if request.is_json else None,
+        status=response.status_code,
+        latency=time.perf_counter() - start,
+        response_bytes=response.content_length,
+        cache=response.headers.get('X-Cache')
+    )
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint (warm-up state, readiness and load time of every
+    model component, manifest checksum results). Always 200 while the worker
+    serves; files that do not match the manifest or warm-up requests that
+    failed report 'degraded'. Readiness probes use /ready.
+    """
+    ctx = model_context
+    ready = warm_up.ready
+    # Filled in by the background verification thread
+    verification = dict(ctx.bundle.verification) if ctx is not None and ctx.bundle is not None else {}
+    if 'mismatch' in verification.values() or warm_up.failed:
+        status = 'degraded'
+    else:
+        status = 'healthy'
     return jsonify({
-        'status': 'healthy',
+        'status': status,
         'message': 'Smart Farmer API is running',
-        'models_loaded': len(models) == 4
+        'ready': ready,
+        'warming_up': not ready,
+        'models_loaded': ctx is not None and all(ctx.models.is_ready(name) for name in ctx.models),
+        'model_version': ctx.version if ctx is not None else None,
+        'components': ctx.status() if ctx is not None else {},
+        'verification': verification,
+        'warm_up': warm_up.status(),
+        'response_cache': response_cache.stats() if response_cache is not None else None,
+        'single_flight': single_flight.stats() if single_flight is not None else None,
+        'request_log': request_log.stats() if request_log is not None else None
     })
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has finished, then 200"""
+    ready = warm_up.ready
+    return jsonify({
+        'ready': ready,
+        'warm_up': warm_up.state
+    }), 200 if ready else 503
+
+
+def collect_component_load_times():
+    """Set the component load gauges from the current model context"""
+    ctx = model_context
+    if ctx is None:
+        return
+    for name, status in ctx.status().items():
+        if 'load_ms' in status:
+            COMPONENT_LOAD.set(status['load_ms'] / 1000, name)
+
+
+metrics.add_collector(collect_component_load_times)
+
+
+def cache_hit_ratios(collected):
+    """Response cache hit ratio per route from the merged lookup counters"""
+    lookups = collected.get(CACHE_LOOKUPS.name)
+    if lookups is None:
+        return
+    totals, hits = {}, {}
+    for (route, result), count in lookups['samples'].items():
+        totals[(route,)] = totals.get((route,), 0) + count
+        if result == 'hit':
+            hits[(route,)] = hits.get((route,), 0) + count
+    collected['smart_farmer_response_cache_hit_ratio'] = {
+        'type': 'gauge',
+        'help': 'Fraction of cached inference requests served from the response cache',
+        'labels': ['route'],
+        'samples': {key: hits.get(key, 0) / total for key, total in totals.items() if total}
+    }
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text exposition, merged across all workers"""
+    if not metrics.enabled:
+        return jsonify({
+            'success': False,
+            'error': 'Metrics are disabled (set METRICS_DIR to enable them)'
+        }), 404
+    
+    collected = metrics.collect()
+    cache_hit_ratios(collected)
+    return app.response_class(metrics.render(collected), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/dropdown-data', methods=['GET'])
 def get_dropdown_data():
     """Get all dropdown options for the frontend"""
+    ctx = model_context
     try:
-        districts = sorted(dataset['District'].unique().tolist())
-        soil_types = sorted(dataset['Soil_Type'].unique().tolist())
-        crops = sorted(dataset['Crop_Name'].unique().tolist())
-        weather_conditions = sorted(dataset['Weather'].unique().tolist())
-        fertilizers = sorted(dataset['Fertilizer'].unique().tolist())
+        if ctx is None or ctx.dataset_insights is None:
+            raise RuntimeError('Dataset not loaded')
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'districts': districts,
-                'soil_types': soil_types,
-                'crops': crops,
-                'weather_conditions': weather_conditions,
-                'fertilizers': fertilizers,
-                'zones': list(AGRICULTURAL_ZONES.keys())
-            }
-        })
+        return cached_json_response(ctx.dataset_insights.dropdown)
         
     except Exception as e:
         return jsonify({
@@ -126,8 +1060,10 @@ def get_dropdown_data():
 
 
 @app.route('/recommend-crop', methods=['POST'])
+@cached_inference
 def recommend_crop():
     """Recommend top 3 crops based on inputs"""
+    ctx = model_context
     try:
         data = request.json
         district = data.get('District')
@@ -144,153 +1080,140 @@ def recommend_crop():
         zone = get_zone(district)
         
         # Validate inputs against encoder classes
-        if 'District' in encoders:
-            valid_districts = encoders['District'].classes_.tolist()
-            if district not in valid_districts:
-                return jsonify({
-                    'success': False,
-                    'error': f'District "{district}" not found in training data. Please select from available districts.'
-                }), 400
+        unknown_input = find_unknown_input(ctx, [
+            ('District', district), ('Soil_Type', soil_type), ('Weather', weather)
+        ])
+        if unknown_input:
+            return jsonify({
+                'success': False,
+                'error': unknown_input
+            }), 400
         
-        if 'Soil_Type' in encoders:
-            valid_soil_types = encoders['Soil_Type'].classes_.tolist()
-            if soil_type not in valid_soil_types:
-                return jsonify({
-                    'success': False,
-                    'error': f'Soil Type "{soil_type}" not found in training data. Please select from available soil types.'
-                }), 400
+        probabilities = predict_crop_probabilities(ctx, district, soil_type, weather, zone)
         
-        if 'Weather' in encoders:
-            valid_weather = encoders['Weather'].classes_.tolist()
-            if weather not in valid_weather:
-                return jsonify({
-                    'success': False,
-                    'error': f'Weather condition "{weather}" not found in training data. Please select from available weather conditions.'
-                }), 400
+        return jsonify({
+            'success': True,
+            'data': crop_recommendation_data(ctx, probabilities, district, soil_type, weather, zone)
+        })
         
-        # Prepare input
-        input_df = pd.DataFrame([{
-            'District': district,
-            'Soil_Type': soil_type,
-            'Weather': weather,
-            'Zone': zone
-        }])
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+
+@app.route('/recommend-crop/batch', methods=['POST'])
+def recommend_crop_batch():
+    """Recommend top 3 crops for many farms in a single call"""
+    ctx = model_context
+    try:
+        data = request.json
+        records = data.get('records') if isinstance(data, dict) else data
         
-        # Encode features
-        feature_columns = ['District', 'Soil_Type', 'Weather', 'Zone']
-        for col in feature_columns:
-            if col in encoders:
-                input_df[col] = encoders[col].transform(input_df[col])
-        
-        # Get predictions with probabilities (use .values to avoid sklearn warning)
-        input_array = input_df[feature_columns].values
-        probabilities = models['crop'].predict_proba(input_array)[0]
-        
-        # Get all predictions sorted by probability
-        all_indices = np.argsort(probabilities)[::-1]
-        crop_encoder = encoders['Crop_Name']
-        
-        # Create list of (crop_name, probability) tuples
-        all_predictions = []
-        for idx in all_indices[:15]:  # Check top 15
-            crop_name = crop_encoder.inverse_transform([idx])[0]
-            prob = float(probabilities[idx])
-            all_predictions.append((crop_name, prob))
-        
-        # Apply validation filter
-        valid_predictions = filter_invalid_crops(all_predictions, district, soil_type, weather)
-        
-        # Build top 3 valid crops
-        top_3_crops = []
-        for pred in valid_predictions[:3]:
-            crop_name = pred['crop']
-            confidence = pred['probability'] * 100
-            validation_info = pred['validation']
+        if not isinstance(records, list) or len(records) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: records (list of {District, Soil_Type, Weather})'
+            }), 400
+        
+        if len(records) > MAX_BATCH_RECORDS:
+            return jsonify({
+                'success': False,
+                'error': f'Too many records: {len(records)} (maximum {MAX_BATCH_RECORDS} per request)'
+            }), 400
+        
+        required_fields = ['District', 'Soil_Type', 'Weather']
+        # Validate records, keep the indices of the ones we can score
+        results = [None] * len(records)
+        valid_rows = []
+        for i, record in enumerate(records):
+            if not isinstance(record, dict) or not all(record.get(col) for col in required_fields):
+                results[i] = {
+                    'index': i,
+                    'success': False,
+                    'error': 'Missing required fields: District, Soil_Type, Weather'
+                }
+                continue
             
-            # Get additional info
-            crop_data_rows = dataset[dataset['Crop_Name'] == crop_name]
-            if len(crop_data_rows) > 0:
-                crop_data = crop_data_rows.iloc[0]
+            if not all(isinstance(record[col], str) for col in required_fields):
+                results[i] = {
+                    'index': i,
+                    'success': False,
+                    'error': 'District, Soil_Type and Weather must be strings'
+                }
+                continue
             
-            top_3_crops.append({
-                'crop_name': crop_name,
-                'confidence': round(confidence, 2),
-                'avg_yield': EXPECTED_YIELDS.get(crop_name, 'N/A'),
-                'market_rate': MARKET_RATES.get(crop_name, 'N/A'),
-                'suitable_for_zone': zone,
-                'validation': {
-                    'is_valid': validation_info['is_valid'],
-                    'region': validation_info['region'],
-                    'reasoning': validation_info['reasoning']
+            unknown = [col for col in required_fields if not ctx.feature_encoder.is_known(col, record[col])]
+            if unknown:
+                results[i] = {
+                    'index': i,
+                    'success': False,
+                    'error': f'{unknown[0]} "{record[unknown[0]]}" not found in training data.'
                 }
-            })
-        
-        # Get region characteristics
-        region = get_region(district)
-        region_info = get_region_characteristics(region)
-        
-        # Get alternative crops
-        alternatives = get_alternative_crops(district, soil_type, weather)
-        
-        # Zone characteristics
-        zone_info = ZONE_CHARACTERISTICS.get(zone, {})
-        
-        # Check if no crops were found and provide helpful info
-        no_data_message = None
-        suitable_combinations = []
+                continue
+            
+            valid_rows.append(i)
         
-        if len(top_3_crops) == 0:
-            # Check what combinations exist for this district
-            district_data = dataset[dataset['District'] == district]
+        if valid_rows:
+            districts = [records[i]['District'] for i in valid_rows]
+            soil_types = [records[i]['Soil_Type'] for i in valid_rows]
+            weathers = [records[i]['Weather'] for i in valid_rows]
+            zones = [get_zone(district) for district in districts]
             
-            if len(district_data) > 0:
-                # Get available soil types and weather combinations
-                available_soils = sorted(district_data['Soil_Type'].unique().tolist())
-                available_weather = sorted(district_data['Weather'].unique().tolist())
-                
-                # Find suitable combinations
-                combinations = district_data.groupby(['Soil_Type', 'Weather'])['Crop_Name'].apply(
-                    lambda x: sorted(x.unique().tolist())
-                ).reset_index()
-                
-                for _, row in combinations.iterrows():
-                    suitable_combinations.append({
-                        'soil_type': row['Soil_Type'],
-                        'weather': row['Weather'],
-                        'crops': row['Crop_Name'][:5]  # Top 5 crops for this combo
-                    })
-                
-                no_data_message = {
-                    'title': 'No Crops Found for This Combination',
-                    'reason': f'The combination of {soil_type} soil with {weather} weather is not typical for {district} district.',
-                    'district_info': f'{district} is located in the {zone} zone.',
-                    'available_soils': available_soils,
-                    'available_weather': available_weather,
-                    'suggestion': f'In {district}, the common soil types are {", ".join(available_soils)}. Please try selecting one of these soil types for better recommendations.'
+            # Encode column-wise (one transform call per column)
+            with span('encode'):
+                encoded = {
+                    'District': ctx.feature_encoder.encode_many('District', districts),
+                    'Soil_Type': ctx.feature_encoder.encode_many('Soil_Type', soil_types),
+                    'Weather': ctx.feature_encoder.encode_many('Weather', weathers)
                 }
+            
+            INFERENCE_BATCH.observe(len(valid_rows), 'crop')
+            if ctx.prediction_cube is not None and ctx.prediction_cube.crop_proba is not None:
+                with span('cube'):
+                    probabilities = ctx.prediction_cube.crop_probabilities(
+                        encoded['District'], encoded['Soil_Type'], encoded['Weather']
+                    )
             else:
-                no_data_message = {
-                    'title': 'No Data Available',
-                    'reason': f'No agricultural data available for {district} district in our database.',
-                    'suggestion': 'Please select a different district or contact support for assistance.'
+                with span('encode'):
+                    encoded['Zone'] = ctx.feature_encoder.encode_many('Zone', zones)
+                    input_array = np.column_stack([encoded[col] for col in CROP_FEATURES])
+                with span('crop_model'):
+                    probabilities = ctx.models['crop'].predict_proba(input_array)
+            
+            # Validation rules for all records and classes in one bitmask AND
+            valid_classes = valid_class_masks(ctx.crop_rule_bits, districts, soil_types, weathers)
+            
+            for row, i in enumerate(valid_rows):
+                district, soil_type, weather, zone = districts[row], soil_types[row], weathers[row], zones[row]
+                top_3_crops = build_crop_recommendations(
+                    ctx, probabilities[row], district, soil_type, weather, zone, valid_classes[row]
+                )
+                alternatives = get_alternative_crops(district, soil_type, weather)
+                
+                results[i] = {
+                    'index': i,
+                    'success': True,
+                    'recommendations': top_3_crops,
+                    'zone': zone,
+                    'region': get_region(district),
+                    'alternative_crops': alternatives[:5] if len(top_3_crops) < 3 else [],
+                    'input': {
+                        'district': district,
+                        'soil_type': soil_type,
+                        'weather': weather
+                    }
                 }
         
         return jsonify({
             'success': True,
             'data': {
-                'recommendations': top_3_crops,
-                'zone': zone,
-                'region': region,
-                'region_info': region_info,
-                'zone_info': zone_info,
-                'alternative_crops': alternatives[:5] if len(top_3_crops) < 3 else [],
-                'no_data_message': no_data_message,
-                'suitable_combinations': suitable_combinations[:6] if suitable_combinations else [],
-                'input': {
-                    'district': district,
-                    'soil_type': soil_type,
-                    'weather': weather
-                }
+                'results': results,
+                'total': len(records),
+                'succeeded': len(valid_rows),
+                'failed': len(records) - len(valid_rows)
             }
         })
         
@@ -303,8 +1226,10 @@ def recommend_crop():
 
 
 @app.route('/predict-nutrients', methods=['POST'])
+@cached_inference
 def predict_nutrients():
     """Predict nutrient requirements"""
+    ctx = model_context
     try:
         data = request.json
         district = data.get('District')
@@ -321,96 +1246,11 @@ def predict_nutrients():
         # Get zone
         zone = get_zone(district)
         
-        # Prepare input with computed features
-        # Use default values for NPK_Ratio and Total_Nutrients since we're predicting them
-        input_df = pd.DataFrame([{
-            'District': district,
-            'Soil_Type': soil_type,
-            'Crop_Name': crop_name,
-            'Weather': weather,
-            'Zone': zone,
-            'NPK_Ratio': 1.0,  # Default ratio
-            'Total_Nutrients': 200.0  # Default total
-        }])
-        
-        # Encode features
-        feature_columns = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone']
-        all_columns = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone', 'NPK_Ratio', 'Total_Nutrients']
-        for col in feature_columns:
-            if col in encoders:
-                input_df[col] = encoders[col].transform(input_df[col])
-        
-        # Predict (use .values with correct column order to avoid sklearn warning)
-        input_array = input_df[all_columns].values
-        prediction = models['nutrient'].predict(input_array)[0]
-        
-        nutrients = {
-            'N_kg_ha': round(float(prediction[0]), 2),
-            'P2O5_kg_ha': round(float(prediction[1]), 2),
-            'K2O_kg_ha': round(float(prediction[2]), 2),
-            'Zn_kg_ha': round(float(prediction[3]), 2),
-            'S_kg_ha': round(float(prediction[4]), 2)
-        }
-        
-        # Calculate NPK ratio
-        total = nutrients['N_kg_ha'] + nutrients['P2O5_kg_ha'] + nutrients['K2O_kg_ha']
-        npk_ratio = {
-            'N': round((nutrients['N_kg_ha'] / total) * 100, 1) if total > 0 else 0,
-            'P': round((nutrients['P2O5_kg_ha'] / total) * 100, 1) if total > 0 else 0,
-            'K': round((nutrients['K2O_kg_ha'] / total) * 100, 1) if total > 0 else 0
-        }
-        
-        # Validate crop-district-soil compatibility
-        crop_validation = validate_prediction(district, soil_type, crop_name, weather)
-        
-        # Validate nutrient predictions against research ranges
-        nutrient_validation_status, nutrient_warnings = validate_nutrients(crop_name, nutrients)
-        
-        # Deficiency alerts
-        alerts = []
-        
-        # Add validation warnings
-        for warning in nutrient_warnings:
-            alerts.append({
-                'type': warning['type'],
-                'nutrient': warning['nutrient'],
-                'message': warning['message'],
-                'expected_range': warning['expected_range']
-            })
-        
-        # Add standard alerts
-        if nutrients['Zn_kg_ha'] < 5:
-            alerts.append({
-                'type': 'warning',
-                'nutrient': 'Zinc',
-                'message': 'Zinc deficiency common in Maharashtra. Consider zinc sulfate application.'
-            })
-        
-        if nutrients['S_kg_ha'] < 10:
-            alerts.append({
-                'type': 'info',
-                'nutrient': 'Sulfur',
-                'message': 'Low sulfur requirement. Monitor crop development.'
-            })
+        prediction = predict_nutrient_requirements(ctx, district, soil_type, crop_name, weather, zone)
         
         return jsonify({
             'success': True,
-            'data': {
-                'nutrients': nutrients,
-                'npk_ratio': npk_ratio,
-                'alerts': alerts,
-                'validation': {
-                    'crop_compatibility': crop_validation,
-                    'nutrient_accuracy': nutrient_validation_status
-                },
-                'input': {
-                    'district': district,
-                    'soil_type': soil_type,
-                    'crop_name': crop_name,
-                    'weather': weather,
-                    'zone': zone
-                }
-            }
+            'data': nutrient_prediction_data(prediction, district, soil_type, crop_name, weather, zone)
         })
         
     except Exception as e:
@@ -422,8 +1262,10 @@ def predict_nutrients():
 
 
 @app.route('/water-quality-analysis', methods=['POST'])
+@cached_inference
 def water_quality_analysis():
     """Predict water quality parameters"""
+    ctx = model_context
     try:
         data = request.json
         district = data.get('District')
@@ -439,84 +1281,11 @@ def water_quality_analysis():
         # Get zone
         zone = get_zone(district)
         
-        # Prepare input
-        input_df = pd.DataFrame([{
-            'District': district,
-            'Weather': weather,
-            'Soil_Type': soil_type,
-            'Zone': zone
-        }])
-        
-        # Encode features
-        feature_columns = ['District', 'Weather', 'Soil_Type', 'Zone']
-        for col in feature_columns:
-            if col in encoders:
-                input_df[col] = encoders[col].transform(input_df[col])
-        
-        # Predict (use .values to avoid sklearn warning)
-        prediction = models['water'].predict(input_df.values)[0]
-        
-        water_params = {
-            'recommended_pH': round(float(prediction[0]), 2),
-            'turbidity_NTU': round(float(prediction[1]), 2),
-            'water_temp_C': round(float(prediction[2]), 2)
-        }
-        
-        # pH recommendations
-        ph_status = 'Neutral'
-        ph_advice = 'pH level is optimal for most crops.'
-        
-        if water_params['recommended_pH'] < 6.0:
-            ph_status = 'Acidic'
-            ph_advice = 'Consider adding lime to increase pH for better nutrient availability.'
-        elif water_params['recommended_pH'] > 8.0:
-            ph_status = 'Alkaline'
-            ph_advice = 'Consider adding organic matter or sulfur to lower pH.'
-        
-        # Turbidity analysis
-        turbidity_status = 'Clear'
-        turbidity_advice = 'Water turbidity is acceptable for irrigation.'
-        
-        if water_params['turbidity_NTU'] > 10:
-            turbidity_status = 'Moderate'
-            turbidity_advice = 'Consider filtration or sedimentation for sensitive crops.'
-        elif water_params['turbidity_NTU'] > 15:
-            turbidity_status = 'High'
-            turbidity_advice = 'Pre-treatment recommended before irrigation.'
-        
-        # Temperature considerations
-        temp_status = 'Optimal'
-        temp_advice = 'Water temperature suitable for irrigation.'
-        
-        if water_params['water_temp_C'] > 35:
-            temp_status = 'High'
-            temp_advice = 'Consider early morning or evening irrigation to avoid thermal stress.'
+        prediction = predict_water_quality(ctx, district, weather, soil_type, zone)
         
         return jsonify({
             'success': True,
-            'data': {
-                'water_parameters': water_params,
-                'analysis': {
-                    'pH': {
-                        'status': ph_status,
-                        'advice': ph_advice
-                    },
-                    'turbidity': {
-                        'status': turbidity_status,
-                        'advice': turbidity_advice
-                    },
-                    'temperature': {
-                        'status': temp_status,
-                        'advice': temp_advice
-                    }
-                },
-                'input': {
-                    'district': district,
-                    'weather': weather,
-                    'soil_type': soil_type,
-                    'zone': zone
-                }
-            }
+            'data': water_quality_data(prediction, district, weather, soil_type, zone)
         })
         
     except Exception as e:
@@ -528,8 +1297,10 @@ def water_quality_analysis():
 
 
 @app.route('/fertilizer-recommendation', methods=['POST'])
+@cached_inference
 def fertilizer_recommendation():
     """Recommend optimal fertilizer"""
+    ctx = model_context
     try:
         data = request.json
         crop_name = data.get('Crop_Name')
@@ -544,60 +1315,21 @@ def fertilizer_recommendation():
                 'error': 'Missing required fields'
             }), 400
         
-        # Prepare input
-        input_df = pd.DataFrame([{
+        # Get predictions with probabilities
+        probabilities, predicted_classes = predict_fertilizers(ctx, [{
             'Crop_Name': crop_name,
             'Soil_Type': soil_type,
             'N_kg_ha': n_kg_ha,
             'P2O5_kg_ha': p2o5_kg_ha,
             'K2O_kg_ha': k2o_kg_ha
         }])
-        
-        # Encode features
-        for col in ['Crop_Name', 'Soil_Type']:
-            if col in encoders:
-                input_df[col] = encoders[col].transform(input_df[col])
-        
-        # Get predictions with probabilities (use .values to avoid sklearn warning)
-        probabilities = models['fertilizer'].predict_proba(input_df.values)[0]
-        predicted_class = models['fertilizer'].predict(input_df.values)[0]
-        
-        # Apply temperature scaling to smooth confidence
-        temperature = 1.5
-        probabilities = np.exp(np.log(probabilities + 1e-10) / temperature)
-        probabilities = probabilities / probabilities.sum()
-        
-        # Get top 3 fertilizers
-        top_3_indices = np.argsort(probabilities)[-3:][::-1]
-        recommendations = []
-        
-        fertilizer_encoder = encoders['Fertilizer']
-        
-        for idx in top_3_indices:
-            fertilizer = fertilizer_encoder.inverse_transform([idx])[0]
-            confidence = float(probabilities[idx] * 100)
-            
-            recommendations.append({
-                'fertilizer': fertilizer,
-                'confidence': round(confidence, 2),
-                'cost_per_hectare': INPUT_COSTS['Fertilizer'].get(fertilizer, 'N/A'),
-                'is_primary': idx == predicted_class
-            })
+        probabilities, predicted_class = probabilities[0], predicted_classes[0]
         
         return jsonify({
             'success': True,
-            'data': {
-                'recommendations': recommendations,
-                'input': {
-                    'crop_name': crop_name,
-                    'soil_type': soil_type,
-                    'nutrients': {
-                        'N': n_kg_ha,
-                        'P': p2o5_kg_ha,
-                        'K': k2o_kg_ha
-                    }
-                }
-            }
+            'data': fertilizer_recommendation_data(
+                ctx, probabilities, predicted_class, crop_name, soil_type, n_kg_ha, p2o5_kg_ha, k2o_kg_ha
+            )
         })
         
     except Exception as e:
@@ -609,8 +1341,10 @@ def fertilizer_recommendation():
 
 
 @app.route('/compare-crops', methods=['POST'])
+@cached_inference
 def compare_crops():
     """Compare multiple crops side by side"""
+    ctx = model_context
     try:
         data = request.json
         crops = data.get('crops', [])  # List of crop names
@@ -625,102 +1359,69 @@ def compare_crops():
             }), 400
         
         # Validate inputs against encoder classes
-        if 'District' in encoders:
-            valid_districts = encoders['District'].classes_.tolist()
-            if district not in valid_districts:
-                return jsonify({
-                    'success': False,
-                    'error': f'District "{district}" not found in training data. Please select from available districts.'
-                }), 400
-        
-        if 'Soil_Type' in encoders:
-            valid_soil_types = encoders['Soil_Type'].classes_.tolist()
-            if soil_type not in valid_soil_types:
-                return jsonify({
-                    'success': False,
-                    'error': f'Soil Type "{soil_type}" not found in training data. Please select from available soil types.'
-                }), 400
+        unknown_input = find_unknown_input(ctx, [
+            ('District', district), ('Soil_Type', soil_type), ('Weather', weather)
+        ])
+        if unknown_input:
+            return jsonify({
+                'success': False,
+                'error': unknown_input
+            }), 400
         
-        if 'Weather' in encoders:
-            valid_weather = encoders['Weather'].classes_.tolist()
-            if weather not in valid_weather:
-                return jsonify({
-                    'success': False,
-                    'error': f'Weather condition "{weather}" not found in training data. Please select from available weather conditions.'
-                }), 400
-        
-        if 'Crop_Name' in encoders:
-            valid_crops = encoders['Crop_Name'].classes_.tolist()
-            for crop in crops:
-                if crop not in valid_crops:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Crop "{crop}" not found in training data. Please select from available crops.'
-                    }), 400
+        unknown_crop = find_unknown_input(ctx, [('Crop_Name', crop) for crop in crops])
+        if unknown_crop:
+            return jsonify({
+                'success': False,
+                'error': unknown_crop
+            }), 400
         
         zone = get_zone(district)
-        comparison_data = []
+        n_crops = len(crops)
+        
+        # =====================================================================
+        # NUTRIENT REQUIREMENTS (one encode + one predict for all crops)
+        # =====================================================================
+        
+        with span('encode'):
+            crop_ids = ctx.feature_encoder.encode_many('Crop_Name', crops)
+            district_id = ctx.feature_encoder.encode('District', district)
+            soil_id = ctx.feature_encoder.encode('Soil_Type', soil_type)
+            weather_id = ctx.feature_encoder.encode('Weather', weather)
+        
+        nutrients = predict_crop_nutrients(ctx, district_id, soil_id, weather_id, zone, crop_ids)
         
+        # =====================================================================
+        # ECONOMICS (vectorized over crops)
+        # =====================================================================
+        
+        fixed_costs = (
+            INPUT_COSTS['Fertilizer'].get('DAP', 1400) + INPUT_COSTS['Labor'] +
+            INPUT_COSTS['Irrigation'] + INPUT_COSTS['Pesticides']
+        )
+        seed_costs = np.array([INPUT_COSTS['Seeds'].get(crop, 5000) for crop in crops], dtype=float)
+        expected_yields = [EXPECTED_YIELDS.get(crop, 20) for crop in crops]
+        market_rates = [MARKET_RATES.get(crop, 3000) for crop in crops]
+        
+        total_costs = seed_costs + fixed_costs
+        gross_incomes = np.array(expected_yields, dtype=float) * np.array(market_rates, dtype=float)
+        net_incomes = gross_incomes - total_costs
+        rois = np.zeros(n_crops)
+        has_cost = total_costs > 0
+        rois[has_cost] = net_incomes[has_cost] / total_costs[has_cost] * 100
+        
+        # Risk assessment
+        risk_assessments = []
         for crop_name in crops:
-            # Get nutrient requirements
-            input_df = pd.DataFrame([{
-                'District': district,
-                'Soil_Type': soil_type,
-                'Crop_Name': crop_name,
-                'Weather': weather,
-                'Zone': zone,
-                'NPK_Ratio': 1.0,  # Default ratio
-                'Total_Nutrients': 200.0  # Default total
-            }])
-            
-            # Encode
-            for col in ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone']:
-                if col in encoders:
-                    input_df[col] = encoders[col].transform(input_df[col])
-            
-            # Predict nutrients (use .values to avoid sklearn warning)
-            nutrients = models['nutrient'].predict(input_df.values)[0]
-            
-            # Calculate costs and returns
-            seed_cost = INPUT_COSTS['Seeds'].get(crop_name, 5000)
-            fertilizer_cost = INPUT_COSTS['Fertilizer'].get('DAP', 1400)
-            total_cost = seed_cost + fertilizer_cost + INPUT_COSTS['Labor'] + INPUT_COSTS['Irrigation'] + INPUT_COSTS['Pesticides']
-            
-            expected_yield = EXPECTED_YIELDS.get(crop_name, 20)
-            market_rate = MARKET_RATES.get(crop_name, 3000)
-            gross_income = expected_yield * market_rate
-            net_income = gross_income - total_cost
-            roi = (net_income / total_cost * 100) if total_cost > 0 else 0
-            
-            # Risk assessment
             risk_score = 'Medium'
             if zone in ['Marathwada'] and crop_name in ['Sugarcane', 'Rice']:
                 risk_score = 'High'
             elif zone in ['Western Maharashtra'] and crop_name in ['Sugarcane', 'Grapes']:
                 risk_score = 'Low'
             
-            comparison_data.append({
-                'crop_name': crop_name,
-                'nutrients': {
-                    'N': round(float(nutrients[0]), 2),
-                    'P': round(float(nutrients[1]), 2),
-                    'K': round(float(nutrients[2]), 2),
-                    'Zn': round(float(nutrients[3]), 2),
-                    'S': round(float(nutrients[4]), 2)
-                },
-                'economics': {
-                    'total_cost': round(total_cost, 2),
-                    'expected_yield': expected_yield,
-                    'market_rate': market_rate,
-                    'gross_income': round(gross_income, 2),
-                    'net_income': round(net_income, 2),
-                    'roi_percentage': round(roi, 2)
-                },
-                'risk_assessment': {
-                    'risk_level': risk_score,
-                    'water_requirement': 'High' if crop_name in ['Sugarcane', 'Rice'] else 'Medium',
-                    'zone_suitability': zone
-                }
+            risk_assessments.append({
+                'risk_level': risk_score,
+                'water_requirement': 'High' if crop_name in ['Sugarcane', 'Rice'] else 'Medium',
+                'zone_suitability': zone
             })
         
         # =====================================================================
@@ -730,9 +1431,15 @@ def compare_crops():
         # This does NOT modify the trained model or dataset
         # Debug logging is enabled in development mode
         
-        calibrated_results = calibrate_comparison_results(
-            comparison_data, 
-            district, 
+        calibrated_results = calibrate_comparison_arrays(
+            crops,
+            district,
+            raw_cost=np.round(total_costs, 2),
+            raw_roi=np.round(rois, 2),
+            raw_nutrients=np.round(nutrients, 2),
+            expected_yields=expected_yields,
+            market_rates=market_rates,
+            risk_assessments=risk_assessments,
             debug=DEBUG
         )
         
@@ -743,17 +1450,15 @@ def compare_crops():
         # Adds contextual warnings and recommendations
         # This is a post-processing layer that does NOT affect ML predictions
         
-        for crop in calibrated_results['comparison']:
-            crop_name = crop['crop_name']
-            
-            # Validate suitability
-            suitability = validate_crop_suitability(
-                crop_name=crop_name,
-                district=district,
-                zone=zone,
-                debug=DEBUG
-            )
-            
+        # Memoized crop x district suitability (computed once per pair)
+        suitabilities = validate_crop_suitability_batch(
+            crops=[crop['crop_name'] for crop in calibrated_results['comparison']],
+            district=district,
+            zone=zone,
+            debug=DEBUG
+        )
+        
+        for crop, suitability in zip(calibrated_results['comparison'], suitabilities):
             # Add suitability information to crop result
             crop['suitability'] = {
                 'is_traditional': suitability['is_traditional'],
@@ -841,58 +1546,89 @@ def compare_crops():
         }), 500
 
 
-@app.route('/district-insights/<district_name>', methods=['GET'])
-def district_insights(district_name):
-    """Get detailed insights for a specific district"""
+@app.route('/advisory', methods=['POST'])
+@cached_inference
+def advisory():
+    """Complete advisory for one farm: top crops, their nutrient and fertilizer
+    plans, and irrigation water quality in a single call"""
+    ctx = model_context
     try:
-        district_data = dataset[dataset['District'] == district_name]
+        data = request.json
+        district = data.get('District')
+        soil_type = data.get('Soil_Type')
+        weather = data.get('Weather')
         
-        if district_data.empty:
+        if not all([district, soil_type, weather]):
             return jsonify({
                 'success': False,
-                'error': f'No data found for district: {district_name}'
-            }), 404
-        
-        zone = get_zone(district_name)
-        zone_info = ZONE_CHARACTERISTICS.get(zone, {})
-        
-        # Soil type distribution
-        soil_distribution = district_data['Soil_Type'].value_counts().to_dict()
-        
-        # Popular crops
-        crop_distribution = district_data['Crop_Name'].value_counts().head(10).to_dict()
-        
-        # Weather patterns
-        weather_distribution = district_data['Weather'].value_counts().to_dict()
+                'error': 'Missing required fields: District, Soil_Type, Weather'
+            }), 400
         
-        # Average nutrient requirements
-        avg_nutrients = {
-            'N_kg_ha': round(district_data['N_kg_ha'].mean(), 2),
-            'P2O5_kg_ha': round(district_data['P2O5_kg_ha'].mean(), 2),
-            'K2O_kg_ha': round(district_data['K2O_kg_ha'].mean(), 2),
-            'Zn_kg_ha': round(district_data['Zn_kg_ha'].mean(), 2),
-            'S_kg_ha': round(district_data['S_kg_ha'].mean(), 2)
-        }
+        # Validate inputs against encoder classes
+        unknown_input = find_unknown_input(ctx, [
+            ('District', district), ('Soil_Type', soil_type), ('Weather', weather)
+        ])
+        if unknown_input:
+            return jsonify({
+                'success': False,
+                'error': unknown_input
+            }), 400
         
-        # Water quality stats
-        water_stats = {
-            'avg_pH': round(district_data['Recommended_pH'].mean(), 2),
-            'avg_turbidity': round(district_data['Turbidity_NTU'].mean(), 2),
-            'avg_temp': round(district_data['Water_Temp_C'].mean(), 2)
-        }
+        # Zone and encodings are shared by every section below
+        zone = get_zone(district)
+        with span('encode'):
+            district_id = ctx.feature_encoder.encode('District', district)
+            soil_id = ctx.feature_encoder.encode('Soil_Type', soil_type)
+            weather_id = ctx.feature_encoder.encode('Weather', weather)
+        
+        probabilities = predict_crop_probabilities(ctx, district, soil_type, weather, zone)
+        recommendation = crop_recommendation_data(ctx, probabilities, district, soil_type, weather, zone)
+        top_crops = [crop['crop_name'] for crop in recommendation['recommendations']]
+        
+        water_prediction = predict_water_quality(ctx, district, weather, soil_type, zone)
+        
+        crops = []
+        if top_crops:
+            # Nutrients of all top crops in one predict, then their fertilizers in one predict
+            with span('encode'):
+                crop_ids = ctx.feature_encoder.encode_many('Crop_Name', top_crops)
+            nutrients = predict_crop_nutrients(ctx, district_id, soil_id, weather_id, zone, crop_ids)
+            nutrient_data = [
+                nutrient_prediction_data(nutrients[i], district, soil_type, crop_name, weather, zone)
+                for i, crop_name in enumerate(top_crops)
+            ]
+            
+            fertilizer_records = [{
+                'Crop_Name': crop_name,
+                'Soil_Type': soil_type,
+                'N_kg_ha': crop_nutrients['nutrients']['N_kg_ha'],
+                'P2O5_kg_ha': crop_nutrients['nutrients']['P2O5_kg_ha'],
+                'K2O_kg_ha': crop_nutrients['nutrients']['K2O_kg_ha']
+            } for crop_name, crop_nutrients in zip(top_crops, nutrient_data)]
+            fertilizer_probabilities, fertilizer_classes = predict_fertilizers(ctx, fertilizer_records)
+            
+            for i, record in enumerate(fertilizer_records):
+                crops.append({
+                    'crop_name': record['Crop_Name'],
+                    'nutrients': nutrient_data[i],
+                    'fertilizer': fertilizer_recommendation_data(
+                        ctx, fertilizer_probabilities[i], fertilizer_classes[i], record['Crop_Name'],
+                        soil_type, record['N_kg_ha'], record['P2O5_kg_ha'], record['K2O_kg_ha']
+                    )
+                })
         
         return jsonify({
             'success': True,
             'data': {
-                'district': district_name,
-                'zone': zone,
-                'zone_characteristics': zone_info,
-                'soil_distribution': soil_distribution,
-                'popular_crops': crop_distribution,
-                'weather_patterns': weather_distribution,
-                'average_nutrients': avg_nutrients,
-                'water_quality': water_stats,
-                'total_records': len(district_data)
+                'recommendation': recommendation,
+                'crops': crops,
+                'water_quality': water_quality_data(water_prediction, district, weather, soil_type, zone),
+                'input': {
+                    'district': district,
+                    'soil_type': soil_type,
+                    'weather': weather,
+                    'zone': zone
+                }
             }
         })
         
@@ -904,24 +1640,41 @@ def district_insights(district_name):
         }), 500
 
 
+@app.route('/district-insights/<district_name>', methods=['GET'])
+def district_insights(district_name):
+    """Get detailed insights for a specific district"""
+    ctx = model_context
+    try:
+        if ctx is None or ctx.dataset_insights is None:
+            raise RuntimeError('Dataset not loaded')
+        
+        insights = ctx.dataset_insights.district(district_name)
+        
+        if insights is None:
+            return jsonify({
+                'success': False,
+                'error': f'No data found for district: {district_name}'
+            }), 404
+        
+        return cached_json_response(insights)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+
 @app.route('/statistics', methods=['GET'])
 def get_statistics():
     """Get overall system statistics"""
+    ctx = model_context
     try:
-        stats = {
-            'total_records': len(dataset),
-            'total_districts': dataset['District'].nunique(),
-            'total_crops': dataset['Crop_Name'].nunique(),
-            'total_soil_types': dataset['Soil_Type'].nunique(),
-            'total_weather_conditions': dataset['Weather'].nunique(),
-            'zones': len(AGRICULTURAL_ZONES),
-            'districts_by_zone': {zone: len(districts) for zone, districts in AGRICULTURAL_ZONES.items()}
-        }
+        if ctx is None or ctx.dataset_insights is None:
+            raise RuntimeError('Dataset not loaded')
         
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
+        return cached_json_response(ctx.dataset_insights.statistics)
         
     except Exception as e:
         return jsonify({
@@ -930,7 +1683,227 @@ def get_statistics():
         }), 500
 
 
-# Load models when app starts
+# =============================================================================
+# ADMIN
+# =============================================================================
+
+def has_admin_token():
+    """True if the request carries 'Authorization: Bearer <ADMIN_TOKEN>'"""
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get('Authorization', '')
+    return hmac.compare_digest(token.encode('utf-8'), f'Bearer {ADMIN_TOKEN}'.encode('utf-8'))
+
+
+def admin_auth_error():
+    """Error response unless the request carries 'Authorization: Bearer <ADMIN_TOKEN>'"""
+    if not ADMIN_TOKEN:
+        return jsonify({
+            'success': False,
+            'error': 'Admin endpoints are disabled (ADMIN_TOKEN not set)'
+        }), 403
+    
+    if not has_admin_token():
+        return jsonify({
+            'success': False,
+            'error': 'Invalid admin token'
+        }), 401
+    return None
+
+
+def model_reload_status():
+    """Current model version plus the reloader state"""
+    ctx = model_context
+    return {
+        'model_version': ctx.version if ctx is not None else None,
+        'loaded_at': ctx.loaded_at if ctx is not None else None,
+        **model_reloader.status()
+    }
+
+
+@app.route('/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    """
+    Hot-reload the model bundle (POST) or report reload status (GET).
+    POST ?wait=true blocks until the new bundle is live.
+    """
+    auth_error = admin_auth_error()
+    if auth_error:
+        return auth_error
+    
+    if request.method == 'GET':
+        return jsonify({'success': True, 'data': model_reload_status()})
+    
+    wait = request.args.get('wait', 'false').lower() == 'true'
+    started = model_reloader.reload(wait=wait)
+    
+    status = model_reload_status()
+    if wait and status['state'] == 'failed':
+        return jsonify({'success': False, 'error': status['last_error'], 'data': status}), 500
+    
+    return jsonify({
+        'success': True,
+        'message': 'Reload started' if started else 'Reload already in progress',
+        'data': status
+    }), 200 if wait else 202
+
+
+@app.route('/admin/timings', methods=['GET', 'DELETE'])
+def admin_timings():
+    """Per-route stage timings aggregated in this worker (DELETE resets them)"""
+    auth_error = admin_auth_error()
+    if auth_error:
+        return auth_error
+    
+    if timing_stats is None:
+        return jsonify({
+            'success': False,
+            'error': 'Request timing is disabled (SERVER_TIMING=false)'
+        }), 404
+    
+    if request.method == 'DELETE':
+        timing_stats.reset()
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'worker_pid': os.getpid(),
+            'routes': timing_stats.snapshot()
+        }
+    })
+
+
+@app.route('/admin/profiles', methods=['GET', 'POST', 'DELETE'])
+def admin_profiles():
+    """
+    List the buffered cProfile captures of this worker (GET), set its sample
+    rate (POST {"sample_rate": 0.001}) or clear the buffer (DELETE)
+    """
+    auth_error = admin_auth_error()
+    if auth_error:
+        return auth_error
+    
+    if request.method == 'POST':
+        sample_rate = (request.get_json(silent=True) or {}).get('sample_rate')
+        if not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+            return jsonify({
+                'success': False,
+                'error': 'sample_rate must be a number between 0 and 1'
+            }), 400
+        profiler.sample_rate = float(sample_rate)
+    elif request.method == 'DELETE':
+        profiler.clear()
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            **profiler.status(),
+            'profiles': [record.summary() for record in profiler.records()]
+        }
+    })
+
+
+@app.route('/admin/profiles/<int:profile_id>', methods=['GET'])
+def admin_profile(profile_id):
+    """
+    One capture: top functions and collapsed stacks as JSON, or only the
+    collapsed stacks as text with ?format=collapsed (for flamegraph tools)
+    """
+    auth_error = admin_auth_error()
+    if auth_error:
+        return auth_error
+    
+    record = profiler.get(profile_id)
+    if record is None:
+        return jsonify({
+            'success': False,
+            'error': f'Profile {profile_id} not found (the buffer keeps the last {PROFILE_BUFFER_SIZE})'
+        }), 404
+    
+    if request.args.get('format') == 'collapsed':
+        return app.response_class('\n'.join(record.collapsed) + '\n', mimetype='text/plain')
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            **record.summary(),
+            'top': record.top,
+            'collapsed': record.collapsed
+        }
+    })
+
+
+# ============================================================================
+# WARM-UP
+# ============================================================================
+
+# Synthetic traffic covering every handler's inference path (single rows and
+# batch shapes); sent twice each on a background thread after startup
+WARM_UP_REQUESTS = [
+    WarmUpRequest('GET', '/dropdown-data'),
+    WarmUpRequest('GET', '/statistics'),
+    WarmUpRequest('GET', '/district-insights/Pune'),
+    WarmUpRequest('POST', '/recommend-crop', {'District': 'Pune', 'Soil_Type': 'Black', 'Weather': 'Dry'}),
+    WarmUpRequest('POST', '/recommend-crop/batch', {'records': [
+        {'District': district, 'Soil_Type': soil_type, 'Weather': weather}
+        for district in ['Pune', 'Nashik', 'Raigad', 'Latur', 'Nagpur', 'Ratnagiri', 'Solapur', 'Kolhapur']
+        for soil_type in ['Black', 'Red', 'Laterite', 'Alluvial']
+        for weather in ['Dry', 'Monsoon']
+    ]}),
+    WarmUpRequest('POST', '/predict-nutrients', {
+        'District': 'Nashik', 'Soil_Type': 'Black', 'Weather': 'Moderate Rainfall', 'Crop_Name': 'Grapes'
+    }),
+    WarmUpRequest('POST', '/water-quality-analysis', {'District': 'Raigad', 'Soil_Type': 'Laterite', 'Weather': 'Monsoon'}),
+    WarmUpRequest('POST', '/fertilizer-recommendation', {
+        'Crop_Name': 'Rice', 'Soil_Type': 'Black', 'N_kg_ha': 100, 'P2O5_kg_ha': 50, 'K2O_kg_ha': 40
+    }),
+    WarmUpRequest('POST', '/compare-crops', {
+        'District': 'Latur', 'Soil_Type': 'Black', 'Weather': 'Semi-Arid',
+        'crops': ['Soybean', 'Cotton', 'Chickpea', 'Wheat', 'Sorghum', 'Sugarcane', 'Onion', 'Rice']
+    }),
+    WarmUpRequest('POST', '/advisory', {'District': 'Solapur', 'Soil_Type': 'Black', 'Weather': 'Semi-Arid'})
+]
+
+warm_up = WarmUp(app.test_client, WARM_UP_REQUESTS)
+
+
+# ============================================================================
+# WORKER THREADS
+# ============================================================================
+
+# Threads do not survive fork(): with `gunicorn --preload` this module is
+# imported in the master, so the warm-up, prefetch, verification and watcher
+# threads are started by each worker process on its first request
+_worker_threads_pid = None
+_worker_threads_lock = threading.Lock()
+
+
+@app.before_request
+def start_worker_threads():
+    """Start this process's background threads (no-op after the first request)"""
+    global _worker_threads_pid, warm_up
+    if _worker_threads_pid == os.getpid():
+        return
+    with _worker_threads_lock:
+        if _worker_threads_pid == os.getpid():
+            return
+        _worker_threads_pid = os.getpid()
+    
+    if model_context is not None:
+        start_context_threads(model_context)
+    if model_reloader is not None:
+        model_reloader.start_watcher(MODEL_WATCH_INTERVAL)
+    
+    # A process forked from one that already served gets its own warm-up
+    if warm_up.state != 'pending':
+        warm_up = WarmUp(app.test_client, WARM_UP_REQUESTS)
+    if WARM_UP_ON_START:
+        warm_up.start()
+    else:
+        warm_up.skip()
+
+
+# Load models when app starts (only the manifest is read)
 load_models()
 
 
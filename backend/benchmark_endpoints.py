@@ -0,0 +1,348 @@
+"""
+Endpoint micro-benchmark
+Run: python benchmark_endpoints.py [--requests 200] [--model-dir models] [--output results.json] [--compare baseline.json]
+
+Drives every route of app.py through app.test_client() (no server, no
+network) and reports per-route throughput and p50/p95/p99 latency.
+
+Payloads are sampled from the rows of the training dataset, so the mix of
+districts, soils, weathers and crops follows the dataset's own frequencies
+and every request is a valid combination the models were trained on:
+
+- /recommend-crop, /water-quality-analysis, /advisory: (District, Soil_Type, Weather) of a row
+- /predict-nutrients: the same plus the row's Crop_Name
+- /fertilizer-recommendation: Crop_Name, Soil_Type and N/P/K of a row
+- /compare-crops: a row's conditions with 3-5 crops grown in its district
+- /recommend-crop/batch: --batch-size rows per request
+- /district-insights/<district_name>: a row's district
+
+Admin calls that change server state (POST /admin/reload, DELETE and POST
+on /admin/timings and /admin/profiles) are listed as skipped. The response
+cache is disabled unless --cache is given, so inference is measured rather
+than cache hits.
+
+Results are written as JSON (per-route latencies plus the commit, model
+version and configuration they were measured with); --compare prints the
+change against an earlier results file, e.g. one from the previous commit.
+Server logs go to stderr (add 2>/dev/null for just the report).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+ADMIN_TOKEN = 'benchmark'
+DEFAULT_OUTPUT_DIR = os.path.join(BACKEND_DIR, 'benchmark_results')
+
+# (method, rule) -> why it is not benchmarked
+SKIPPED = {
+    ('POST', '/admin/reload'): 'reloads the model bundle',
+    ('DELETE', '/admin/timings'): 'resets the timing aggregates',
+    ('POST', '/admin/profiles'): 'changes the profiler sample rate',
+    ('DELETE', '/admin/profiles'): 'clears the profile buffer',
+}
+
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+
+def _conditions(row):
+    return {'District': row['District'], 'Soil_Type': row['Soil_Type'], 'Weather': row['Weather']}
+
+
+class PayloadMix:
+    """Request payloads sampled from dataset rows"""
+
+    def __init__(self, df, seed, batch_size):
+        self.rows = df.to_dict('records')
+        self.rng = np.random.RandomState(seed)
+        self.batch_size = batch_size
+        self.district_crops = {
+            district: sorted(crops)
+            for district, crops in df.groupby('District')['Crop_Name'].unique().items()
+        }
+
+    def row(self):
+        return self.rows[self.rng.randint(len(self.rows))]
+
+    def conditions(self):
+        return _conditions(self.row())
+
+    def nutrients(self):
+        row = self.row()
+        return {**_conditions(row), 'Crop_Name': row['Crop_Name']}
+
+    def fertilizer(self):
+        row = self.row()
+        return {
+            'Crop_Name': row['Crop_Name'],
+            'Soil_Type': row['Soil_Type'],
+            'N_kg_ha': round(float(row['N_kg_ha']), 1),
+            'P2O5_kg_ha': round(float(row['P2O5_kg_ha']), 1),
+            'K2O_kg_ha': round(float(row['K2O_kg_ha']), 1)
+        }
+
+    def comparison(self):
+        row = self.row()
+        others = [crop for crop in self.district_crops[row['District']] if crop != row['Crop_Name']]
+        n_others = min(len(others), self.rng.randint(2, 5))
+        crops = [row['Crop_Name']] + [str(c) for c in self.rng.choice(others, n_others, replace=False)]
+        return {**_conditions(row), 'crops': crops}
+
+    def batch(self):
+        return {'records': [self.conditions() for _ in range(self.batch_size)]}
+
+    def insights_path(self):
+        return f"/district-insights/{quote(self.row()['District'])}"
+
+
+def scenarios(mix, profile_id):
+    """(method, rule) -> function returning (path, JSON body or None) of the next request"""
+    fixed = lambda path: (lambda: (path, None))
+    return {
+        ('GET', '/health'): fixed('/health'),
+        ('GET', '/ready'): fixed('/ready'),
+        ('GET', '/metrics'): fixed('/metrics'),
+        ('GET', '/dropdown-data'): fixed('/dropdown-data'),
+        ('GET', '/statistics'): fixed('/statistics'),
+        ('GET', '/district-insights/<district_name>'): lambda: (mix.insights_path(), None),
+        ('POST', '/recommend-crop'): lambda: ('/recommend-crop', mix.conditions()),
+        ('POST', '/recommend-crop/batch'): lambda: ('/recommend-crop/batch', mix.batch()),
+        ('POST', '/predict-nutrients'): lambda: ('/predict-nutrients', mix.nutrients()),
+        ('POST', '/water-quality-analysis'): lambda: ('/water-quality-analysis', mix.conditions()),
+        ('POST', '/fertilizer-recommendation'): lambda: ('/fertilizer-recommendation', mix.fertilizer()),
+        ('POST', '/compare-crops'): lambda: ('/compare-crops', mix.comparison()),
+        ('POST', '/advisory'): lambda: ('/advisory', mix.conditions()),
+        ('GET', '/admin/reload'): fixed('/admin/reload'),
+        ('GET', '/admin/timings'): fixed('/admin/timings'),
+        ('GET', '/admin/profiles'): fixed('/admin/profiles'),
+        ('GET', '/admin/profiles/<int:profile_id>'): fixed(f'/admin/profiles/{profile_id}'),
+    }
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def git_commit():
+    """Short commit hash of the working tree ('+dirty' with uncommitted changes)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f'{commit}+dirty' if dirty else commit
+
+
+def app_routes(flask_app):
+    """(method, rule) of every route, HEAD/OPTIONS and static files excluded"""
+    routes = []
+    for rule in flask_app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            routes.append((method, rule.rule))
+    return sorted(routes, key=lambda route: (route[1], route[0]))
+
+
+def run_route(client, method, next_request, n_requests, n_warmup, headers):
+    """Sends n_warmup untimed and n_requests timed requests, one at a time"""
+    for _ in range(n_warmup):
+        path, body = next_request()
+        client.open(path, method=method, json=body, headers=headers).get_data()
+
+    requests = [next_request() for _ in range(n_requests)]
+    latencies = np.empty(n_requests)
+    status_counts = {}
+    response_bytes = 0
+    wall_start = time.perf_counter()
+    for i, (path, body) in enumerate(requests):
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        data = response.get_data()
+        latencies[i] = time.perf_counter() - start
+        status_counts[str(response.status_code)] = status_counts.get(str(response.status_code), 0) + 1
+        response_bytes += len(data)
+    wall = time.perf_counter() - wall_start
+
+    ms = latencies * 1000
+    return {
+        'requests': n_requests,
+        'errors': sum(n for status, n in status_counts.items() if not status.startswith('2')),
+        'status_counts': status_counts,
+        'throughput_rps': round(n_requests / wall, 1),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3),
+        'mean_response_bytes': int(response_bytes / n_requests)
+    }
+
+
+def benchmark(args):
+    # Configuration is read from the environment when config.py is imported
+    os.environ['ADMIN_TOKEN'] = ADMIN_TOKEN
+    os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp(prefix='benchmark_metrics_'))
+    os.environ.setdefault('PROFILE_SAMPLE_RATE', '0')
+    os.environ.setdefault('SERVER_TIMING', 'true')     # per-stage means in the results
+    if args.model_dir:
+        os.environ['MODEL_BUNDLE_DIR'] = os.path.abspath(args.model_dir)
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_SIZE'] = '0'
+
+    import config
+    import app as server
+
+    if not server.warm_up.wait(timeout=300):
+        print("  ! Warm-up did not finish within 300 s")
+    ctx = server.model_context
+    client = server.app.test_client()
+    headers = {'Authorization': f'Bearer {ADMIN_TOKEN}'}
+
+    # One on-demand capture so /admin/profiles/<id> has something to serve
+    profiled = client.get('/dropdown-data', headers={**headers, 'X-Profile': '1'})
+    profile_id = int(profiled.headers.get('X-Profile-Id', 1))
+
+    mix = PayloadMix(server._load_dataset(), args.seed, args.batch_size)
+    available = scenarios(mix, profile_id)
+    selected = set(args.routes.split(',')) if args.routes else None
+
+    results, skipped = {}, {}
+    for method, rule in app_routes(server.app):
+        name = f'{method} {rule}'
+        if selected is not None and rule not in selected:
+            continue
+        if (method, rule) in SKIPPED:
+            skipped[name] = SKIPPED[(method, rule)]
+            continue
+        if (method, rule) not in available:
+            skipped[name] = 'no payload generator (add one to scenarios())'
+            continue
+
+        if server.timing_stats is not None:
+            server.timing_stats.reset()
+        result = run_route(client, method, available[(method, rule)], args.requests, args.warmup, headers)
+        if server.timing_stats is not None:
+            stages = server.timing_stats.snapshot().get(rule, {})
+            result['stages_mean_ms'] = {stage: s['mean_ms'] for stage, s in stages.items()}
+        results[name] = result
+        print(f"  {name:<45}{result['p50_ms']:>9.2f} ms p50{result['throughput_rps']:>10.1f} req/s"
+              + (f"   {result['errors']} errors" if result['errors'] else ''))
+
+    meta = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'model_dir': config.MODEL_BUNDLE_DIR,
+        'model_version': ctx.version if ctx is not None else None,
+        'requests_per_route': args.requests,
+        'warmup_per_route': args.warmup,
+        'batch_size': args.batch_size,
+        'seed': args.seed,
+        'config': {
+            'RESPONSE_CACHE_SIZE': config.RESPONSE_CACHE_SIZE,
+            'RESPONSE_CACHE_BACKEND': config.RESPONSE_CACHE_BACKEND,
+            'USE_PREDICTION_CUBE': config.USE_PREDICTION_CUBE,
+            'USE_FOREST_ENGINE': config.USE_FOREST_ENGINE,
+            'USE_MLP_ENGINE': config.USE_MLP_ENGINE,
+            'SERVER_TIMING': config.SERVER_TIMING,
+            'METRICS_ENABLED': config.METRICS_ENABLED
+        }
+    }
+    return {'meta': meta, 'routes': results, 'skipped': skipped}
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def print_results(report):
+    meta = report['meta']
+    print("\n" + "="*86)
+    print(f"RESULTS (commit {meta['commit']}, model {meta['model_version']}, "
+          f"{meta['requests_per_route']} requests per route)")
+    print("="*86)
+    print(f"  {'route':<45}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'errors':>8}")
+    for name, r in report['routes'].items():
+        print(f"  {name:<45}{r['throughput_rps']:>8.1f}{r['p50_ms']:>8.2f}{r['p95_ms']:>8.2f}"
+              f"{r['p99_ms']:>8.2f}{r['errors']:>8}")
+    for name, reason in report['skipped'].items():
+        print(f"  {name:<45}skipped: {reason}")
+
+
+def _change(old, new):
+    if not old:
+        return '     n/a'
+    return f'{(new - old) / old:>+8.1%}'
+
+
+def print_comparison(baseline, report):
+    old_meta, new_meta = baseline['meta'], report['meta']
+    print("\n" + "="*86)
+    print(f"COMPARISON: {old_meta.get('commit')} -> {new_meta.get('commit')}")
+    print("="*86)
+    for key in ('model_version', 'requests_per_route', 'batch_size', 'seed', 'config'):
+        if old_meta.get(key) != new_meta.get(key):
+            print(f"  ! {key} differs: {old_meta.get(key)} -> {new_meta.get(key)}")
+    print(f"  {'route':<45}{'p50 ms':>17}{'Δ':>8}{'p99 ms':>17}{'Δ':>8}{'req/s Δ':>9}")
+    for name, new in report['routes'].items():
+        old = baseline['routes'].get(name)
+        if old is None:
+            print(f"  {name:<45}(not in baseline)")
+            continue
+        print(f"  {name:<45}{old['p50_ms']:>7.2f} -> {new['p50_ms']:<6.2f}{_change(old['p50_ms'], new['p50_ms'])}"
+              f"{old['p99_ms']:>7.2f} -> {new['p99_ms']:<6.2f}{_change(old['p99_ms'], new['p99_ms'])}"
+              f"{_change(old['throughput_rps'], new['throughput_rps']):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Endpoint micro-benchmark (Flask test client)')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per route')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per route before timing')
+    parser.add_argument('--batch-size', type=int, default=100, help='Records per /recommend-crop/batch request')
+    parser.add_argument('--routes', default=None, help='Comma-separated route rules (default: all)')
+    parser.add_argument('--seed', type=int, default=42, help='Payload sampling seed')
+    parser.add_argument('--model-dir', default=None, help='Model bundle directory (default: MODEL_BUNDLE_DIR)')
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache enabled')
+    parser.add_argument('--output', default=None,
+                        help='Results file (default: benchmark_results/endpoints-<commit>.json)')
+    parser.add_argument('--compare', default=None, help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    print("="*86)
+    print(f"ENDPOINT BENCHMARK ({args.requests} requests per route, seed {args.seed}, "
+          f"response cache {'on' if args.cache else 'off'})")
+    print("="*86)
+
+    report = benchmark(args)
+    print_results(report)
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"endpoints-{report['meta']['commit'] or 'unknown'}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
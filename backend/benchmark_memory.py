@@ -0,0 +1,140 @@
+"""
+Memory benchmark for multi-worker deployments
+Run: python benchmark_memory.py [--workers 2] [--modes mmap,private,sklearn]
+
+Starts N independent worker processes per mode (like `gunicorn app:app`
+without --preload: every worker imports app.py and runs load_models()),
+serves a few requests in each, and reports per-worker memory from
+/proc/<pid>/smaps_rollup:
+
+- RSS: resident pages, counting shared pages fully in every worker
+- PSS: shared pages divided between the processes mapping them
+- USS: pages private to the worker (what each extra worker really costs)
+
+Modes:
+- mmap:    exported artifacts memory-mapped (default deployment)
+- private: exported artifacts loaded into private memory
+- sklearn: pickled sklearn models, cube in private memory
+
+Linux only (needs /proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+MODES = {
+    'mmap': {},
+    'private': {'MMAP_MODEL_ARTIFACTS': 'false'},
+    'sklearn': {'MMAP_MODEL_ARTIFACTS': 'false', 'USE_FOREST_ENGINE': 'false', 'USE_MLP_ENGINE': 'false'}
+}
+
+SAMPLE_REQUESTS = [
+    ('/recommend-crop', {'District': 'Pune', 'Soil_Type': 'Black', 'Weather': 'Dry'}),
+    ('/predict-nutrients', {'District': 'Nashik', 'Soil_Type': 'Black', 'Weather': 'Moderate Rainfall', 'Crop_Name': 'Grapes'}),
+    ('/water-quality-analysis', {'District': 'Raigad', 'Soil_Type': 'Laterite', 'Weather': 'Monsoon'}),
+    ('/compare-crops', {'District': 'Latur', 'Soil_Type': 'Black', 'Weather': 'Semi-Arid', 'crops': ['Soybean', 'Cotton', 'Tur']})
+]
+
+
+def run_worker():
+    """Worker process: load the app, serve sample requests, then wait"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as flask_app
+
+    client = flask_app.app.test_client()
+    for path, payload in SAMPLE_REQUESTS:
+        client.post(path, json=payload)
+
+    # Touch every tree / layer once, as a worker does after some traffic
+    rng = np.random.RandomState(0)
+    for model in flask_app.model_context.models.values():
+        X = rng.randint(0, 40, size=(2000, model.n_features_in_))
+        model.predict(X)
+
+    print('READY', flush=True)
+    sys.stdin.read()  # Exit when the benchmark closes stdin
+
+
+def read_memory(pid):
+    """RSS / PSS / USS of a process in MB"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+
+    return {
+        'rss': fields.get('Rss', 0.0),
+        'pss': fields.get('Pss', 0.0),
+        'uss': fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0)
+    }
+
+
+def benchmark_mode(mode, n_workers):
+    env = dict(os.environ, **MODES[mode])
+    workers = []
+    start = time.perf_counter()
+    for _ in range(n_workers):
+        workers.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker'],
+            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True
+        ))
+
+    try:
+        for worker in workers:
+            # Skip the app's startup output until the worker reports in
+            for line in worker.stdout:
+                if line.strip() == 'READY':
+                    break
+            else:
+                raise RuntimeError(f"Worker {worker.pid} failed to start (mode {mode})")
+        startup = time.perf_counter() - start
+        stats = [read_memory(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+    print(f"\nMode: {mode} ({n_workers} workers, ready in {startup:.1f}s)")
+    print(f"  {'worker':<8}{'RSS MB':>10}{'PSS MB':>10}{'USS MB':>10}")
+    for i, s in enumerate(stats):
+        print(f"  {i:<8}{s['rss']:>10.1f}{s['pss']:>10.1f}{s['uss']:>10.1f}")
+    print(f"  {'total':<8}{sum(s['rss'] for s in stats):>10.1f}"
+          f"{sum(s['pss'] for s in stats):>10.1f}{sum(s['uss'] for s in stats):>10.1f}")
+    return stats
+
+
+if __name__ == "__main__":
+    if '--worker' in sys.argv:
+        run_worker()
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Per-worker memory benchmark')
+    parser.add_argument('--workers', type=int, default=2, help='Workers per mode')
+    parser.add_argument('--modes', default='mmap,private,sklearn',
+                        help=f"Comma-separated modes ({', '.join(MODES)})")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("This benchmark needs Linux /proc/<pid>/smaps_rollup")
+        sys.exit(1)
+
+    print("="*70)
+    print("WORKER MEMORY BENCHMARK")
+    print("="*70)
+
+    results = {mode: benchmark_mode(mode, args.workers) for mode in args.modes.split(',')}
+
+    print("\n" + "="*70)
+    print(f"  {'mode':<10}{'PSS/worker':>12}{'USS/worker':>12}")
+    for mode, stats in results.items():
+        print(f"  {mode:<10}{np.mean([s['pss'] for s in stats]):>12.1f}"
+              f"{np.mean([s['uss'] for s in stats]):>12.1f}")
+    print("="*70)
@@ -0,0 +1,159 @@
+"""
+Response cache backend benchmark
+Run: python benchmark_response_cache.py [--workers 4] [--seconds 2] [--backends memory,shm,sqlite]
+
+For every backend, N worker processes (like gunicorn workers) run:
+
+1. Hit latency / throughput: all keys are cached; each worker reads random
+   keys for a fixed time and records the latency of every get()
+2. Shared warm-up: each worker replays a skewed request stream (a few hundred
+   popular keys), computing and storing a response on every miss. With a
+   per-worker cache every worker pays for each key once; with a shared
+   backend one worker's result is reused by the others
+
+POSIX only (fork, fcntl).
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.response_cache import create_response_cache, response_cache_key
+
+N_KEYS = 500            # Popular (district, soil, weather) combinations
+BODY_BYTES = 2048       # Typical /recommend-crop response
+COMPUTE_SECONDS = 0.002 # Cost of an uncached inference request
+STREAM_REQUESTS = 3000  # Requests per worker in the shared warm-up phase
+
+# Names of the shared caches (forked workers inherit the parent's value)
+RUN_ID = os.getpid()
+
+
+def _keys():
+    return [response_cache_key('/recommend-crop', 'bench', {'i': i}) for i in range(N_KEYS)]
+
+
+def _open_cache(backend, tag):
+    return create_response_cache(
+        backend, max_entries=4096, shm_name=f'bench_{RUN_ID}_{tag}',
+        sqlite_path=os.path.join(tempfile.gettempdir(), f'bench_{RUN_ID}_{tag}.sqlite3')
+    )
+
+
+def hit_worker(cache, keys, seconds, seed, results):
+    """Random cached reads for `seconds`; reports per-get latencies in µs"""
+    rng = np.random.RandomState(seed)
+    order = rng.randint(0, len(keys), size=1_000_000)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        key = keys[order[i % len(order)]]
+        start = time.perf_counter_ns()
+        body = cache.get(key)
+        latencies.append(time.perf_counter_ns() - start)
+        assert body is not None
+        i += 1
+    results.put(np.array(latencies) / 1000)
+
+
+def stream_worker(open_cache, keys, seed, results):
+    """Skewed request stream; misses are computed and stored"""
+    cache = open_cache()
+    rng = np.random.RandomState(seed)
+    # Zipf-like popularity: a few combinations get most of the traffic
+    weights = 1.0 / np.arange(1, len(keys) + 1)
+    stream = rng.choice(len(keys), size=STREAM_REQUESTS, p=weights / weights.sum())
+
+    computed = 0
+    start = time.perf_counter()
+    for k in stream:
+        if cache.get(keys[k]) is None:
+            time.sleep(COMPUTE_SECONDS)
+            cache.put(keys[k], b'x' * BODY_BYTES)
+            computed += 1
+    results.put((computed, time.perf_counter() - start))
+
+
+def run_workers(target, args_for, n_workers):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=target, args=(*args_for(i), results)) for i in range(n_workers)]
+    for worker in workers:
+        worker.start()
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return collected
+
+
+def benchmark_backend(backend, n_workers, seconds):
+    keys = _keys()
+    body = b'x' * BODY_BYTES
+
+    # 1. Hit latency (cache filled before the workers fork)
+    cache = _open_cache(backend, 'hit')
+    for key in keys:
+        cache.put(key, body)
+    latencies = run_workers(hit_worker, lambda i: (cache, keys, seconds, i), n_workers)
+    all_latencies = np.concatenate(latencies)
+    throughput = sum(len(l) for l in latencies) / seconds
+
+    # 2. Shared warm-up (empty cache, opened inside each worker)
+    stream_cache = _open_cache(backend, 'stream')
+    stream_cache.clear()
+    streams = run_workers(stream_worker, lambda i: (lambda: _open_cache(backend, 'stream'), keys, 100 + i), n_workers)
+    computed = sum(c for c, _ in streams)
+    total = STREAM_REQUESTS * n_workers
+
+    for c in (cache, stream_cache):
+        c.clear()
+        if hasattr(c, 'unlink'):
+            c.unlink()
+        c.close()
+        if backend == 'sqlite':
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(c.path + suffix):
+                    os.remove(c.path + suffix)
+
+    return {
+        'p50': np.percentile(all_latencies, 50),
+        'p99': np.percentile(all_latencies, 99),
+        'throughput': throughput,
+        'computed': computed,
+        'hit_rate': 1 - computed / total,
+        'stream_seconds': max(s for _, s in streams)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Response cache backend benchmark')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Duration of the hit phase')
+    parser.add_argument('--backends', default='memory,shm,sqlite', help='Comma-separated backends')
+    args = parser.parse_args()
+
+    print("="*78)
+    print(f"RESPONSE CACHE BENCHMARK ({args.workers} workers, {N_KEYS} keys, {BODY_BYTES} B bodies)")
+    print("="*78)
+
+    results = {}
+    for backend in args.backends.split(','):
+        results[backend] = benchmark_backend(backend, args.workers, args.seconds)
+        print(f"  {backend} done")
+
+    print(f"\n  {'backend':<9}{'hit p50 µs':>12}{'hit p99 µs':>12}{'gets/s':>12}"
+          f"{'computed':>10}{'hit rate':>10}{'stream s':>10}")
+    for backend, r in results.items():
+        print(f"  {backend:<9}{r['p50']:>12.1f}{r['p99']:>12.1f}{r['throughput']:>12.0f}"
+              f"{r['computed']:>10}{r['hit_rate']:>10.1%}{r['stream_seconds']:>10.2f}")
+    print("="*78)
+    print(f"computed = responses computed across all workers for "
+          f"{STREAM_REQUESTS * args.workers} requests ({COMPUTE_SECONDS * 1000:.0f} ms each)")
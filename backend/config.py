@@ -3,6 +3,7 @@ Configuration file for Smart Farmer Recommender System
 """
 
 import os
+import tempfile
 
 # Base directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +22,113 @@ FERTILIZER_MODEL_FILE = 'fertilizer_recommender.pkl'
 ENCODER_FILE = 'encoders.pkl'
 SCALER_FILE = 'scalers.pkl'
 
+# Model bundle: directory with the trained artifacts and their manifest.json
+# (utils/model_bundle.py); components are loaded in parallel threads
+MODEL_BUNDLE_DIR = os.environ.get('MODEL_BUNDLE_DIR', MODEL_DIR)
+MODEL_LOAD_THREADS = int(os.environ.get('MODEL_LOAD_THREADS', 4))
+
+# Components are loaded on first use; MODEL_PREFETCH loads them in the
+# background after startup: 'all', 'none' or a comma-separated list of
+# component names (e.g. 'dataset_insights,crop')
+MODEL_PREFETCH = os.environ.get('MODEL_PREFETCH', 'all').strip().lower()
+
+# Replay synthetic requests through every endpoint after startup; /ready
+# returns 503 until this warm-up has finished (/health always returns 200)
+WARM_UP_ON_START = os.environ.get('WARM_UP_ON_START', 'true').lower() == 'true'
+
+# Response cache of the POST inference endpoints: entries kept (LRU, 0
+# disables the cache) and seconds each entry stays valid (0 = no expiry)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 2048))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 0))
+
+# Cache backend: 'memory' (per worker), 'shm' (shared memory hash table) or
+# 'sqlite' (WAL file); the shared backends serve all workers on the host
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').lower()
+RESPONSE_CACHE_SHM_NAME = os.environ.get('RESPONSE_CACHE_SHM_NAME', 'smart_farmer_responses')
+RESPONSE_CACHE_SLOT_BYTES = int(os.environ.get('RESPONSE_CACHE_SLOT_BYTES', 16384))
+RESPONSE_CACHE_SQLITE_PATH = os.environ.get(
+    'RESPONSE_CACHE_SQLITE_PATH',
+    os.path.join(tempfile.gettempdir(), 'smart_farmer_responses.sqlite3')
+)
+
+# Identical concurrent inference requests wait for one shared computation,
+# for up to SINGLE_FLIGHT_TIMEOUT seconds (match the server's request timeout,
+# e.g. gunicorn --timeout) before answering 504
+SINGLE_FLIGHT = os.environ.get('SINGLE_FLIGHT', 'true').lower() == 'true'
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 30))
+
+# Per-stage request timings (Server-Timing header + in-process aggregates).
+# Off by default: the header exposes internal stage names and timings to
+# every client
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'false').lower() == 'true'
+
+# Prometheus /metrics; each worker snapshots its metrics to METRICS_DIR every
+# METRICS_FLUSH_INTERVAL seconds and /metrics merges all workers. Metrics are
+# off unless METRICS_DIR is set: it must be a directory private to this
+# deployment (created with mode 0700), not a shared location such as /tmp
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_ENABLED = bool(METRICS_DIR) and os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+
+# cProfile captures: fraction of requests sampled (0.001 = 1 in 1000, 0 = only
+# on demand with 'X-Profile: 1' + admin token), captures kept and functions per capture
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_BUFFER_SIZE = int(os.environ.get('PROFILE_BUFFER_SIZE', 50))
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 25))
+
+# Structured request log for traffic replay (replay_traffic.py): one JSON line
+# per request (route, normalized payload, latency, status; warm-up excluded),
+# shared by all workers. Empty disables it. The file is rotated at
+# REQUEST_LOG_MAX_BYTES keeping REQUEST_LOG_BACKUPS old files; lines longer
+# than REQUEST_LOG_MAX_PAYLOAD_BYTES are logged without their payload
+REQUEST_LOG_PATH = os.environ.get('REQUEST_LOG_PATH', '')
+REQUEST_LOG_MAX_BYTES = int(os.environ.get('REQUEST_LOG_MAX_BYTES', 50 * 1024 * 1024))
+REQUEST_LOG_BACKUPS = int(os.environ.get('REQUEST_LOG_BACKUPS', 5))
+REQUEST_LOG_MAX_PAYLOAD_BYTES = int(os.environ.get('REQUEST_LOG_MAX_PAYLOAD_BYTES', 65536))
+
+# Hot reload: seconds between bundle change checks (0 disables the watcher);
+# the /admin/reload endpoint requires 'Authorization: Bearer <ADMIN_TOKEN>'
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Exported arrays (forests, MLP weights, cube) are stored as .npy artifact
+# directories and memory-mapped, so all gunicorn workers share one copy
+MMAP_MODEL_ARTIFACTS = os.environ.get('MMAP_MODEL_ARTIFACTS', 'true').lower() == 'true'
+
+# Precomputed prediction cube (cached model outputs over all categorical inputs)
+PREDICTION_CUBE_DIR = 'prediction_cube'
+USE_PREDICTION_CUBE = os.environ.get('USE_PREDICTION_CUBE', 'true').lower() == 'true'
+
+# Flattened random forests served by the pure-NumPy engine (utils/forest_engine.py)
+USE_FOREST_ENGINE = os.environ.get('USE_FOREST_ENGINE', 'true').lower() == 'true'
+FLAT_FOREST_DIRS = {
+    'crop': 'crop_recommender.forest',
+    'water': 'water_quality_predictor.forest',
+    'fertilizer': 'fertilizer_recommender.forest'
+}
+
+# Exported nutrient MLP weights served by the NumPy forward pass (utils/mlp_engine.py)
+USE_MLP_ENGINE = os.environ.get('USE_MLP_ENGINE', 'true').lower() == 'true'
+MLP_ENGINE_DIR = 'nutrient_predictor.mlp'
+
+# Browser/proxy cache lifetime (seconds) for the dataset insight endpoints
+INSIGHTS_CACHE_MAX_AGE = int(os.environ.get('INSIGHTS_CACHE_MAX_AGE', 3600))
+
+# Model input feature order (must match the order used at serving time)
+CROP_FEATURES = ['District', 'Soil_Type', 'Weather', 'Zone']
+NUTRIENT_FEATURES = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone', 'NPK_Ratio', 'Total_Nutrients']
+WATER_FEATURES = ['District', 'Weather', 'Soil_Type', 'Zone']
+FERTILIZER_FEATURES = ['Crop_Name', 'Soil_Type', 'N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha']
+
+# Maximum number of records accepted by batch endpoints
+MAX_BATCH_RECORDS = int(os.environ.get('MAX_BATCH_RECORDS', 5000))
+
+# Default values for the derived nutrient features (not known at request time)
+NUTRIENT_FEATURE_DEFAULTS = {
+    'NPK_Ratio': 1.0,
+    'Total_Nutrients': 200.0
+}
+
 # Maharashtra Agricultural Zones (All 36 districts)
 AGRICULTURAL_ZONES = {
     'Konkan': ['Thane', 'Palghar', 'Raigad', 'Ratnagiri', 'Sindhudurg', 'Mumbai City', 'Mumbai Suburban'],
@@ -0,0 +1,105 @@
+"""
+Export trained models to plain NumPy arrays for the inference engines
+(random forests -> forest engine, nutrient MLP -> MLP engine)
+Run after training: python export_models.py
+
+The app also re-exports automatically when a .pkl is newer than its export,
+but running this after training keeps the first request after a deploy fast
+and verifies that the engine reproduces sklearn's outputs exactly.
+"""
+
+import os
+import sys
+
+import numpy as np
+import joblib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import (
+    MODEL_DIR, CROP_MODEL_FILE, WATER_MODEL_FILE, FERTILIZER_MODEL_FILE, FLAT_FOREST_DIRS,
+    NUTRIENT_MODEL_FILE, MLP_ENGINE_DIR
+)
+from utils.artifact_store import artifact_size
+from utils.forest_engine import flatten_forest, is_flattenable
+from utils.mlp_engine import export_mlp, is_exportable
+from utils.prediction_cube import model_fingerprint
+
+
+def export_forest(name, model_file, n_check_rows=2000):
+    """Flatten one forest, check it against sklearn and save it"""
+    model_path = os.path.join(MODEL_DIR, model_file)
+    flat_path = os.path.join(MODEL_DIR, FLAT_FOREST_DIRS[name])
+
+    if not os.path.exists(model_path):
+        print(f"  - {model_file}: not found, skipped")
+        return False
+
+    model = joblib.load(model_path)
+    if not is_flattenable(model):
+        print(f"  - {model_file}: {type(model).__name__} is not a flattenable forest, skipped")
+        return False
+
+    forest = flatten_forest(model, model_fingerprint([model_path]))
+
+    # Verify on random integer-coded inputs (all features are label IDs / kg values)
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 400, size=(n_check_rows, model.n_features_in_))
+    if forest.is_classifier:
+        identical = np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    else:
+        identical = np.array_equal(forest.predict(X), model.predict(X))
+
+    if not identical:
+        print(f"  ✗ {model_file}: flattened outputs differ from sklearn, not exported")
+        return False
+
+    forest.save(flat_path)
+    print(f"  ✓ {model_file} → {os.path.basename(flat_path)} "
+          f"({forest.n_estimators} trees, {len(forest.feature):,} nodes, "
+          f"{os.path.getsize(model_path) / 1e6:.1f} MB → {artifact_size(flat_path) / 1e6:.1f} MB)")
+    return True
+
+
+def export_nutrient_mlp(n_check_rows=2000):
+    """Export the nutrient MLP weights, check them against sklearn and save them"""
+    model_path = os.path.join(MODEL_DIR, NUTRIENT_MODEL_FILE)
+    engine_path = os.path.join(MODEL_DIR, MLP_ENGINE_DIR)
+
+    if not os.path.exists(model_path):
+        print(f"  - {NUTRIENT_MODEL_FILE}: not found, skipped")
+        return False
+
+    model = joblib.load(model_path)
+    if not is_exportable(model):
+        print(f"  - {NUTRIENT_MODEL_FILE}: {type(model).__name__} is not an exportable MLP, skipped")
+        return False
+
+    # Served on unscaled inputs, so nothing is folded (outputs stay bit-identical)
+    engine = export_mlp(model, fingerprint=model_fingerprint([model_path]))
+
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 400, size=(n_check_rows, model.n_features_in_))
+    if not np.array_equal(engine.predict(X), model.predict(X)):
+        print(f"  ✗ {NUTRIENT_MODEL_FILE}: exported outputs differ from sklearn, not exported")
+        return False
+
+    engine.save(engine_path)
+    print(f"  ✓ {NUTRIENT_MODEL_FILE} → {MLP_ENGINE_DIR} "
+          f"(layers {engine.layer_sizes}, "
+          f"{os.path.getsize(model_path) / 1e3:.0f} KB → {artifact_size(engine_path) / 1e3:.0f} KB)")
+    return True
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("EXPORTING MODELS")
+    print("="*70)
+
+    for name, model_file in [('crop', CROP_MODEL_FILE),
+                             ('water', WATER_MODEL_FILE),
+                             ('fertilizer', FERTILIZER_MODEL_FILE)]:
+        export_forest(name, model_file)
+    export_nutrient_mlp()
+
+    print("="*70)
@@ -0,0 +1,240 @@
+"""
+Traffic replay load generator
+Run: python replay_traffic.py requests.jsonl [--target http://127.0.0.1:8000] [--speedup 1,5,20] [--threads 32]
+
+Re-fires a request log written with REQUEST_LOG_PATH (utils/request_log.py)
+against a running server, keeping the recorded mix of routes and payloads
+and the recorded arrival times divided by the speed-up factor. For capacity
+planning, this reproduces real skew (popular districts, burst patterns,
+batch sizes), which uniform random payloads do not.
+
+Start the target without REQUEST_LOG_PATH (or with another file) so the
+replay is not appended to the log it reads, e.g.:
+
+    gunicorn app:app --workers 4 --threads 4 --bind 127.0.0.1:8000
+
+Requests are sent by a pool of --threads client threads, each with its own
+keep-alive connection. A scheduler hands every request to the pool at its
+due time. If all threads are busy, requests start late. Each request's
+delay behind schedule is reported as lag. A high lag p99 means the client,
+not the server, limited the rate (add --threads, or run the client on
+another host). Latencies are measured
+from the actual send.
+
+For each speed-up, the report lists offered and achieved throughput, the
+status codes, and the latency distribution overall and per route. It also
+shows the latency recorded in the log, for reference. Admin routes are
+skipped unless --include-admin is given.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.request_log import read_request_log
+
+
+def load_requests(paths, include_admin, limit):
+    """Replayable records of the logs (rotated files included), by arrival time"""
+    records, skipped = [], {'admin': 0, 'payload_omitted': 0}
+    for path in paths:
+        for record in read_request_log(path):
+            if record.get('payload_omitted'):
+                skipped['payload_omitted'] += 1
+            elif record['path'].startswith('/admin/') and not include_admin:
+                skipped['admin'] += 1
+            else:
+                records.append(record)
+    records.sort(key=lambda record: record['ts'])
+    if limit:
+        records = records[:limit]
+    return records, skipped
+
+
+class Client:
+    """One keep-alive HTTP connection per thread"""
+
+    def __init__(self, target, timeout):
+        url = urlsplit(target)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def send(self, record):
+        """(status or None on connection error, seconds, response bytes)"""
+        # Logged paths are decoded ('/district-insights/Mumbai City')
+        path = quote(record['path']) + (f"?{record['query']}" if record.get('query') else '')
+        body, headers = None, {}
+        if record.get('payload') is not None:
+            body = json.dumps(record['payload']).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        for attempt in range(2):
+            connection = self._connection()
+            start = time.perf_counter()
+            try:
+                connection.request(record['method'], path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                return response.status, time.perf_counter() - start, len(data)
+            except (OSError, http.client.HTTPException):
+                # Server closed the keep-alive connection: retry once on a new one
+                connection.close()
+                self._local.connection = None
+                if attempt == 1:
+                    return None, time.perf_counter() - start, 0
+
+
+def replay(records, client, speedup, threads):
+    """Sends the records at their recorded offsets / speedup; returns per-request results"""
+    results = [None] * len(records)
+    first_ts = records[0]['ts']
+
+    def run(i, due):
+        lag = time.perf_counter() - due
+        status, seconds, size = client.send(records[i])
+        results[i] = (status, seconds, lag, size)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        for i, record in enumerate(records):
+            due = start + (record['ts'] - first_ts) / speedup
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, i, due)
+    wall = time.perf_counter() - start
+    return results, wall
+
+
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    if len(ms) == 0:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3)
+    }
+
+
+def summarize(records, results, wall, speedup):
+    span = records[-1]['ts'] - records[0]['ts']
+    status_counts = {}
+    by_route = {}
+    for record, (status, seconds, lag, _) in zip(records, results):
+        key = 'error' if status is None else str(status)
+        status_counts[key] = status_counts.get(key, 0) + 1
+        route = by_route.setdefault(f"{record['method']} {record['route']}", {'latency': [], 'logged': []})
+        if status is not None:
+            route['latency'].append(seconds)
+        route['logged'].append(record['latency_ms'] / 1000)
+
+    completed = [seconds for status, seconds, _, _ in results if status is not None]
+    return {
+        'speedup': speedup,
+        'requests': len(records),
+        'offered_rps': round(len(records) / (span / speedup), 1) if span > 0 else None,
+        'achieved_rps': round(len(completed) / wall, 1),
+        'wall_seconds': round(wall, 3),
+        'status_counts': status_counts,
+        'latency': _percentiles(completed),
+        'lag': _percentiles([lag for _, _, lag, _ in results]),
+        'routes': {
+            name: {
+                'requests': len(route['logged']),
+                **_percentiles(route['latency']),
+                'logged_p50_ms': round(float(np.percentile(route['logged'], 50)) * 1000, 3)
+            }
+            for name, route in sorted(by_route.items())
+        }
+    }
+
+
+def print_summary(s):
+    print(f"\n  speed-up x{s['speedup']:g}: {s['requests']} requests in {s['wall_seconds']:.1f} s")
+    offered = f"{s['offered_rps']:.1f}" if s['offered_rps'] is not None else 'n/a'
+    print(f"  offered {offered} req/s, achieved {s['achieved_rps']:.1f} req/s")
+    print(f"  status: {', '.join(f'{k}={v}' for k, v in sorted(s['status_counts'].items()))}")
+    latency, lag = s['latency'], s['lag']
+    if latency['p50_ms'] is not None:
+        print(f"  latency p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms, "
+              f"p99 {latency['p99_ms']:.2f} ms, max {latency['max_ms']:.2f} ms")
+    print(f"  lag behind schedule p99 {lag['p99_ms']:.2f} ms"
+          + ("   ! requests started late (all client threads busy or client CPU-bound)" if lag['p99_ms'] > 10 else ''))
+    print(f"\n  {'route':<45}{'requests':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'logged p50':>12}")
+    for name, r in s['routes'].items():
+        if r['p50_ms'] is None:
+            print(f"  {name:<45}{r['requests']:>9}{'(all failed)':>27}")
+            continue
+        print(f"  {name:<45}{r['requests']:>9}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['logged_p50_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay a recorded request log against a server')
+    parser.add_argument('logs', nargs='+', help='Request log files (REQUEST_LOG_PATH; rotated files are included)')
+    parser.add_argument('--target', default='http://127.0.0.1:8000', help='Server base URL')
+    parser.add_argument('--speedup', default='1', help='Comma-separated speed-up factors, one run each')
+    parser.add_argument('--threads', type=int, default=32, help='Client threads (concurrent requests)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds per request')
+    parser.add_argument('--limit', type=int, default=0, help='Replay only the first N requests')
+    parser.add_argument('--include-admin', action='store_true', help='Also replay /admin/ requests')
+    parser.add_argument('--output', default=None, help='Write the summaries as JSON')
+    args = parser.parse_args()
+
+    speedups = [float(factor) for factor in args.speedup.split(',')]
+    if any(speedup <= 0 for speedup in speedups):
+        sys.exit("Speed-up factors must be positive")
+
+    records, skipped = load_requests(args.logs, args.include_admin, args.limit)
+    if not records:
+        sys.exit("No replayable requests in the log")
+    span = records[-1]['ts'] - records[0]['ts']
+
+    print("="*86)
+    print(f"TRAFFIC REPLAY ({len(records)} requests over {span:.1f} s recorded, "
+          f"{args.threads} threads, target {args.target})")
+    print("="*86)
+    if skipped['admin'] or skipped['payload_omitted']:
+        print(f"  skipped: {skipped['admin']} admin requests, "
+              f"{skipped['payload_omitted']} logged without payload")
+
+    client = Client(args.target, args.timeout)
+    summaries = []
+    for speedup in speedups:
+        results, wall = replay(records, client, speedup, args.threads)
+        summary = summarize(records, results, wall, speedup)
+        print_summary(summary)
+        summaries.append(summary)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'logs': args.logs,
+                'target': args.target,
+                'threads': args.threads,
+                'recorded_seconds': round(span, 3),
+                'skipped': skipped,
+                'runs': summaries
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
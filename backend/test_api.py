@@ -26,3 +26,23 @@ response = requests.post('http://localhost:5000/compare-crops', json={
 
 print(f"Status Code: {response.status_code}")
 print(f"Response: {json.dumps(response.json(), indent=2)}")
+
+print("\n" + "="*70 + "\n")
+
+# Test advisory endpoint (sections must match the individual endpoints)
+print("Testing /advisory endpoint...")
+farm = {
+    'District': 'Nashik',
+    'Soil_Type': 'Black',
+    'Weather': 'Moderate Rainfall'
+}
+response = requests.post('http://localhost:5000/advisory', json=farm)
+
+print(f"Status Code: {response.status_code}")
+advisory = response.json()['data']
+for crop in advisory['crops']:
+    nutrients = requests.post('http://localhost:5000/predict-nutrients', json={
+        **farm, 'Crop_Name': crop['crop_name']
+    }).json()['data']
+    print(f"{crop['crop_name']}: nutrients match = {nutrients == crop['nutrients']}, "
+          f"primary fertilizer = {crop['fertilizer']['recommendations'][0]['fertilizer']}")
@@ -0,0 +1,463 @@
+"""
+Test script for the Flask endpoints (Flask test client, no server needed)
+Trains small stand-in models for the bundle files that are not in the
+repository, so it runs without the full training pipeline
+"""
+
+import sys
+import os
+import atexit
+import multiprocessing
+import threading
+import shutil
+import tempfile
+import warnings
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+import config
+from utils.model_bundle import write_manifest
+
+_app_module = None
+_bundle_dir = None
+_threads_started_by_import = set()
+
+
+def _train_models(model_dir):
+    """Small models with the serving feature orders, plus the repo's encoders and nutrient model"""
+    source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+    for file_name in (config.ENCODER_FILE, config.NUTRIENT_MODEL_FILE, config.SCALER_FILE):
+        shutil.copy(os.path.join(source_dir, file_name), model_dir)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        encoders = joblib.load(os.path.join(model_dir, config.ENCODER_FILE))
+
+    df = pd.read_csv(config.DATASET_PATH)
+    zones = {district: zone for zone, districts in config.AGRICULTURAL_ZONES.items() for district in districts}
+    df['Zone'] = df['District'].map(zones).fillna('Other')
+
+    def features(columns):
+        X = df[columns].copy()
+        for column in columns:
+            if column in encoders:
+                X[column] = encoders[column].transform(X[column].astype(str))
+        return X.values
+
+    crop = RandomForestClassifier(n_estimators=15, max_depth=15, min_samples_leaf=2, random_state=42)
+    crop.fit(features(config.CROP_FEATURES), encoders['Crop_Name'].transform(df['Crop_Name']))
+    water = RandomForestRegressor(n_estimators=10, max_depth=10, random_state=42)
+    water.fit(features(config.WATER_FEATURES), df[['Recommended_pH', 'Turbidity_NTU', 'Water_Temp_C']].values)
+    fertilizer = RandomForestClassifier(n_estimators=10, max_depth=10, random_state=42)
+    fertilizer.fit(features(config.FERTILIZER_FEATURES), encoders['Fertilizer'].transform(df['Fertilizer']))
+
+    joblib.dump(crop, os.path.join(model_dir, config.CROP_MODEL_FILE))
+    joblib.dump(water, os.path.join(model_dir, config.WATER_MODEL_FILE))
+    joblib.dump(fertilizer, os.path.join(model_dir, config.FERTILIZER_MODEL_FILE))
+
+    write_manifest(
+        model_dir, __file__, config.DATASET_PATH,
+        features={
+            'crop': config.CROP_FEATURES, 'nutrient': config.NUTRIENT_FEATURES,
+            'water': config.WATER_FEATURES, 'fertilizer': config.FERTILIZER_FEATURES
+        },
+        encoders=encoders,
+        files=[config.CROP_MODEL_FILE, config.NUTRIENT_MODEL_FILE, config.WATER_MODEL_FILE,
+               config.FERTILIZER_MODEL_FILE, config.ENCODER_FILE, config.SCALER_FILE],
+        dataset_rows=len(df)
+    )
+
+
+def get_app():
+    """The app module, imported once against a temporary trained bundle"""
+    global _app_module, _bundle_dir, _threads_started_by_import
+    if _app_module is not None:
+        return _app_module
+
+    model_dir = _bundle_dir = tempfile.mkdtemp(prefix='smart_farmer_bundle_')
+    atexit.register(shutil.rmtree, model_dir, True)
+    _train_models(model_dir)
+
+    # app.py copies its settings from config at import time
+    overrides = {
+        'MODEL_DIR': model_dir, 'MODEL_BUNDLE_DIR': model_dir, 'WARM_UP_ON_START': False,
+        'RESPONSE_CACHE_SIZE': 0, 'METRICS_ENABLED': False, 'REQUEST_LOG_PATH': '',
+        'MODEL_WATCH_INTERVAL': 0
+    }
+    saved = {name: getattr(config, name) for name in overrides}
+    threads_before = set(threading.enumerate())
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        import app as app_module
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+    _threads_started_by_import = {thread.name for thread in set(threading.enumerate()) - threads_before}
+    _app_module = app_module
+    return _app_module
+
+
+# ============================================================================
+# HEALTH
+# ============================================================================
+
+def test_health_reports_verification():
+    """Manifest checksum results are listed in /health; a mismatch is degraded"""
+    print("="*80)
+    print("TESTING /health")
+    print("="*80)
+
+    app_module = get_app()
+    client = app_module.app.test_client()
+    bundle = app_module.model_context.bundle
+    # Loaded before the files are rewritten below
+    app_module.model_context.load()
+
+    bundle.verify(config.DATASET_PATH)
+    response = client.get('/health')
+    health = response.get_json()
+    assert response.status_code == 200 and health['status'] == 'healthy'
+    assert health['verification'][config.CROP_MODEL_FILE] == 'ok'
+    assert health['verification']['dataset'] == 'ok'
+    assert 'crop' in health['components']
+    # SERVER_TIMING is off by default: no internal stages sent to clients
+    assert 'Server-Timing' not in response.headers
+    print("  ✓ Verified bundle is healthy")
+
+    # Same model, different bytes
+    path = bundle.path(config.FERTILIZER_MODEL_FILE)
+    with open(path, 'rb') as f:
+        original = f.read()
+    try:
+        joblib.dump(joblib.load(path), path, compress=3)
+        bundle.verify(config.DATASET_PATH)
+        response = client.get('/health')
+        health = response.get_json()
+        assert response.status_code == 200 and health['ready'] is True
+        assert health['status'] == 'degraded'
+        assert health['verification'][config.FERTILIZER_MODEL_FILE] == 'mismatch'
+        print("  ✓ Checksum mismatch reported as degraded")
+    finally:
+        with open(path, 'wb') as f:
+            f.write(original)
+        bundle.verify(config.DATASET_PATH)
+
+    assert client.get('/health').get_json()['status'] == 'healthy'
+
+    # Warm-up requests that did not return 200
+    results = app_module.warm_up.results
+    results.append({'method': 'POST', 'path': '/advisory', 'status': 500})
+    try:
+        response = client.get('/health')
+        health = response.get_json()
+        assert response.status_code == 200 and health['status'] == 'degraded'
+        assert health['warm_up']['failed'] == ['POST /advisory: 500']
+        print("  ✓ Failed warm-up requests reported as degraded")
+    finally:
+        results.pop()
+
+    response = client.get('/ready')
+    assert response.status_code == 200 and response.get_json()['ready'] is True
+    assert client.get('/health').get_json()['warming_up'] is False
+    print("  ✓ Readiness route")
+
+
+# ============================================================================
+# BATCH CROP RECOMMENDATION
+# ============================================================================
+
+def _farm_records(app_module, n):
+    """n (District, Soil_Type, Weather) records spread over the dropdown options"""
+    options = app_module.app.test_client().get('/dropdown-data').get_json()['data']
+    districts, soil_types, weathers = options['districts'], options['soil_types'], options['weather_conditions']
+    return [
+        {
+            'District': districts[(i * 7) % len(districts)],
+            'Soil_Type': soil_types[(i * 3) % len(soil_types)],
+            'Weather': weathers[(i * 5) % len(weathers)]
+        }
+        for i in range(n)
+    ]
+
+
+def test_batch_matches_single_requests():
+    """Every batch result equals the /recommend-crop response for the same record"""
+    print("="*80)
+    print("TESTING /recommend-crop/batch")
+    print("="*80)
+
+    app_module = get_app()
+    client = app_module.app.test_client()
+    records = _farm_records(app_module, 40)
+
+    response = client.post('/recommend-crop/batch', json={'records': records})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['total'], data['succeeded'], data['failed']) == (40, 40, 0)
+
+    for i, (record, result) in enumerate(zip(records, data['results'])):
+        single = client.post('/recommend-crop', json=record).get_json()['data']
+        assert result['index'] == i and result['success'] is True
+        assert result['recommendations'] == single['recommendations']
+        assert result['alternative_crops'] == single['alternative_crops']
+        assert (result['zone'], result['region']) == (single['zone'], single['region'])
+    print("  ✓ 40 batch results match single requests")
+
+    # A bare list is accepted too
+    bare = client.post('/recommend-crop/batch', json=records[:3]).get_json()['data']
+    assert bare['results'] == data['results'][:3]
+    print("  ✓ Bare list body")
+
+
+def test_batch_invalid_records():
+    """Invalid records fail on their own; empty and oversized batches are rejected"""
+    app_module = get_app()
+    client = app_module.app.test_client()
+    valid = _farm_records(app_module, 2)
+
+    records = [valid[0], {'District': 'Pune'}, {**valid[1], 'District': 'Atlantis'}, 'Pune', valid[1]]
+    response = client.post('/recommend-crop/batch', json={'records': records})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['total'], data['succeeded'], data['failed']) == (5, 2, 3)
+    results = data['results']
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert [r['success'] for r in results] == [True, False, False, False, True]
+    assert results[1]['error'].startswith('Missing required fields')
+    assert results[2]['error'] == 'District "Atlantis" not found in training data.'
+    assert results[3]['error'].startswith('Missing required fields')
+    assert results[4]['recommendations'] == client.post('/recommend-crop', json=valid[1]).get_json()['data']['recommendations']
+    print("  ✓ Invalid records mid-batch fail individually")
+
+    # Non-string values (unhashable lists/dicts) fail their record, not the batch
+    records = [valid[0], {**valid[1], 'Soil_Type': ['Black']}, {**valid[0], 'Weather': {'a': 1}}, valid[1]]
+    response = client.post('/recommend-crop/batch', json={'records': records})
+    assert response.status_code == 200
+    results = response.get_json()['data']['results']
+    assert [r['success'] for r in results] == [True, False, False, True]
+    assert results[1]['error'] == results[2]['error'] == 'District, Soil_Type and Weather must be strings'
+    print("  ✓ Non-string values mid-batch fail individually")
+
+    for body in ({'records': []}, [], {'records': 'Pune'}, {}):
+        response = client.post('/recommend-crop/batch', json=body)
+        assert response.status_code == 400 and response.get_json()['success'] is False
+    print("  ✓ Empty batches rejected")
+
+    limit = app_module.MAX_BATCH_RECORDS
+    app_module.MAX_BATCH_RECORDS = 10
+    try:
+        response = client.post('/recommend-crop/batch', json={'records': _farm_records(app_module, 11)})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Too many records: 11 (maximum 10 per request)'
+        assert client.post('/recommend-crop/batch', json={'records': _farm_records(app_module, 10)}).status_code == 200
+    finally:
+        app_module.MAX_BATCH_RECORDS = limit
+    print("  ✓ Batch size limit")
+
+
+# ============================================================================
+# CROP COMPARISON
+# ============================================================================
+
+def _compare_crops_per_crop(app_module, district, soil_type, weather, crops):
+    """/compare-crops comparison built one crop at a time (nutrient model, dict calibration)"""
+    from utils.crop_prediction_calibrator import calibrate_comparison_results
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        encoders = joblib.load(os.path.join(_bundle_dir, config.ENCODER_FILE))
+        nutrient_model = joblib.load(os.path.join(_bundle_dir, config.NUTRIENT_MODEL_FILE))
+
+    zone = app_module.get_zone(district)
+    comparison = []
+    for crop_name in crops:
+        row = {
+            'District': district, 'Soil_Type': soil_type, 'Crop_Name': crop_name, 'Weather': weather, 'Zone': zone
+        }
+        row = {col: int(encoders[col].transform([value])[0]) for col, value in row.items()}
+        row.update(config.NUTRIENT_FEATURE_DEFAULTS)
+        nutrients = nutrient_model.predict([[row[col] for col in config.NUTRIENT_FEATURES]])[0]
+
+        total_cost = (config.INPUT_COSTS['Seeds'].get(crop_name, 5000) + config.INPUT_COSTS['Fertilizer'].get('DAP', 1400)
+                      + config.INPUT_COSTS['Labor'] + config.INPUT_COSTS['Irrigation'] + config.INPUT_COSTS['Pesticides'])
+        expected_yield = config.EXPECTED_YIELDS.get(crop_name, 20)
+        market_rate = config.MARKET_RATES.get(crop_name, 3000)
+        gross_income = expected_yield * market_rate
+        net_income = gross_income - total_cost
+        risk_level = 'Medium'
+        if zone in ['Marathwada'] and crop_name in ['Sugarcane', 'Rice']:
+            risk_level = 'High'
+        elif zone in ['Western Maharashtra'] and crop_name in ['Sugarcane', 'Grapes']:
+            risk_level = 'Low'
+
+        comparison.append({
+            'crop_name': crop_name,
+            'nutrients': {name: round(float(value), 2) for name, value in zip(['N', 'P', 'K', 'Zn', 'S'], nutrients)},
+            'economics': {
+                'total_cost': round(total_cost, 2),
+                'expected_yield': expected_yield,
+                'market_rate': market_rate,
+                'gross_income': round(gross_income, 2),
+                'net_income': round(net_income, 2),
+                'roi_percentage': round(net_income / total_cost * 100 if total_cost > 0 else 0, 2)
+            },
+            'risk_assessment': {
+                'risk_level': risk_level,
+                'water_requirement': 'High' if crop_name in ['Sugarcane', 'Rice'] else 'Medium',
+                'zone_suitability': zone
+            }
+        })
+    return calibrate_comparison_results(comparison, district, debug=False)
+
+
+def test_compare_crops_matches_per_crop():
+    """The vectorized comparison equals per-crop predictions; duplicates and unknown crops"""
+    print("="*80)
+    print("TESTING /compare-crops")
+    print("="*80)
+
+    app_module = get_app()
+    client = app_module.app.test_client()
+    farm = {'District': 'Latur', 'Soil_Type': 'Black', 'Weather': 'Semi-Arid'}
+    crops = ['Soybean', 'Cotton', 'Rice', 'Sugarcane', 'Soybean', 'Grapes', 'Rice', 'Onion']
+
+    response = client.post('/compare-crops', json={**farm, 'crops': crops})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    expected = _compare_crops_per_crop(app_module, farm['District'], farm['Soil_Type'], farm['Weather'], crops)
+
+    assert [crop['crop_name'] for crop in data['comparison']] == crops
+    for crop, reference in zip(data['comparison'], expected['comparison']):
+        served = {key: value for key, value in crop.items() if key not in ('suitability', 'zone_info')}
+        assert served == reference, crop['crop_name']
+    assert data['recommendation'] == expected['recommendation']
+    # Duplicates get identical entries
+    assert data['comparison'][0] == data['comparison'][4] and data['comparison'][2] == data['comparison'][6]
+    print(f"  ✓ {len(crops)} crops (with duplicates) match per-crop predictions")
+
+    response = client.post('/compare-crops', json={**farm, 'crops': ['Soybean', 'Dragonfruit', 'Rice']})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == \
+        'Crop "Dragonfruit" not found in training data. Please select from available crops.'
+    assert client.post('/compare-crops', json={**farm, 'crops': []}).status_code == 400
+    for bad_crop in (['Rice'], {'name': 'Rice'}, 3):
+        response = client.post('/compare-crops', json={**farm, 'crops': ['Soybean', bad_crop]})
+        assert response.status_code == 400
+        assert response.get_json()['error'].startswith('Crop ')
+    response = client.post('/compare-crops', json={**farm, 'District': ['Latur'], 'crops': ['Rice']})
+    assert response.status_code == 400 and response.get_json()['error'].startswith('District ')
+    print("  ✓ Unknown crop names, non-string entries and empty lists rejected")
+
+
+# ============================================================================
+# ADVISORY
+# ============================================================================
+
+def test_advisory_combines_endpoints():
+    """/advisory equals the responses of the endpoints it bundles"""
+    print("="*80)
+    print("TESTING /advisory")
+    print("="*80)
+
+    app_module = get_app()
+    client = app_module.app.test_client()
+    checked = 0
+    for farm in _farm_records(app_module, 12):
+        response = client.post('/advisory', json=farm)
+        assert response.status_code == 200
+        advisory = response.get_json()['data']
+
+        assert advisory['recommendation'] == client.post('/recommend-crop', json=farm).get_json()['data']
+        assert advisory['water_quality'] == client.post('/water-quality-analysis', json=farm).get_json()['data']
+        assert advisory['input']['zone'] == app_module.get_zone(farm['District'])
+        top_crops = [crop['crop_name'] for crop in advisory['recommendation']['recommendations']]
+        assert [crop['crop_name'] for crop in advisory['crops']] == top_crops
+
+        for crop in advisory['crops']:
+            nutrients = client.post('/predict-nutrients', json={**farm, 'Crop_Name': crop['crop_name']}).get_json()
+            assert crop['nutrients'] == nutrients['data']
+            fertilizer = client.post('/fertilizer-recommendation', json={
+                'Crop_Name': crop['crop_name'], 'Soil_Type': farm['Soil_Type'],
+                **{key: nutrients['data']['nutrients'][key] for key in ('N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha')}
+            }).get_json()
+            assert crop['fertilizer'] == fertilizer['data']
+            checked += 1
+    assert checked > 0
+    print(f"  ✓ 12 farms, {checked} crop plans match the single endpoints")
+
+
+def test_advisory_rejects_invalid_input():
+    """Missing and unknown inputs are 400s with the single endpoints' messages"""
+    client = get_app().app.test_client()
+    farm = {'District': 'Pune', 'Soil_Type': 'Black', 'Weather': 'Dry'}
+
+    for missing in ('District', 'Soil_Type', 'Weather'):
+        body = {key: value for key, value in farm.items() if key != missing}
+        response = client.post('/advisory', json=body)
+        assert response.status_code == 400
+        assert response.get_json() == {
+            'success': False, 'error': 'Missing required fields: District, Soil_Type, Weather'
+        }
+
+    for column, value in (('District', 'Atlantis'), ('Soil_Type', 'Moon Dust'), ('Weather', 'Snow')):
+        body = {**farm, column: value}
+        response = client.post('/advisory', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == client.post('/recommend-crop', json=body).get_json()['error']
+    print("  ✓ Missing and unknown inputs rejected")
+
+
+# ============================================================================
+# WORKER THREADS
+# ============================================================================
+
+def _forked_worker(app_module, queue):
+    """Stands in for a gunicorn worker forked from a preloaded master"""
+    app_module.WARM_UP_ON_START = True
+    client = app_module.app.test_client()
+    first = client.get('/ready').status_code
+    health = client.get('/health')
+    app_module.warm_up.wait(60)
+    after = client.get('/health').get_json()
+    queue.put((first, health.status_code, app_module.warm_up.state,
+               [r['status'] for r in app_module.warm_up.results],
+               client.get('/ready').status_code, after['status'], after['warming_up']))
+
+
+def test_threads_start_per_worker():
+    """Importing the app starts no threads; each forked worker warms itself up"""
+    app_module = get_app()
+    assert _threads_started_by_import == set()
+    print("  ✓ No background threads at import")
+
+    # Nothing may hold a component lock at fork time
+    app_module.model_context.load()
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    worker = context.Process(target=_forked_worker, args=(app_module, queue))
+    worker.start()
+    first, health, state, statuses, after, status, warming_up = queue.get(timeout=120)
+    worker.join(10)
+    # /health answers 200 throughout; /ready only once the warm-up is done
+    assert first == 503 and health == 200 and state == 'done' and after == 200
+    assert statuses and all(status == 200 for status in statuses)
+    assert status == 'healthy' and warming_up is False
+    print(f"  ✓ Forked worker warmed up on its first request ({len(statuses)} requests)")
+
+
+if __name__ == "__main__":
+    test_health_reports_verification()
+    test_batch_matches_single_requests()
+    test_batch_invalid_records()
+    test_compare_crops_matches_per_crop()
+    test_advisory_combines_endpoints()
+    test_advisory_rejects_invalid_input()
+    test_threads_start_per_worker()
+    print("\n✓ App endpoint tests passed")
@@ -8,7 +8,14 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from utils.crop_prediction_calibrator import calibrate_comparison_results
+from utils.crop_prediction_calibrator import (
+    calibrate_crop_predictions, calibrate_batch, calibration_crop_ids
+)
+import numpy as np
 from utils.crop_suitability_validator import validate_crop_suitability, get_zone_from_district
+from utils.crop_suitability_validator import (
+    validate_crop_suitability_batch, get_suitability_matrix, SuitabilityMatrix, WARNING_LEVELS
+)
 import json
 
 def print_separator():
@@ -244,5 +251,67 @@ def test_complete_system():
     print("\n🚀 System Status: PRODUCTION READY")
     print("=" * 80)
 
+def test_suitability_matrix():
+    """Memoized suitability matrix returns the same results as direct validation"""
+    
+    print("=" * 80)
+    print(" " * 20 + "SUITABILITY MATRIX TEST")
+    print("=" * 80)
+    
+    crops = ['Grapes', 'Rice', 'Wheat', 'Cotton', 'Sorghum', 'Sugarcane', 'Chili']
+    for district in ['Nanded', 'Sangli', 'Raigad', 'Unknown']:
+        zone = get_zone_from_district(district)
+        batch = validate_crop_suitability_batch(crops, district, zone)
+        assert batch == [validate_crop_suitability(crop, district, zone) for crop in crops]
+        
+        # Second call is served from the matrix (same objects) for covered cells
+        matrix = get_suitability_matrix()
+        again = validate_crop_suitability_batch(crops, district)
+        for crop, a, b in zip(crops, batch, again):
+            assert a == b
+            if crop in matrix.crops and district in matrix.districts:
+                assert a is b
+        print(f"   ✅ {district}: {[r['warning_level'] for r in batch]}")
+    
+    matrix = SuitabilityMatrix(['Nanded', 'Pune'], ['Grapes', 'Sorghum']).precompute()
+    assert (matrix.scores >= 0).all()
+    assert WARNING_LEVELS[matrix.warning_levels[0, 0]] == 'high_risk'
+    assert matrix.scores[0, 1] == validate_crop_suitability('Sorghum', 'Nanded')['suitability_score']
+    assert get_suitability_matrix() is get_suitability_matrix()
+    print("   ✅ Precomputed score / warning level arrays")
+
+
+def test_calibrate_batch():
+    """Vectorized calibration matches the per-crop dict calibration"""
+    
+    print("=" * 80)
+    print(" " * 20 + "VECTORIZED CALIBRATION TEST")
+    print("=" * 80)
+    
+    rng = np.random.RandomState(0)
+    crops = ['Grapes', 'Rice', 'Wheat', 'Cotton', 'Sugarcane', 'Chili'] * 50
+    raw_cost = rng.uniform(5000, 500000, len(crops))
+    raw_roi = rng.uniform(-50, 1500, len(crops))
+    raw_nutrients = rng.uniform(0, 60000, (len(crops), 5))
+    
+    calibrated = calibrate_batch(calibration_crop_ids(crops), raw_cost, raw_roi, raw_nutrients)
+    
+    for i, crop in enumerate(crops):
+        expected = calibrate_crop_predictions({
+            'crop_name': crop,
+            'economics': {'total_cost': raw_cost[i], 'roi_percentage': raw_roi[i]},
+            'nutrients': dict(zip(['N', 'P', 'K', 'Zn', 'S'], raw_nutrients[i]))
+        }, crop, 'Pune', debug=False)
+        
+        assert round(float(calibrated['total_cost'][i]), 2) == expected['economics']['total_cost']
+        assert round(float(calibrated['roi_percentage'][i]), 2) == expected['economics']['roi_percentage']
+        assert round(float(calibrated['net_income'][i]), 2) == expected['economics']['net_income']
+        assert round(float(calibrated['nutrients'][i, 0]), 2) == expected['nutrients']['N']
+    
+    print(f"   ✅ {len(crops)} crop rows match calibrate_crop_predictions()")
+
+
 if __name__ == "__main__":
     test_complete_system()
+    test_suitability_matrix()
+    test_calibrate_batch()
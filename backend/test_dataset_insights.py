@@ -0,0 +1,83 @@
+"""
+Test script for the dataset insights store
+Checks that the pre-serialized payloads match a direct computation on the dataset
+"""
+
+import sys
+import os
+import json
+
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATASET_PATH
+from utils.dataset_insights import DatasetInsights
+from validation import get_region
+
+
+def _serialize(payload):
+    return json.dumps(payload, sort_keys=True).encode('utf-8')
+
+
+def test_district_insights_match_dataset():
+    """District payloads equal the per-request boolean-mask computation"""
+    print("="*80)
+    print("TESTING DATASET INSIGHTS STORE")
+    print("="*80)
+
+    dataset = pd.read_csv(DATASET_PATH)
+    insights = DatasetInsights(dataset, get_region, _serialize)
+
+    for district in ['Pune', 'Raigad', 'Latur']:
+        district_data = dataset[dataset['District'] == district]
+        data = json.loads(insights.district(district).body)['data']
+
+        assert data['total_records'] == len(district_data)
+        assert data['soil_distribution'] == district_data['Soil_Type'].value_counts().to_dict()
+        assert data['average_nutrients']['N_kg_ha'] == round(district_data['N_kg_ha'].mean(), 2)
+        assert data['water_quality']['avg_pH'] == round(district_data['Recommended_pH'].mean(), 2)
+        print(f"  ✓ {district}")
+
+    assert insights.district('Nowhere') is None
+
+    # (soil, weather) -> crops index used by the "no crops found" fallback
+    district_data = dataset[dataset['District'] == 'Pune']
+    combinations = insights.combinations('Pune')
+    assert combinations.available_soils == sorted(district_data['Soil_Type'].unique().tolist())
+    for (soil, weather), crops in combinations.crops.items():
+        mask = (district_data['Soil_Type'] == soil) & (district_data['Weather'] == weather)
+        assert crops == sorted(district_data.loc[mask, 'Crop_Name'].unique().tolist())
+    assert len(combinations.suggestions) == len(combinations.crops)
+    assert insights.combinations('Nowhere') is None
+    print("  ✓ District soil/weather combination index")
+
+    statistics = json.loads(insights.statistics.body)['data']
+    assert statistics['total_records'] == len(dataset)
+    assert statistics['total_districts'] == dataset['District'].nunique()
+
+    dropdown = json.loads(insights.dropdown.body)['data']
+    assert dropdown['crops'] == sorted(dataset['Crop_Name'].unique().tolist())
+    print("  ✓ Statistics and dropdown data")
+
+
+def test_etags_follow_dataset_content():
+    """ETags are stable for the same data and change when the data changes"""
+    dataset = pd.read_csv(DATASET_PATH)
+    first = DatasetInsights(dataset, get_region, _serialize)
+    second = DatasetInsights(dataset.copy(), get_region, _serialize)
+    assert first.statistics.etag == second.statistics.etag
+
+    changed = dataset.copy()
+    changed.loc[0, 'N_kg_ha'] += 1
+    third = DatasetInsights(changed, get_region, _serialize)
+    assert third.dataset_hash != first.dataset_hash
+    assert third.statistics.etag != first.statistics.etag
+    print("  ✓ ETags tied to dataset content")
+
+
+if __name__ == "__main__":
+    test_district_insights_match_dataset()
+    test_etags_follow_dataset_content()
+    print("\n✓ Dataset insights tests passed")
@@ -0,0 +1,100 @@
+"""
+Test script for the compiled feature encoder
+Compares it with the fitted LabelEncoders in models/encoders.pkl
+"""
+
+import sys
+import os
+import warnings
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import joblib
+import numpy as np
+
+from config import MODEL_DIR, ENCODER_FILE, CROP_FEATURES
+from utils.feature_encoder import FeatureEncoder
+
+
+def _load_encoders():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')     # pickled with an older sklearn
+        return joblib.load(os.path.join(MODEL_DIR, ENCODER_FILE))
+
+
+def test_matches_label_encoders():
+    """Both constructors encode and decode every class like LabelEncoder"""
+    print("="*80)
+    print("TESTING FEATURE ENCODER")
+    print("="*80)
+
+    encoders = _load_encoders()
+    compiled = {
+        'encoders.pkl': FeatureEncoder(encoders),
+        'manifest classes': FeatureEncoder.from_classes(
+            {col: [str(c) for c in encoder.classes_] for col, encoder in encoders.items()}
+        )
+    }
+
+    for source, feature_encoder in compiled.items():
+        assert feature_encoder.columns == list(encoders)
+        for column, label_encoder in encoders.items():
+            classes = list(label_encoder.classes_)
+            expected = label_encoder.transform(classes)
+            assert feature_encoder.labels(column) == classes
+            assert feature_encoder.size(column) == len(classes)
+            assert np.array_equal(feature_encoder.encode_many(column, classes), expected)
+            assert [feature_encoder.encode(column, c) for c in classes] == expected.tolist()
+            assert feature_encoder.decode_many(column, expected[::-1]) == \
+                label_encoder.inverse_transform(expected[::-1]).tolist()
+            assert feature_encoder.decode(column, int(expected[-1])) == classes[-1]
+        print(f"  ✓ Built from {source}: {len(encoders)} columns match LabelEncoder")
+
+    feature_encoder = compiled['encoders.pkl']
+    records = [
+        {'District': d, 'Soil_Type': s, 'Weather': w, 'Zone': z}
+        for d, s, w, z in zip(encoders['District'].classes_, encoders['Soil_Type'].classes_[::-1],
+                              encoders['Weather'].classes_, encoders['Zone'].classes_)
+    ]
+    expected = np.column_stack([
+        encoders[col].transform([record[col] for record in records]) for col in CROP_FEATURES
+    ])
+    assert np.array_equal(feature_encoder.encode_records(records, CROP_FEATURES), expected)
+    print("  ✓ Record matrices match column-wise LabelEncoder transforms")
+
+
+def test_unseen_labels():
+    """Unseen labels raise ValueError, as LabelEncoder.transform does"""
+    encoders = _load_encoders()
+    feature_encoder = FeatureEncoder(encoders)
+    known = str(encoders['Crop_Name'].classes_[0])
+
+    for unseen in ('Dragonfruit', known.lower(), ''):
+        assert not feature_encoder.is_known('Crop_Name', unseen)
+        for encode in (lambda: feature_encoder.encode('Crop_Name', unseen),
+                       lambda: feature_encoder.encode_many('Crop_Name', [known, unseen]),
+                       lambda: encoders['Crop_Name'].transform([known, unseen])):
+            try:
+                encode()
+                assert False, f"{unseen!r} must not encode"
+            except ValueError as e:
+                assert 'previously unseen labels' in str(e)
+
+    # Non-string input is an unseen label too, not a TypeError
+    for encode in (lambda: feature_encoder.encode('Crop_Name', None),
+                   lambda: feature_encoder.encode_many('Crop_Name', [known, ['Rice']])):
+        try:
+            encode()
+            assert False, "non-string labels must not encode"
+        except ValueError:
+            pass
+
+    assert feature_encoder.is_known('Crop_Name', known)
+    print("  ✓ Unseen labels rejected")
+
+
+if __name__ == "__main__":
+    test_matches_label_encoders()
+    test_unseen_labels()
+    print("\n✓ Feature encoder tests passed")
@@ -0,0 +1,89 @@
+"""
+Test script for the pure-NumPy forest engine
+Checks that flattened forests reproduce sklearn's outputs bit for bit
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.forest_engine import FlatForest, flatten_forest
+
+
+def _training_data(rng, n_rows=2000):
+    """Label-encoded District / Soil / Weather / Zone style features"""
+    return np.column_stack([
+        rng.randint(0, 36, n_rows), rng.randint(0, 6, n_rows),
+        rng.randint(0, 9, n_rows), rng.randint(0, 5, n_rows)
+    ])
+
+
+def test_classifier_matches_sklearn():
+    """predict_proba / predict are identical for a balanced classifier"""
+    print("="*80)
+    print("TESTING FOREST ENGINE AGAINST SKLEARN")
+    print("="*80)
+
+    rng = np.random.RandomState(0)
+    X = _training_data(rng)
+    y = (X[:, 0] * 3 + X[:, 1] * 7 + rng.randint(0, 4, len(X))) % 18
+
+    model = RandomForestClassifier(
+        n_estimators=60, max_depth=20, min_samples_leaf=2,
+        class_weight='balanced', random_state=0
+    ).fit(X, y)
+    forest = flatten_forest(model)
+
+    X_test = _training_data(rng, 500)
+    assert np.array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+    assert np.array_equal(forest.predict_proba(X_test[:1]), model.predict_proba(X_test[:1]))
+    assert np.array_equal(forest.predict(X_test), model.predict(X_test))
+    assert np.array_equal(forest.classes_, model.classes_)
+    print(f"  ✓ Classifier ({forest.n_estimators} trees, {len(forest.feature)} nodes)")
+
+
+def test_regressor_matches_sklearn():
+    """Multi-output and single-output regressors are identical"""
+    rng = np.random.RandomState(1)
+    X = _training_data(rng)
+
+    multi = RandomForestRegressor(n_estimators=40, max_depth=15, random_state=0)
+    multi.fit(X, rng.rand(len(X), 3) + X[:, :3] / 10)
+    single = RandomForestRegressor(n_estimators=40, random_state=0)
+    single.fit(X, X[:, 0] * 0.3 + rng.rand(len(X)))
+
+    X_test = _training_data(rng, 500)
+    assert np.array_equal(flatten_forest(multi).predict(X_test), multi.predict(X_test))
+    assert np.array_equal(flatten_forest(single).predict(X_test), single.predict(X_test))
+    print("  ✓ Regressors (multi-output and single-output)")
+
+
+def test_save_load_roundtrip():
+    """Exported arrays reload intact and stale exports are rejected"""
+    rng = np.random.RandomState(2)
+    X = _training_data(rng)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, X[:, 1])
+    forest = flatten_forest(model, fingerprint='v1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'forest')
+        forest.save(path)
+
+        loaded = FlatForest.load(path, 'v1')
+        assert loaded is not None
+        assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+        assert FlatForest.load(path, 'v2') is None
+    print("  ✓ Save / load roundtrip and stale export detection")
+
+
+if __name__ == "__main__":
+    test_classifier_matches_sklearn()
+    test_regressor_matches_sklearn()
+    test_save_load_roundtrip()
+    print("\n✓ Forest engine tests passed")
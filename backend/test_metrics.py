@@ -0,0 +1,183 @@
+"""
+Test script for the Prometheus metrics registry
+"""
+
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.metrics import MetricsRegistry, BATCH_BUCKETS
+
+
+def _define(registry):
+    requests = registry.counter('http_requests_total', 'Requests', ['route', 'status'])
+    latency = registry.histogram('http_request_duration_seconds', 'Latency', ['route'])
+    batch = registry.histogram('inference_batch_size', 'Batch size', ['model'], BATCH_BUCKETS)
+    load = registry.gauge('component_load_seconds', 'Load time', ['component'])
+    return requests, latency, batch, load
+
+
+def test_exposition_format():
+    """Counters, cumulative histogram buckets and gauges in text format"""
+    print("="*80)
+    print("TESTING METRICS")
+    print("="*80)
+
+    registry = MetricsRegistry()
+    requests, latency, batch, load = _define(registry)
+    requests.inc('/recommend-crop', 200)
+    requests.inc('/recommend-crop', 200)
+    requests.inc('/recommend-crop', 400)
+    latency.observe(0.00015, '/recommend-crop')
+    latency.observe(0.003, '/recommend-crop')
+    batch.observe(64, 'crop')
+    load.set(0.25, 'crop')
+
+    text = registry.render()
+    lines = text.splitlines()
+    assert '# TYPE http_requests_total counter' in lines
+    assert 'http_requests_total{route="/recommend-crop",status="200"} 2' in lines
+    assert 'http_requests_total{route="/recommend-crop",status="400"} 1' in lines
+    assert 'http_request_duration_seconds_bucket{route="/recommend-crop",le="0.0001"} 0' in lines
+    assert 'http_request_duration_seconds_bucket{route="/recommend-crop",le="0.0002"} 1' in lines
+    assert 'http_request_duration_seconds_bucket{route="/recommend-crop",le="+Inf"} 2' in lines
+    assert 'http_request_duration_seconds_count{route="/recommend-crop"} 2' in lines
+    assert 'inference_batch_size_bucket{model="crop",le="32"} 0' in lines
+    assert 'inference_batch_size_bucket{model="crop",le="64"} 1' in lines
+    assert f'component_load_seconds{{component="crop",pid="{os.getpid()}"}} 0.25' in lines
+    print("  ✓ Text exposition format")
+
+
+def test_disabled_registry():
+    """A disabled registry records nothing"""
+    registry = MetricsRegistry(enabled=False)
+    requests, latency, _, _ = _define(registry)
+    requests.inc('/health', 200)
+    latency.observe(0.1, '/health')
+    assert 'http_requests_total{' not in registry.render()
+    print("  ✓ Disabled registry is a no-op")
+
+
+def test_snapshot_directory_private():
+    """The snapshot directory is created readable by this user only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'metrics')
+        registry = MetricsRegistry(directory, flush_interval=0.05)
+        registry.ensure_flusher()
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+        registry.close()
+        print("  ✓ Snapshot directory created with mode 0700")
+
+
+def _worker(directory, route, n, recorded, scraped):
+    registry = MetricsRegistry(directory, flush_interval=0.05)
+    requests, latency, _, load = _define(registry)
+    registry.ensure_flusher()
+    for _ in range(n):
+        requests.inc(route, 200)
+        latency.observe(0.002, route)
+    load.set(0.5, 'crop')
+    time.sleep(0.2)
+    recorded.put(os.getpid())
+    scraped.wait(10)
+
+
+def test_merge_across_workers():
+    """Snapshots of all worker processes are merged by the scraped one"""
+    with tempfile.TemporaryDirectory() as directory:
+        context = multiprocessing.get_context('fork')
+        recorded, scraped = context.Queue(), context.Event()
+        workers = [
+            context.Process(target=_worker, args=(directory, '/recommend-crop', n, recorded, scraped))
+            for n in (3, 4)
+        ]
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            recorded.get(timeout=10)
+
+        registry = MetricsRegistry(directory)
+        requests, _, _, _ = _define(registry)
+        requests.inc('/metrics', 200)
+        collected = registry.collect()
+        scraped.set()
+        for worker in workers:
+            worker.join(10)
+
+        samples = collected['http_requests_total']['samples']
+        assert samples[('/recommend-crop', '200')] == 7
+        assert samples[('/metrics', '200')] == 1
+        assert abs(collected['http_request_duration_seconds']['samples'][('/recommend-crop',)][-1] - 0.014) < 1e-9
+        assert len(collected['component_load_seconds']['samples']) == 2
+        print("  ✓ Counters and histograms summed over workers, gauges per worker")
+
+        # A new worker archives and removes the snapshots of workers that have exited
+        registry.close()
+        restarted = MetricsRegistry(directory)
+        _define(restarted)
+        samples = restarted.collect()['http_requests_total']['samples']
+        assert [name for name in os.listdir(directory) if name.startswith('worker-')] == [
+            os.path.basename(restarted._path)
+        ]
+        assert samples[('/recommend-crop', '200')] == 7 and samples[('/metrics', '200')] == 1
+        assert restarted.collect()['component_load_seconds']['samples'] == {}
+        restarted.close()
+        print("  ✓ Snapshots of exited workers archived (counters kept, gauges dropped)")
+
+
+def _killed_worker(directory, n, flushed):
+    registry = MetricsRegistry(directory, flush_interval=0.02)
+    requests, _, _, _ = _define(registry)
+    registry.ensure_flusher()
+    for _ in range(n):
+        requests.inc('/recommend-crop', 200)
+    registry.flush()
+    flushed.set()
+    time.sleep(60)
+
+
+def test_counters_survive_killed_workers():
+    """Merged counters never go down when workers die and are replaced"""
+    with tempfile.TemporaryDirectory() as directory:
+        context = multiprocessing.get_context('fork')
+        scraper = MetricsRegistry(directory)
+        requests, _, _, _ = _define(scraper)
+
+        def scrape():
+            samples = scraper.collect()['http_requests_total']['samples']
+            return samples.get(('/recommend-crop', '200'), 0)
+
+        seen = []
+        for generation in range(3):
+            flushed = context.Event()
+            worker = context.Process(target=_killed_worker, args=(directory, 5, flushed))
+            worker.start()
+            flushed.wait(10)
+            seen.append(scrape())
+            worker.kill()
+            worker.join(10)
+            seen.append(scrape())
+            # Its replacement folds the dead worker's snapshot into the archive
+            replacement = MetricsRegistry(directory)
+            _define(replacement)
+            replacement.ensure_flusher()
+            replacement.close()
+            seen.append(scrape())
+
+        assert seen == sorted(seen) and seen[-1] == 15
+        scraper.close()
+        print(f"  ✓ Counter across 3 killed workers: {seen}")
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_disabled_registry()
+    test_snapshot_directory_private()
+    test_merge_across_workers()
+    test_counters_survive_killed_workers()
+    print("\n✓ Metrics tests passed")
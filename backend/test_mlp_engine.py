@@ -0,0 +1,84 @@
+"""
+Test script for the NumPy MLP forward-pass engine
+Checks the exported weights against MLPRegressor.predict
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+from sklearn.neural_network import MLPRegressor
+from sklearn.preprocessing import StandardScaler
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.mlp_engine import MLPEngine, export_mlp
+
+
+def _fitted_model(rng, n_outputs=5):
+    X = rng.randint(0, 40, (600, 7)).astype(float)
+    y = X[:, :n_outputs] * rng.rand(n_outputs) + rng.rand(600, n_outputs)
+    model = MLPRegressor(hidden_layer_sizes=(32, 16, 8), max_iter=200, random_state=0)
+    model.fit(X, y[:, 0] if n_outputs == 1 else y)
+    return model, X
+
+
+def test_forward_pass_matches_sklearn():
+    """Unscaled exports are bit-identical to MLPRegressor.predict"""
+    print("="*80)
+    print("TESTING MLP ENGINE AGAINST SKLEARN")
+    print("="*80)
+
+    rng = np.random.RandomState(0)
+    model, X = _fitted_model(rng)
+    engine = export_mlp(model)
+
+    # Single rows, a batch, then a batch larger than the preallocated buffers
+    assert np.array_equal(engine.predict(X[:1]), model.predict(X[:1]))
+    assert np.array_equal(engine.predict(X[:50]), model.predict(X[:50]))
+    assert np.array_equal(engine.predict(X), model.predict(X))
+    assert np.array_equal(engine.predict(X[:1]), model.predict(X[:1]))
+    print(f"  ✓ Multi-output regressor (layers {engine.layer_sizes})")
+
+    single, X = _fitted_model(rng, n_outputs=1)
+    assert np.array_equal(export_mlp(single).predict(X), single.predict(X))
+    print("  ✓ Single-output regressor")
+
+
+def test_folded_scaling():
+    """Input / output scalers folded into the weights match explicit scaling"""
+    rng = np.random.RandomState(1)
+    model, X = _fitted_model(rng)
+    scaler_X = StandardScaler().fit(X)
+    scaler_y = StandardScaler().fit(model.predict(X))
+
+    expected = scaler_y.inverse_transform(model.predict(scaler_X.transform(X)))
+    engine = export_mlp(model, input_scaler=scaler_X, output_scaler=scaler_y)
+    assert np.allclose(engine.predict(X), expected, rtol=1e-9, atol=1e-9)
+    print("  ✓ Scaling folded into first and last layers")
+
+
+def test_save_load_roundtrip():
+    """Exported weights reload intact and stale exports are rejected"""
+    rng = np.random.RandomState(2)
+    model, X = _fitted_model(rng)
+    engine = export_mlp(model, fingerprint='v1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mlp')
+        engine.save(path)
+
+        loaded = MLPEngine.load(path, 'v1')
+        assert loaded is not None
+        assert np.array_equal(loaded.predict(X), model.predict(X))
+        assert MLPEngine.load(path, 'v2') is None
+    print("  ✓ Save / load roundtrip and stale export detection")
+
+
+if __name__ == "__main__":
+    test_forward_pass_matches_sklearn()
+    test_folded_scaling()
+    test_save_load_roundtrip()
+    print("\n✓ MLP engine tests passed")
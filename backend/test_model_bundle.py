@@ -0,0 +1,76 @@
+"""
+Test script for the model bundle manifest and loader
+"""
+
+import sys
+import os
+import tempfile
+
+import joblib
+from sklearn.preprocessing import LabelEncoder
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.model_bundle import ModelBundle, write_manifest
+
+
+def _write_bundle(bundle_dir):
+    """Small bundle: two artifact files, one encoder, a dataset file"""
+    encoders = {'Soil_Type': LabelEncoder().fit(['Black', 'Red', 'Laterite'])}
+    joblib.dump(encoders, os.path.join(bundle_dir, 'encoders.pkl'))
+    joblib.dump({'weights': [1, 2, 3]}, os.path.join(bundle_dir, 'model.pkl'))
+
+    dataset_path = os.path.join(bundle_dir, 'dataset.csv')
+    with open(dataset_path, 'w') as f:
+        f.write("District,Soil_Type\nPune,Black\n")
+
+    manifest = write_manifest(
+        bundle_dir,
+        trainer='train_models_research.py',
+        dataset_path=dataset_path,
+        features={'crop': ['District', 'Soil_Type', 'Weather', 'Zone']},
+        encoders=encoders,
+        files=['encoders.pkl', 'model.pkl'],
+        dataset_rows=1
+    )
+    return encoders, dataset_path, manifest
+
+
+def test_manifest_roundtrip():
+    """The manifest records versions, features, encoder classes and checksums"""
+    print("="*80)
+    print("TESTING MODEL BUNDLE")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        encoders, dataset_path, manifest = _write_bundle(bundle_dir)
+        bundle = ModelBundle(bundle_dir)
+
+        assert bundle.version == manifest['version']
+        assert bundle.manifest['encoders']['Soil_Type'] == ['Black', 'Laterite', 'Red']
+        assert set(bundle.manifest['files']) == {'encoders.pkl', 'model.pkl'}
+        assert bundle.check_encoders(encoders) == []
+        assert bundle.check_features({'crop': ['District', 'Soil_Type', 'Weather', 'Zone']}) == []
+        assert bundle.check_features({'crop': ['District', 'Weather', 'Soil_Type', 'Zone']}) == ['crop']
+        print(f"  ✓ Manifest written and read back (version {bundle.version})")
+
+        assert bundle.verify(dataset_path) == {'encoders.pkl': 'ok', 'model.pkl': 'ok', 'dataset': 'ok'}
+
+        joblib.dump({'weights': [4, 5, 6]}, os.path.join(bundle_dir, 'model.pkl'))
+        os.remove(os.path.join(bundle_dir, 'encoders.pkl'))
+        verification = ModelBundle(bundle_dir).verify(dataset_path)
+        assert verification['model.pkl'] == 'mismatch'
+        assert verification['encoders.pkl'] == 'missing'
+        print("  ✓ Checksum verification detects changed and missing files")
+
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        bundle = ModelBundle(bundle_dir)
+        assert bundle.version == 'unversioned'
+        assert bundle.verify() == {} and bundle.check_encoders({}) == []
+        print("  ✓ Bundles without a manifest load unversioned")
+
+
+if __name__ == "__main__":
+    test_manifest_roundtrip()
+    print("\n✓ Model bundle tests passed")
@@ -0,0 +1,162 @@
+"""
+Test script for lazy model components and hot reload (ModelContext swap)
+Uses stand-in components, so no trained models are needed
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.model_context import ModelContext, ModelReloader, LazyComponents
+
+
+def _context(version):
+    return ModelContext(
+        version=version, bundle=None, fingerprint=version,
+        models=LazyComponents({'crop': lambda: version}),
+        components=LazyComponents({'dataset': lambda: [version]}),
+        loaded_at=time.time()
+    )
+
+
+def test_lazy_components():
+    """Each component loads once on first use; failures are reported, not retried"""
+    print("="*80)
+    print("TESTING LAZY MODEL COMPONENTS")
+    print("="*80)
+
+    calls = []
+
+    def slow_model():
+        calls.append('crop')
+        time.sleep(0.05)
+        return 'crop-model'
+
+    def missing_model():
+        calls.append('water')
+        raise FileNotFoundError('water_quality_predictor.pkl')
+
+    models = LazyComponents({'crop': slow_model, 'water': missing_model})
+    assert models.status()['crop'] == {'state': 'pending'}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(models['crop'])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['crop-model'] * 8 and calls == ['crop']
+    assert models.status()['crop']['state'] == 'ready' and models.status()['crop']['load_ms'] >= 50
+    print("  ✓ Concurrent first use loads the component once")
+
+    for _ in range(2):
+        try:
+            models['water']
+            assert False, "load errors must propagate"
+        except RuntimeError as e:
+            assert 'water_quality_predictor.pkl' in str(e)
+    assert calls == ['crop', 'water']
+    assert models.status()['water']['state'] == 'failed'
+    assert models['crop'] == 'crop-model'
+    ctx = _context('v1')._replace(models=models)
+    try:
+        ctx.load()
+        assert False, "load() must raise the first load error"
+    except RuntimeError:
+        pass
+    assert ctx.ready() == ['crop', 'dataset']
+    print("  ✓ A failed component is reported without affecting the others")
+
+    ctx = _context('v1')
+    assert ctx.ready() == []
+    assert ctx.dataset == ['v1'] and ctx.ready() == ['dataset']
+    ctx.prefetch().join()
+    assert ctx.ready() == ['crop', 'dataset']
+    print("  ✓ Context attributes load on access; prefetch loads the rest")
+
+
+class _Server:
+    """Holds the published context like app.model_context"""
+
+    def __init__(self):
+        self.context = _context('v1')
+        self.files = 'v1'   # stands in for the bundle fingerprint
+        self.fail = False
+        self.build_started = threading.Event()
+        self.release_build = threading.Event()
+        self.release_build.set()
+
+    def build(self):
+        self.build_started.set()
+        self.release_build.wait(5)
+        if self.fail:
+            raise RuntimeError('corrupt bundle')
+        return _context(self.files)
+
+    def swap(self, context):
+        self.context = context
+
+
+def test_reload_swaps_after_build():
+    """In-flight readers keep the old context; the swap happens once the new one is ready"""
+    server = _Server()
+    warmed = []
+    reloader = ModelReloader(server.build, server.swap, lambda: server.files, warmed.append)
+
+    in_flight = server.context          # a request that started before the reload
+    server.files = 'v2'
+    server.release_build.clear()
+    assert reloader.reload() is True
+    server.build_started.wait(5)
+
+    assert reloader.reload() is False   # one reload at a time
+    assert reloader.status()['state'] == 'loading'
+    assert server.context.version == 'v1'
+
+    server.release_build.set()
+    reloader.reload(wait=True)
+    assert server.context.version == 'v2'
+    assert in_flight.version == 'v1' and in_flight.models['crop'] == 'v1'
+    assert [ctx.version for ctx in warmed] == ['v2']
+    assert reloader.status()['reload_count'] == 1
+    print("  ✓ New context built, warmed up and swapped; in-flight context untouched")
+
+
+def test_failed_reload_keeps_current_context():
+    """A failing bundle leaves the served context in place"""
+    server = _Server()
+    reloader = ModelReloader(server.build, server.swap, lambda: server.files)
+
+    server.files, server.fail = 'v2', True
+    reloader.reload(wait=True)
+    assert server.context.version == 'v1'
+    assert reloader.status()['state'] == 'failed'
+    assert reloader.status()['last_error'] == 'corrupt bundle'
+    print("  ✓ Failed reload keeps serving the previous version")
+
+
+def test_watcher_reloads_on_change():
+    """The watcher reloads once the bundle fingerprint is stable"""
+    server = _Server()
+    reloader = ModelReloader(server.build, server.swap, lambda: server.files)
+    reloader.start_watcher(0.02)
+
+    server.files = 'v3'
+    deadline = time.time() + 5
+    while server.context.version != 'v3' and time.time() < deadline:
+        time.sleep(0.02)
+    assert server.context.version == 'v3'
+    assert reloader.status()['watching']
+    print("  ✓ File watcher picks up a changed bundle")
+
+
+if __name__ == "__main__":
+    test_lazy_components()
+    test_reload_swaps_after_build()
+    test_failed_reload_keeps_current_context()
+    test_watcher_reloads_on_change()
+    print("\n✓ Model context tests passed")
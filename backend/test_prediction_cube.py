@@ -0,0 +1,194 @@
+"""
+Test script for the prediction cube
+Checks that cube lookups return the same values as calling the models directly
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import MODEL_DIR, ENCODER_FILE, NUTRIENT_MODEL_FILE, NUTRIENT_FEATURE_DEFAULTS
+from utils.prediction_cube import (
+    CUBE_SECTIONS, PredictionCube, build_prediction_cube, load_or_build_cube_section, section_fingerprint
+)
+from utils.model_context import LazyComponents
+from utils.feature_encoder import FeatureEncoder
+from test_app_endpoints import get_app
+
+
+def get_zone(district):
+    """The zone lookup the served cube is built with (app.get_zone)"""
+    return get_app().get_zone(district)
+
+
+def _load_test_models():
+    """Real encoders/nutrient model plus small forests trained on random labels"""
+    encoders = joblib.load(os.path.join(MODEL_DIR, ENCODER_FILE))
+    rng = np.random.RandomState(0)
+
+    sizes = [len(encoders[col].classes_) for col in ['District', 'Soil_Type', 'Weather', 'Zone']]
+    X = np.column_stack([rng.randint(0, n, 500) for n in sizes])
+
+    crop_model = RandomForestClassifier(n_estimators=5, random_state=0)
+    crop_model.fit(X, rng.randint(0, len(encoders['Crop_Name'].classes_), 500))
+
+    water_model = RandomForestRegressor(n_estimators=5, random_state=0)
+    water_model.fit(X, rng.rand(500, 3))
+
+    models = {
+        'crop': crop_model,
+        'water': water_model,
+        'nutrient': joblib.load(os.path.join(MODEL_DIR, NUTRIENT_MODEL_FILE))
+    }
+    return models, encoders
+
+
+def test_cube_matches_models():
+    """Every cube cell must equal the direct single-row model output"""
+    print("="*80)
+    print("TESTING PREDICTION CUBE AGAINST DIRECT MODEL CALLS")
+    print("="*80)
+
+    models, encoders = _load_test_models()
+    cube = build_prediction_cube(models, FeatureEncoder(encoders), get_zone)
+
+    zone_enc = encoders['Zone']
+    for district, soil, weather, crop in [
+        ('Raigad', 'Laterite', 'Monsoon', 'Rice'),
+        ('Latur', 'Black', 'Semi-Arid', 'Sorghum'),
+        ('Nashik', 'Black', 'Moderate Rainfall', 'Grapes'),
+    ]:
+        d = encoders['District'].transform([district])[0]
+        s = encoders['Soil_Type'].transform([soil])[0]
+        w = encoders['Weather'].transform([weather])[0]
+        c = encoders['Crop_Name'].transform([crop])[0]
+        z = zone_enc.transform([get_zone(district)])[0]
+
+        expected_crop = models['crop'].predict_proba(np.array([[d, s, w, z]]))[0]
+        expected_water = models['water'].predict(np.array([[d, w, s, z]]))[0]
+        expected_nutrients = models['nutrient'].predict(np.array([[
+            d, s, c, w, z,
+            NUTRIENT_FEATURE_DEFAULTS['NPK_Ratio'], NUTRIENT_FEATURE_DEFAULTS['Total_Nutrients']
+        ]], dtype=float))[0]
+
+        assert np.allclose(cube.crop_probabilities(d, s, w), expected_crop)
+        assert np.allclose(cube.water_prediction(d, s, w), expected_water)
+        assert np.allclose(cube.nutrient_prediction(d, s, w, c), expected_nutrients)
+        print(f"  ✓ {district} + {soil} + {weather} ({crop})")
+
+
+def test_section_cache_roundtrip():
+    """Cached sections reload intact (without the model) and are rebuilt when the fingerprint changes"""
+    models, encoders = _load_test_models()
+    feature_encoder = FeatureEncoder(encoders)
+
+    def unloadable():
+        raise AssertionError('model loaded although the cached section is current')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for section, name in CUBE_SECTIONS.items():
+            path = os.path.join(tmp, section)
+            built = load_or_build_cube_section(path, section, lambda: models[name], feature_encoder, get_zone, 'v1')
+            cached = load_or_build_cube_section(path, section, unloadable, feature_encoder, get_zone, 'v1')
+            assert np.array_equal(cached, built)
+
+            rebuilt = load_or_build_cube_section(path, section, lambda: models[name], feature_encoder, get_zone, 'v2')
+            assert np.array_equal(rebuilt, built)
+        print("  ✓ Section cache roundtrip and stale fingerprint detection")
+
+
+def test_section_fingerprint_inputs():
+    """Zone map, nutrient feature defaults and format version invalidate cached sections"""
+    from utils import prediction_cube
+
+    _, encoders = _load_test_models()
+    feature_encoder = FeatureEncoder(encoders)
+
+    def moved_zone(district):
+        return 'Konkan' if district == 'Latur' else get_zone(district)
+
+    base = {section: section_fingerprint(section, 'files', feature_encoder, get_zone) for section in CUBE_SECTIONS}
+    for section in CUBE_SECTIONS:
+        assert section_fingerprint(section, 'files', feature_encoder, get_zone) == base[section]
+        assert section_fingerprint(section, 'other', feature_encoder, get_zone) != base[section]
+        assert section_fingerprint(section, 'files', feature_encoder, moved_zone) != base[section]
+
+    defaults, version = prediction_cube.NUTRIENT_FEATURE_DEFAULTS, prediction_cube.CUBE_FORMAT_VERSION
+    try:
+        prediction_cube.NUTRIENT_FEATURE_DEFAULTS = {**defaults, 'NPK_Ratio': defaults['NPK_Ratio'] + 1}
+        assert section_fingerprint('nutrients', 'files', feature_encoder, get_zone) != base['nutrients']
+        # The other sections do not use the nutrient features
+        assert section_fingerprint('water', 'files', feature_encoder, get_zone) == base['water']
+
+        prediction_cube.NUTRIENT_FEATURE_DEFAULTS = defaults
+        prediction_cube.CUBE_FORMAT_VERSION = version + 1
+        assert section_fingerprint('crop_proba', 'files', feature_encoder, get_zone) != base['crop_proba']
+    finally:
+        prediction_cube.NUTRIENT_FEATURE_DEFAULTS, prediction_cube.CUBE_FORMAT_VERSION = defaults, version
+    print("  ✓ Fingerprints cover the zone map, nutrient defaults and format version")
+
+
+def _lazy_cube(tmp, loaders, feature_encoder):
+    """PredictionCube over LazyComponents sections, as the app builds it"""
+    models = LazyComponents(loaders)
+    sections = LazyComponents({
+        section: (lambda section=section, name=name: load_or_build_cube_section(
+            os.path.join(tmp, section), section, lambda: models[name], feature_encoder, get_zone, 'v1'
+        ))
+        for section, name in CUBE_SECTIONS.items()
+    })
+    return PredictionCube(sections), models
+
+
+def test_sections_load_only_their_model():
+    """Reading one section loads only the model it is computed from"""
+    trained, encoders = _load_test_models()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cube, models = _lazy_cube(tmp, {name: (lambda name=name: trained[name]) for name in trained},
+                                  FeatureEncoder(encoders))
+        assert cube.nutrients is not None
+        assert models.is_ready('nutrient')
+        assert not models.is_ready('crop') and not models.is_ready('water')
+        print("  ✓ Nutrient section built without loading the crop or water model")
+
+
+def test_failed_model_only_loses_its_section():
+    """A model that fails to load leaves the other sections of the cube intact"""
+    models, encoders = _load_test_models()
+
+    def broken():
+        raise EOFError('truncated pickle')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cube, _ = _lazy_cube(tmp, {'crop': broken, 'water': lambda: models['water'],
+                                   'nutrient': lambda: models['nutrient']}, FeatureEncoder(encoders))
+        assert cube.crop_proba is None
+        assert cube.water is not None and cube.nutrients is not None
+        # Only the built sections are cached; the crop section is retried by the next context
+        assert not os.path.exists(os.path.join(tmp, 'crop_proba'))
+        assert os.path.exists(os.path.join(tmp, 'water')) and os.path.exists(os.path.join(tmp, 'nutrients'))
+        print("  ✓ Failed crop model: water and nutrient sections still built")
+
+        # Next start: the cached sections are reused, only crop_proba is built
+        cube, restarted = _lazy_cube(tmp, {'crop': lambda: models['crop'], 'water': broken,
+                                           'nutrient': broken}, FeatureEncoder(encoders))
+        assert cube.crop_proba is not None and cube.water is not None and cube.nutrients is not None
+        assert restarted.is_ready('crop') and not restarted.is_ready('water') and not restarted.is_ready('nutrient')
+        print("  ✓ Restart: cached sections reused, only the missing one built")
+
+
+if __name__ == "__main__":
+    test_cube_matches_models()
+    test_section_cache_roundtrip()
+    test_section_fingerprint_inputs()
+    test_sections_load_only_their_model()
+    test_failed_model_only_loses_its_section()
+    print("\n✓ Prediction cube tests passed")
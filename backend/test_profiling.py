@@ -0,0 +1,113 @@
+"""
+Test script for sampled / on-demand request profiling
+"""
+
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.profiling import RequestProfiler
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _calibrate():
+    _busy(0.006)
+
+
+def _validate():
+    _busy(0.002)
+
+
+def _handler():
+    _calibrate()
+    _validate()
+    _validate()
+
+
+def _name(label):
+    """Function name of a 'dir/file.py:name:line' label (builtins are just a name)"""
+    return label.split(':')[1] if label.count(':') >= 2 else label
+
+
+def _profile(profiler, route='/compare-crops'):
+    profile = profiler.start()
+    assert profile is not None
+    _handler()
+    return profiler.stop(profile, 'requested', 'POST', route, route, 200, 0.01)
+
+
+def test_capture_contents():
+    """Captures hold the top functions and collapsed stacks of the handler"""
+    print("="*80)
+    print("TESTING REQUEST PROFILING")
+    print("="*80)
+
+    profiler = RequestProfiler(top_n=5)
+    record = _profile(profiler)
+    assert record.id == 1 and record.route == '/compare-crops'
+
+    names = [_name(entry['function']) for entry in record.top]
+    assert len(record.top) <= 5
+    # Callers before callees (the busy loops overrun by a time slice under load,
+    # so _calibrate and _validate are not compared with each other)
+    assert names.index('_handler') < names.index('_calibrate')
+    assert names.index('_handler') < names.index('_validate')
+    validate = record.top[names.index('_validate')]
+    assert validate['ncalls'] == 2 and validate['cumtime_ms'] >= 4
+    print("  ✓ Top functions by cumulative time")
+
+    stacks = {}
+    for line in record.collapsed:
+        path, microseconds = line.rsplit(' ', 1)
+        stacks[tuple(_name(frame) for frame in path.split(';'))] = int(microseconds)
+    under = lambda name: sum(us for path, us in stacks.items() if name in path)
+    assert all('_handler' in path for path in stacks if '_calibrate' in path)
+    # 6 ms in _calibrate, 2 x 2 ms in _validate (time of the calls below them included)
+    assert 5000 <= under('_calibrate') and 3000 <= under('_validate')
+    assert under('_handler') >= under('_calibrate') + under('_validate')
+    print(f"  ✓ {len(record.collapsed)} collapsed stacks, e.g. {record.collapsed[0][-70:]}")
+
+
+def test_ring_buffer_and_single_profiler():
+    """The buffer keeps the newest captures; one request is profiled at a time"""
+    profiler = RequestProfiler(buffer_size=3)
+    for _ in range(5):
+        _profile(profiler)
+    assert [record.id for record in profiler.records()] == [5, 4, 3]
+    assert profiler.get(1) is None and profiler.get(4).id == 4
+    print("  ✓ Ring buffer keeps the last captures")
+
+    active = profiler.start()
+    assert profiler.start() is None
+    profiler.abort(active)
+    assert profiler.status()['skipped_busy'] == 1
+    _profile(profiler)
+    assert profiler.status()['profiled'] == 6
+    print("  ✓ Concurrent captures are skipped")
+
+    profiler.clear()
+    assert profiler.records() == []
+
+
+def test_sampling_rate():
+    """Sampling follows the configured rate"""
+    assert not any(RequestProfiler(sample_rate=0).should_sample() for _ in range(1000))
+    assert all(RequestProfiler(sample_rate=1).should_sample() for _ in range(1000))
+    sampled = sum(RequestProfiler(sample_rate=0.1).should_sample() for _ in range(10000))
+    assert 800 < sampled < 1200
+    print("  ✓ Sampling rate")
+
+
+if __name__ == "__main__":
+    test_capture_contents()
+    test_ring_buffer_and_single_profiler()
+    test_sampling_rate()
+    print("\n✓ Request profiling tests passed")
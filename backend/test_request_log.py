@@ -0,0 +1,104 @@
+"""
+Test script for the structured request log
+"""
+
+import sys
+import os
+import json
+import tempfile
+import multiprocessing
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.request_log import RequestLog, read_request_log, request_log_files
+
+
+def _log(request_log, district='Pune', latency=0.002):
+    request_log.log(
+        method='POST', route='/recommend-crop', path='/recommend-crop', query='',
+        payload={'Weather': 'Dry', 'Soil_Type': 'Black', 'District': district},
+        status=200, latency=latency, response_bytes=2114, cache='MISS'
+    )
+
+
+def test_records_and_rotation():
+    """One sorted JSON line per request; rotation keeps the configured backups"""
+    print("="*80)
+    print("TESTING REQUEST LOG")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'requests.jsonl')
+        request_log = RequestLog(path, max_bytes=0)
+        _log(request_log)
+        request_log.log('GET', '/district-insights/<district_name>', '/district-insights/Mumbai City',
+                        '', None, 404, 0.001, 80)
+        request_log.close()
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 2
+        assert '"payload":{"District":"Pune","Soil_Type":"Black","Weather":"Dry"}' in lines[0]
+        record = json.loads(lines[0])
+        assert record['latency_ms'] == 2.0 and record['status'] == 200 and record['cache'] == 'MISS'
+        assert [r['path'] for r in read_request_log(path)] == ['/recommend-crop', '/district-insights/Mumbai City']
+        print("  ✓ Normalized JSON lines")
+
+        # Oversized payloads are left out, the request is still logged
+        small = RequestLog(path, max_bytes=0, max_payload_bytes=100)
+        _log(small, district='x' * 200)
+        small.close()
+        last = list(read_request_log(path))[-1]
+        assert last['payload'] is None and last['payload_omitted'] is True
+        print("  ✓ Oversized payloads omitted")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'requests.jsonl')
+        request_log = RequestLog(path, max_bytes=2000, backups=2)
+        for i in range(100):
+            _log(request_log, district=f'District {i}')
+        request_log.close()
+
+        assert request_log.rotations > 2 and request_log.written == 100
+        assert request_log_files(path) == [f'{path}.2', f'{path}.1', path]
+        assert not os.path.exists(f'{path}.3')
+        districts = [r['payload']['District'] for r in read_request_log(path)]
+        # The newest requests survive, oldest first
+        assert districts == [f'District {i}' for i in range(100 - len(districts), 100)]
+        print(f"  ✓ Rotation keeps {len(districts)} newest requests in 3 files")
+
+
+def _writer(path, worker, n):
+    request_log = RequestLog(path, max_bytes=20000, backups=100)
+    for i in range(n):
+        _log(request_log, district=f'{worker}-{i}')
+    request_log.close()
+
+
+def test_concurrent_workers():
+    """Worker processes share one file without interleaved lines or lost rotations"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'requests.jsonl')
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_writer, args=(path, w, 300)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        files = request_log_files(path)
+        assert len(files) > 3
+        for file_path in files:
+            with open(file_path) as f:
+                for line in f:
+                    json.loads(line)
+        districts = [r['payload']['District'] for r in read_request_log(path)]
+        assert sorted(districts) == sorted(f'{w}-{i}' for w in range(4) for i in range(300))
+        print(f"  ✓ 4 workers, 1200 requests, {len(files)} files, no lines lost")
+
+
+if __name__ == "__main__":
+    test_records_and_rotation()
+    test_concurrent_workers()
+    print("\n✓ Request log tests passed")
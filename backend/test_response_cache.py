@@ -0,0 +1,122 @@
+"""
+Test script for the inference response cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.response_cache import (
+    ResponseCache, MemoryCache, SharedMemoryCache, SQLiteCache, response_cache_key
+)
+
+
+def test_cache_keys():
+    """Keys ignore dict order, but not the path, version or values"""
+    print("="*80)
+    print("TESTING RESPONSE CACHE")
+    print("="*80)
+
+    body = {'District': 'Pune', 'Soil_Type': 'Black', 'Weather': 'Dry'}
+    key = response_cache_key('/recommend-crop', 'v1', body)
+    assert key == response_cache_key('/recommend-crop', 'v1', dict(reversed(list(body.items()))))
+    assert key != response_cache_key('/recommend-crop', 'v2', body)
+    assert key != response_cache_key('/water-quality-analysis', 'v1', body)
+    assert key != response_cache_key('/recommend-crop', 'v1', {**body, 'Weather': 'Monsoon'})
+    assert response_cache_key('/compare-crops', 'v1', {'crops': ['Rice', 'Wheat']}) != \
+        response_cache_key('/compare-crops', 'v1', {'crops': ['Wheat', 'Rice']})
+    print("  ✓ Keys are normalized over the request body")
+
+
+def test_lru_and_ttl():
+    """Least recently used entries are evicted; expired entries miss"""
+    cache = MemoryCache(max_entries=2)
+    cache.put(b'a', b'{"a":1}')
+    cache.put(b'b', b'{"b":2}')
+    assert cache.get(b'a') == b'{"a":1}'      # 'a' is now most recent
+    cache.put(b'c', b'{"c":3}')
+    assert cache.get(b'b') is None and cache.get(b'c') == b'{"c":3}'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (2, 1, 1, 2)
+    print("  ✓ LRU eviction and counters")
+
+    cache = MemoryCache(max_entries=10, ttl=0.05)
+    cache.put(b'a', b'{}')
+    assert cache.get(b'a') == b'{}'
+    time.sleep(0.06)
+    assert cache.get(b'a') is None
+    assert cache.stats()['expirations'] == 1 and len(cache) == 0
+    print("  ✓ Entries expire after the TTL")
+
+    class Incomplete(ResponseCache):
+        backend = 'incomplete'
+
+        def _lookup(self, key):
+            return None, False
+
+    for cls in (ResponseCache, Incomplete):
+        try:
+            cls()
+            assert False, "backends must implement the whole interface"
+        except TypeError:
+            pass
+    print("  ✓ Backends missing part of the interface cannot be created")
+
+
+def _key(i):
+    return response_cache_key('/recommend-crop', 'v1', {'District': f'D{i}'})
+
+
+def _read_in_child(cache, queue):
+    """Runs in a separate process: sees the parent's entries, adds its own"""
+    queue.put(cache.get(_key(0)))
+    cache.put(_key(1), b'{"from":"child"}')
+
+
+def test_shared_backends():
+    """Entries stored by one process are served to another"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        caches = [
+            SharedMemoryCache(max_entries=8, name=f'test_cache_{os.getpid()}', slot_bytes=64),
+            SQLiteCache(max_entries=8, path=os.path.join(tmp_dir, 'cache.sqlite3'))
+        ]
+        caches[1].TOUCH_INTERVAL = 0
+        for cache in caches:
+            cache.clear()
+            cache.put(_key(0), b'{"from":"parent"}')
+
+            context = multiprocessing.get_context('fork')
+            queue = context.Queue()
+            child = context.Process(target=_read_in_child, args=(cache, queue))
+            child.start()
+            child.join(10)
+            assert queue.get(timeout=5) == b'{"from":"parent"}'
+            assert cache.get(_key(1)) == b'{"from":"child"}'
+
+            # Bounded: the least recently used entry goes first
+            time.sleep(0.01)
+            cache.get(_key(0))
+            for i in range(2, 9):
+                cache.put(_key(i), b'{}')
+            assert len(cache) == 8 and cache.get(_key(1)) is None and cache.get(_key(0)) is not None
+            assert cache.stats()['evictions'] == 1
+            print(f"  ✓ {cache.backend} backend shared across processes, LRU bounded")
+
+        shm = caches[0]
+        shm.put(_key(99), b'x' * 65)
+        assert shm.get(_key(99)) is None and shm.stats()['oversize'] == 1
+        shm.unlink()
+        for cache in caches:
+            cache.close()
+
+
+if __name__ == "__main__":
+    test_cache_keys()
+    test_lru_and_ttl()
+    test_shared_backends()
+    print("\n✓ Response cache tests passed")
@@ -0,0 +1,144 @@
+"""
+Test script for single-flight request coalescing
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_identical_calls_share_one_computation():
+    """Concurrent calls with the same key run the computation once"""
+    print("="*80)
+    print("TESTING SINGLE FLIGHT")
+    print("="*80)
+
+    flight = SingleFlight()
+    calls = []
+    results = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return (200, b'{"crop":"Rice"}')
+
+    def request():
+        results.append(flight.do(b'pune-black-dry', compute))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(5)
+    _run_concurrently(20, request)
+    leader.join()
+
+    assert len(calls) == 1
+    assert [r for r, _ in results] == [(200, b'{"crop":"Rice"}')] * 21
+    assert sum(shared for _, shared in results) == 20
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 20, 'timeouts': 0}
+    print("  ✓ 21 identical requests, 1 computation")
+
+    # Finished calls are not reused
+    flight.do(b'pune-black-dry', compute)
+    assert len(calls) == 2
+    print("  ✓ Later requests compute again")
+
+
+def test_errors_and_distinct_keys():
+    """Followers see the leader's exception; different keys do not wait"""
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError('model not loaded')
+
+    def request():
+        try:
+            flight.do('k', failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(5)
+    _run_concurrently(3, request)
+    leader.join()
+    assert [str(e) for e in errors] == ['model not loaded'] * 4
+    # Each follower raises its own copy, chained to the leader's exception
+    assert len({id(e) for e in errors}) == 4
+    assert sum(e.__cause__ is None for e in errors) == 1
+    assert len({id(e.__cause__) for e in errors if e.__cause__ is not None}) == 1
+    print("  ✓ Leader errors are shared as per-follower copies")
+
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+    print("  ✓ Distinct keys compute independently")
+
+
+def test_followers_wait_for_the_leader():
+    """Followers never compute; they time out after wait_timeout instead"""
+    flight = SingleFlight(wait_timeout=0.5)
+    started = threading.Event()
+    calls = []
+    outcomes = []
+
+    def slow(delay):
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(delay)
+            return 'done'
+        return compute
+
+    # Leader slower than a short poll, faster than the timeout: followers wait
+    def request(delay):
+        try:
+            outcomes.append(flight.do('k', slow(delay)))
+        except SingleFlightTimeout:
+            outcomes.append('timeout')
+
+    leader = threading.Thread(target=request, args=(0.2,))
+    leader.start()
+    started.wait(5)
+    _run_concurrently(3, lambda: request(0.2))
+    leader.join()
+    assert len(calls) == 1 and sorted(outcomes, key=str) == [('done', False)] + [('done', True)] * 3
+    print("  ✓ Followers wait for a slow leader")
+
+    # Leader slower than the timeout: followers give up without computing
+    calls.clear()
+    outcomes.clear()
+    started.clear()
+    leader = threading.Thread(target=request, args=(1.0,))
+    leader.start()
+    started.wait(5)
+    _run_concurrently(3, lambda: request(1.0))
+    leader.join()
+    assert len(calls) == 1 and sorted(outcomes, key=str) == [('done', False)] + ['timeout'] * 3
+    assert flight.stats()['timeouts'] == 3
+    print("  ✓ Followers time out instead of computing a second time")
+
+
+if __name__ == "__main__":
+    test_identical_calls_share_one_computation()
+    test_errors_and_distinct_keys()
+    test_followers_wait_for_the_leader()
+    print("\n✓ Single flight tests passed")
@@ -0,0 +1,107 @@
+"""
+Test script for per-stage request timing
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.timing import span, timed, start_timing, stop_timing, current_timings, TimingStats
+
+
+@timed('validate')
+def _validate(crop):
+    time.sleep(0.002)
+    return crop
+
+
+def test_spans_in_timed_request():
+    """Spans add up per stage and render as a Server-Timing header"""
+    print("="*80)
+    print("TESTING REQUEST TIMING")
+    print("="*80)
+
+    token = start_timing()
+    try:
+        with span('encode'):
+            time.sleep(0.003)
+        for crop in ['Rice', 'Wheat', 'Cotton']:
+            _validate(crop)
+        timings = current_timings()
+    finally:
+        stop_timing(token)
+
+    stages = {stage: (seconds, count) for stage, seconds, count in timings.items()}
+    assert list(stages) == ['encode', 'validate']
+    assert stages['encode'][0] >= 0.003 and stages['encode'][1] == 1
+    assert stages['validate'][0] >= 0.006 and stages['validate'][1] == 3
+
+    header = timings.server_timing(0.0123)
+    assert header.startswith('encode;dur=')
+    assert 'validate;dur=' in header and ';desc="x3"' in header
+    assert header.endswith('total;dur=12.30')
+    print(f"  ✓ Server-Timing: {header}")
+
+
+def test_disabled_is_no_op():
+    """Outside a timed request spans record nothing"""
+    assert current_timings() is None
+    assert span('encode') is span('jsonify')
+    with span('encode'):
+        pass
+    assert _validate('Rice') == 'Rice'
+    assert current_timings() is None
+    print("  ✓ No-op outside timed requests")
+
+
+def test_requests_are_isolated():
+    """Each thread times its own request"""
+    results = {}
+
+    def request(name, stage):
+        token = start_timing()
+        try:
+            with span(stage):
+                time.sleep(0.001)
+            results[name] = [s for s, _, _ in current_timings().items()]
+        finally:
+            stop_timing(token)
+
+    threads = [threading.Thread(target=request, args=(f'r{i}', f'stage{i}')) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {f'r{i}': [f'stage{i}'] for i in range(4)}
+    print("  ✓ Concurrent requests do not share spans")
+
+
+def test_stats_aggregate_per_route():
+    """TimingStats keeps count / mean / max per route and stage"""
+    stats = TimingStats()
+    for seconds in (0.001, 0.003):
+        token = start_timing()
+        try:
+            current_timings().add('crop_model', seconds)
+            stats.record('/recommend-crop', current_timings(), seconds * 2)
+        finally:
+            stop_timing(token)
+
+    snapshot = stats.snapshot()['/recommend-crop']
+    assert snapshot['crop_model'] == {'count': 2, 'total_ms': 4.0, 'mean_ms': 2.0, 'max_ms': 3.0}
+    assert snapshot['total']['max_ms'] == 6.0
+    stats.reset()
+    assert stats.snapshot() == {}
+    print("  ✓ Per-route aggregates")
+
+
+if __name__ == "__main__":
+    test_spans_in_timed_request()
+    test_disabled_is_no_op()
+    test_requests_are_isolated()
+    test_stats_aggregate_per_route()
+    print("\n✓ Request timing tests passed")
@@ -13,7 +13,14 @@ import os
 # Add backend to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from validation import validate_prediction, get_alternative_crops, filter_invalid_crops
+from validation import (
+    REGION_ALLOWED_CROPS, REGION_FORBIDDEN_CROPS, SOIL_COMPATIBLE_CROPS,
+    WEATHER_COMPATIBLE_CROPS, get_region, crop_class_bits, valid_class_mask, valid_class_masks,
+    _crop_id_space
+)
 
 def test_validation():
     """Run validation tests"""
@@ -137,7 +144,7 @@ def test_validation():
     
     print(f"{'='*80}\n")
     
-    return failed == 0
+    assert failed == 0, f"{failed} of {len(test_cases)} validation tests failed"
 
 
 def test_filtering():
@@ -172,12 +179,60 @@ def test_filtering():
     
     # Check if filtering worked
     filtered_crops = [p['crop'] for p in filtered]
-    if 'Grapes' not in filtered_crops and 'Cotton' not in filtered_crops:
-        print(f"\n✓ Filtering worked! Grapes and Cotton were correctly filtered out.")
-        return True
-    else:
-        print(f"\n✗ Filtering failed! Invalid crops were not removed.")
-        return False
+    assert 'Grapes' not in filtered_crops and 'Cotton' not in filtered_crops, \
+        f"Invalid crops were not removed: {filtered_crops}"
+    assert filtered_crops == ['Rice', 'Coconut', 'Mango']
+    print(f"\n✓ Filtering worked! Grapes and Cotton were correctly filtered out.")
+
+
+def test_bitmask_rules():
+    """Compiled bitmasks agree with the list-based rule tables"""
+    
+    print("="*80)
+    print("TESTING COMPILED RULE BITMASKS")
+    print("="*80)
+    
+    classes = ['Rice', 'Coconut', 'Grapes', 'Mango', 'Cotton', 'Sorghum', 'Chili']
+    class_bits = crop_class_bits(classes)
+    conditions = [
+        ('Raigad', 'Laterite', 'Monsoon'),
+        ('Latur', 'Black', 'Semi-Arid'),
+        ('Nowhere', 'Black', 'Dry'),
+    ]
+    
+    for district, soil, weather in conditions:
+        region = get_region(district)
+        expected = sorted(
+            (set(REGION_ALLOWED_CROPS.get(region, []))
+             & set(SOIL_COMPATIBLE_CROPS.get(soil, []))
+             & set(WEATHER_COMPATIBLE_CROPS.get(weather, [])))
+            - set(REGION_FORBIDDEN_CROPS.get(region, []))
+        )
+        assert get_alternative_crops(district, soil, weather) == expected
+        
+        mask = valid_class_mask(class_bits, district, soil, weather)
+        assert [c for c, ok in zip(classes, mask) if ok] == [c for c in classes if c in expected]
+        print(f"  ✓ {district} + {soil} + {weather}: {', '.join(expected) or 'none'}")
+    
+    # Batch masks equal the single-request ones
+    batch = valid_class_masks(class_bits, *zip(*conditions))
+    for row, condition in enumerate(conditions):
+        assert np.array_equal(batch[row], valid_class_mask(class_bits, *condition))
+    
+    # limit stops after the first valid predictions
+    predictions = [(crop, 0.5) for crop in classes]
+    limited = filter_invalid_crops(predictions, 'Raigad', 'Laterite', 'Monsoon', limit=2)
+    assert [p['crop'] for p in limited] == ['Rice', 'Coconut']
+    print("  ✓ Batch masks and limited filtering")
+    
+    # Rule tables naming 63+ crops do not fit the int64 masks
+    assert _crop_id_space({'Region': [f'Crop {i}' for i in range(62)]}) == sorted(f'Crop {i}' for i in range(62))
+    try:
+        _crop_id_space({'Region': [f'Crop {i}' for i in range(62)]}, {'Soil': ['Crop 62']})
+        assert False, "63 crops must not compile"
+    except ValueError as e:
+        assert 'int64 bitmask' in str(e)
+    print("  ✓ Crop ID space limited to 62 crops")
 
 
 if __name__ == "__main__":
@@ -189,10 +244,12 @@ if __name__ == "__main__":
     print("█" * 80)
     print("\n")
     
-    # Run tests
-    validation_passed = test_validation()
+    # Run tests (each raises AssertionError on failure)
+    test_validation()
     print("\n")
-    filtering_passed = test_filtering()
+    test_filtering()
+    print("\n")
+    test_bitmask_rules()
     
     # Final result
     print("\n")
@@ -200,19 +257,15 @@ if __name__ == "__main__":
     print("FINAL TEST RESULTS")
     print("="*80)
     
-    if validation_passed and filtering_passed:
-        print("✓✓✓ ALL TESTS PASSED ✓✓✓")
-        print("\nThe system is ready for use with:")
-        print("  - Scientific crop-district-soil compatibility")
-        print("  - Regional constraint enforcement (0% violations)")
-        print("  - Accurate recommendations based on research data")
-        print("\nNext steps:")
-        print("  1. Run: python train_models_research.py")
-        print("  2. Run: python app.py")
-        print("  3. Test with frontend")
-    else:
-        print("⚠ SOME TESTS FAILED")
-        print("Please review the validation configuration.")
+    print("✓✓✓ ALL TESTS PASSED ✓✓✓")
+    print("\nThe system is ready for use with:")
+    print("  - Scientific crop-district-soil compatibility")
+    print("  - Regional constraint enforcement (0% violations)")
+    print("  - Accurate recommendations based on research data")
+    print("\nNext steps:")
+    print("  1. Run: python train_models_research.py")
+    print("  2. Run: python app.py")
+    print("  3. Test with frontend")
     
     print("="*80)
     print("\n")
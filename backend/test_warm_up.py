@@ -0,0 +1,69 @@
+"""
+Test script for the startup warm-up
+Uses a small stand-in Flask app, so no trained models are needed
+"""
+
+import sys
+import os
+
+from flask import Flask, jsonify, request
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.warm_up import WarmUp, WarmUpRequest
+
+
+def _app(seen):
+    app = Flask(__name__)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        seen.append(WarmUp.is_warm_up(request.environ))
+        return jsonify(request.json)
+
+    @app.route('/broken', methods=['GET'])
+    def broken():
+        return jsonify({'success': False}), 500
+
+    return app
+
+
+def test_warm_up_records_timings():
+    """Every request is sent cold and warm; readiness flips when done"""
+    print("="*80)
+    print("TESTING STARTUP WARM-UP")
+    print("="*80)
+
+    seen = []
+    warm_up = WarmUp(_app(seen).test_client, [
+        WarmUpRequest('POST', '/echo', {'records': [{'District': 'Pune'}] * 4}),
+        WarmUpRequest('GET', '/broken')
+    ])
+    assert not warm_up.ready and warm_up.status()['state'] == 'pending'
+
+    warm_up.start()
+    assert warm_up.wait(10)
+    status = warm_up.status()
+    assert warm_up.ready and status['state'] == 'done'
+    assert [r['status'] for r in status['requests']] == [200, 500]
+    assert status['failed'] == warm_up.failed == ['GET /broken: 500']
+    assert all(r['first_ms'] >= 0 and r['warm_ms'] >= 0 for r in status['requests'])
+    assert seen == [True, True]
+    print("  ✓ Warm-up requests sent twice, timed and tagged")
+
+    # A client cannot pass as warm-up traffic with a header
+    seen.clear()
+    _app(seen).test_client().post('/echo', json={}, headers={'X-Warm-Up': '1', 'smartfarmer.warm_up': '1'})
+    assert seen == [False]
+    print("  ✓ Warm-up marker cannot be set over HTTP")
+
+    skipped = WarmUp(_app([]).test_client, [])
+    skipped.skip()
+    assert skipped.ready and skipped.status()['state'] == 'skipped'
+    print("  ✓ Skipped warm-up reports ready immediately")
+
+
+if __name__ == "__main__":
+    test_warm_up_records_timings()
+    print("\n✓ Warm-up tests passed")
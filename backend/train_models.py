@@ -19,6 +19,7 @@ from config import (
     WATER_MODEL_FILE, FERTILIZER_MODEL_FILE, ENCODER_FILE, SCALER_FILE,
     AGRICULTURAL_ZONES
 )
+from utils.model_bundle import write_manifest
 
 
 class DataProcessor:
@@ -463,6 +464,24 @@ def train_all_models():
     # Save encoders and scalers
     processor.save_encoders_scalers()
     
+    # Record what produced this bundle
+    manifest = write_manifest(
+        MODEL_DIR,
+        trainer=__file__,
+        dataset_path=DATASET_PATH,
+        features={
+            'crop': crop_model.feature_columns,
+            'nutrient': nutrient_model.feature_columns,
+            'water': water_model.feature_columns,
+            'fertilizer': fertilizer_model.feature_columns
+        },
+        encoders=processor.encoders,
+        files=[CROP_MODEL_FILE, NUTRIENT_MODEL_FILE, WATER_MODEL_FILE,
+               FERTILIZER_MODEL_FILE, ENCODER_FILE, SCALER_FILE],
+        dataset_rows=len(df)
+    )
+    print(f"Bundle manifest written (version {manifest['version']})")
+    
     # Summary
     print("\n" + "="*70)
     print("MODEL TRAINING COMPLETE - SUMMARY")
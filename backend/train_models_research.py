@@ -23,6 +23,16 @@ from validation import (
     validate_prediction, get_region, DISTRICT_TO_REGION,
     filter_invalid_crops, run_validation_tests
 )
+from utils.model_bundle import write_manifest
+
+# Input feature order of each model (recorded in the bundle manifest)
+TRAINING_FEATURES = {
+    'crop': ['District', 'Soil_Type', 'Weather', 'Zone'],
+    'nutrient': ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone', 'NPK_Ratio', 'Total_Nutrients'],
+    'water': ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone'],
+    'fertilizer': ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone',
+                   'N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha']
+}
 
 print("="*70)
 print("MAHARASHTRA SMART FARMER - RESEARCH-BASED TRAINING")
@@ -102,7 +112,7 @@ def train_crop_model(processor, df):
     print(f"{'='*70}")
     
     # Features
-    features = ['District', 'Soil_Type', 'Weather', 'Zone']
+    features = TRAINING_FEATURES['crop']
     target = 'Crop_Name'
     
     # Encode
@@ -176,7 +186,7 @@ def train_nutrient_model(processor, df):
     print("TRAINING: NUTRIENT PREDICTION MODEL")
     print(f"{'='*70}")
     
-    features = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone', 'NPK_Ratio', 'Total_Nutrients']
+    features = TRAINING_FEATURES['nutrient']
     targets = ['N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha', 'Zn_kg_ha', 'S_kg_ha']
     
     # Encode
@@ -231,7 +241,7 @@ def train_water_model(processor, df):
     print("TRAINING: WATER QUALITY MODEL")
     print(f"{'='*70}")
     
-    features = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone']
+    features = TRAINING_FEATURES['water']
     targets = ['Recommended_pH', 'Turbidity_NTU', 'Water_Temp_C']
     
     # Encode
@@ -271,8 +281,7 @@ def train_fertilizer_model(processor, df):
     print("TRAINING: FERTILIZER RECOMMENDATION MODEL")
     print(f"{'='*70}")
     
-    features = ['District', 'Soil_Type', 'Crop_Name', 'Weather', 'Zone', 
-                'N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha']
+    features = TRAINING_FEATURES['fertilizer']
     target = 'Fertilizer'
     
     # Encode categorical columns (fit=True for new columns like Fertilizer)
@@ -338,7 +347,19 @@ def main():
     joblib.dump(processor.label_encoders, os.path.join(MODEL_DIR, 'encoders.pkl'))
     joblib.dump(processor.scalers, os.path.join(MODEL_DIR, 'scalers.pkl'))
     
+    manifest = write_manifest(
+        MODEL_DIR,
+        trainer=__file__,
+        dataset_path=DATASET_PATH,
+        features=TRAINING_FEATURES,
+        encoders=processor.label_encoders,
+        files=['crop_recommender.pkl', 'nutrient_predictor.pkl', 'water_quality_predictor.pkl',
+               'fertilizer_recommender.pkl', 'encoders.pkl', 'scalers.pkl'],
+        dataset_rows=len(df)
+    )
+    
     print("✓ All models saved!")
+    print(f"✓ Bundle manifest written (version {manifest['version']})")
     
     # Final summary
     print(f"\n{'='*70}")
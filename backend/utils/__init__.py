@@ -5,6 +5,9 @@ Utility modules for Smart Farmer Recommender System
 from .crop_prediction_calibrator import (
     calibrate_crop_predictions,
     calibrate_comparison_results,
+    calibrate_comparison_arrays,
+    calibrate_batch,
+    calibration_crop_ids,
     get_crop_config,
     is_crop_suitable_for_zone,
     get_realistic_nutrient_range,
@@ -14,14 +17,52 @@ from .crop_prediction_calibrator import (
 from .crop_suitability_validator import (
     validate_crop_suitability,
     validate_crop_comparison,
+    validate_crop_suitability_batch,
+    get_suitability_matrix,
+    SuitabilityMatrix,
     get_zone_from_district,
     get_traditional_crops_for_district
 )
 
+from .feature_encoder import FeatureEncoder
+
+from .dataset_insights import DatasetInsights
+
+from .forest_engine import (
+    FlatForest,
+    flatten_forest,
+    load_or_flatten_forest
+)
+
+from .mlp_engine import (
+    MLPEngine,
+    export_mlp,
+    load_or_export_mlp
+)
+
+from .model_bundle import (
+    ModelBundle,
+    write_manifest
+)
+
+from .model_context import (
+    ModelContext,
+    ModelReloader
+)
+
+from .prediction_cube import (
+    PredictionCube,
+    build_prediction_cube,
+    load_or_build_cube_section
+)
+
 __all__ = [
     # Calibration functions
     'calibrate_crop_predictions',
     'calibrate_comparison_results',
+    'calibrate_comparison_arrays',
+    'calibrate_batch',
+    'calibration_crop_ids',
     'get_crop_config',
     'is_crop_suitable_for_zone',
     'get_realistic_nutrient_range',
@@ -29,6 +70,31 @@ __all__ = [
     # Suitability validation functions
     'validate_crop_suitability',
     'validate_crop_comparison',
+    'validate_crop_suitability_batch',
+    'get_suitability_matrix',
+    'SuitabilityMatrix',
     'get_zone_from_district',
-    'get_traditional_crops_for_district'
+    'get_traditional_crops_for_district',
+    # Categorical encoding
+    'FeatureEncoder',
+    # Precomputed dataset aggregates
+    'DatasetInsights',
+    # Pure-NumPy forest inference
+    'FlatForest',
+    'flatten_forest',
+    'load_or_flatten_forest',
+    # NumPy MLP inference
+    'MLPEngine',
+    'export_mlp',
+    'load_or_export_mlp',
+    # Versioned model bundle
+    'ModelBundle',
+    'write_manifest',
+    # Hot-swappable serving state
+    'ModelContext',
+    'ModelReloader',
+    # Precomputed model outputs
+    'PredictionCube',
+    'build_prediction_cube',
+    'load_or_build_cube_section'
 ]
@@ -0,0 +1,116 @@
+"""
+Artifact Store - Memory-Mapped Model Artifacts
+===============================================
+
+Model artifacts (flattened forests, MLP weights, the prediction cube) are
+stored as a directory of raw .npy files plus a small meta.json:
+
+    models/crop_recommender.forest/
+        meta.json          fingerprint and scalar attributes
+        feature.npy        one file per array
+        threshold.npy
+        ...
+
+Arrays are opened with np.load(mmap_mode='r'), so every gunicorn worker maps
+the same files and the pages are shared through the OS page cache instead of
+each worker holding a private, unpickled copy. Mapped arrays are read-only.
+
+Artifacts are written to a temporary directory and swapped in with a rename,
+so a worker never maps a half-written artifact; workers that mapped the
+previous version keep reading it until they reload.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MMAP_MODEL_ARTIFACTS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+
+
+class Artifact(NamedTuple):
+    """Arrays and metadata of a stored artifact"""
+    arrays: Dict[str, np.ndarray]
+    meta: Dict[str, Any]
+
+
+def save_artifact(directory: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    """
+    Write `arrays` (one .npy each) and `meta` (JSON) to `directory`,
+    replacing any previous artifact atomically.
+    """
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    old_dir = f"{directory}.old-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    try:
+        for name, array in arrays.items():
+            # Plain C-contiguous arrays map without any conversion on load
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        if os.path.exists(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def artifact_size(directory: str) -> int:
+    """Total size in bytes of the files of an artifact directory"""
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def load_artifact(
+    directory: str,
+    fingerprint: Optional[str] = None,
+    mmap: Optional[bool] = None
+) -> Optional[Artifact]:
+    """
+    Open an artifact written by save_artifact().
+
+    Args:
+        directory: Artifact directory
+        fingerprint: Expected fingerprint (None skips the check)
+        mmap: Memory-map the arrays (default: MMAP_MODEL_ARTIFACTS)
+
+    Returns:
+        Artifact, or None if it is missing or its fingerprint differs
+    """
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+        logger.info(f"Artifact {os.path.basename(directory)} is stale (source files changed)")
+        return None
+
+    mmap_mode = 'r' if (MMAP_MODEL_ARTIFACTS if mmap is None else mmap) else None
+    arrays = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith('.npy'):
+            array = np.load(os.path.join(directory, file_name), mmap_mode=mmap_mode, allow_pickle=False)
+            # Plain ndarray view of the mapping (np.memmap adds per-operation overhead)
+            arrays[file_name[:-len('.npy')]] = np.asarray(array)
+
+    return Artifact(arrays, meta)
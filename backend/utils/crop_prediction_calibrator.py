@@ -15,7 +15,11 @@ Date: October 2025
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from utils.timing import timed
 
 # Configure logging for debugging
 logging.basicConfig(level=logging.INFO)
@@ -250,6 +254,28 @@ DEFAULT_CALIBRATION = {
     'notes': 'Default calibration applied - Conservative B:C ratio 1.40-1.60'
 }
 
+# ============================================================================
+# ARRAY-BACKED CALIBRATION TABLE
+# ============================================================================
+# CROP_CALIBRATION_CONFIG compiled into NumPy columns indexed by calibration
+# crop ID. The last row holds DEFAULT_CALIBRATION for crops not in the config.
+
+CALIBRATION_CROPS = list(CROP_CALIBRATION_CONFIG.keys())
+CALIBRATION_CROP_IDS = {crop: i for i, crop in enumerate(CALIBRATION_CROPS)}
+DEFAULT_CALIBRATION_ID = len(CALIBRATION_CROPS)
+
+CALIBRATION_COLUMNS = [
+    'costMultiplier', 'roiMultiplier', 'nutrientDivisor',
+    'minCost', 'maxCost', 'minROI', 'maxROI'
+]
+CALIBRATION_TABLE = {
+    key: np.array(
+        [CROP_CALIBRATION_CONFIG[crop][key] for crop in CALIBRATION_CROPS] + [DEFAULT_CALIBRATION[key]],
+        dtype=float
+    )
+    for key in CALIBRATION_COLUMNS
+}
+
 # ============================================================================
 # DISTRICT-SPECIFIC ZONE MAPPING
 # ============================================================================
@@ -304,6 +330,52 @@ ZONE_TRADITIONAL_CROPS = {
 }
 
 
+# ============================================================================
+# ZONE VALIDATION
+# ============================================================================
+
+def _zone_validation(crop_name: str, district: str) -> Dict[str, Any]:
+    """Zone of the district, whether the crop is traditional there and a warning if relevant"""
+    zone = DISTRICT_ZONES.get(district, 'Unknown')
+    is_traditional = is_crop_suitable_for_zone(crop_name, zone)
+    
+    # Add warning for non-traditional crops in specific zones
+    warning = None
+    if not is_traditional:
+        if zone == 'Marathwada' and crop_name in ['Grapes', 'Sugarcane']:
+            warning = (
+                f"{crop_name} is non-traditional for {zone}. "
+                f"Consider water availability and market access."
+            )
+        elif zone == 'Konkan' and crop_name in ['Cotton', 'Wheat']:
+            warning = (
+                f"{crop_name} is not commonly grown in {zone} due to high rainfall."
+            )
+    
+    return {
+        'zone': zone,
+        'is_traditional': is_traditional,
+        'warning': warning
+    }
+
+
+def _comparison_recommendation(calibrated_comparison: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Best crop of a calibrated comparison by calibrated ROI (the first one wins
+    ties). This preserves relative ranking (highest ROI remains highest)
+    """
+    best_crop = max(calibrated_comparison,
+                    key=lambda x: x['economics']['roi_percentage'])
+    
+    return {
+        'best_crop': best_crop['crop_name'],
+        'reason': f"Highest ROI of {best_crop['economics']['roi_percentage']:.2f}%",
+        'roi': best_crop['economics']['roi_percentage'],
+        'total_cost': best_crop['economics']['total_cost'],
+        'net_income': best_crop['economics']['net_income']
+    }
+
+
 # ============================================================================
 # MAIN CALIBRATION FUNCTION
 # ============================================================================
@@ -454,27 +526,8 @@ def calibrate_crop_predictions(
         # 3. DISTRICT-SPECIFIC VALIDATION
         # =====================================================================
         
-        zone = DISTRICT_ZONES.get(district, 'Unknown')
-        traditional_crops = ZONE_TRADITIONAL_CROPS.get(zone, [])
-        
-        # Add zone suitability flag
-        calibrated['zone_validation'] = {
-            'zone': zone,
-            'is_traditional': crop_name in traditional_crops,
-            'warning': None
-        }
-        
-        # Add warning for non-traditional crops in specific zones
-        if crop_name not in traditional_crops:
-            if zone == 'Marathwada' and crop_name in ['Grapes', 'Sugarcane']:
-                calibrated['zone_validation']['warning'] = (
-                    f"{crop_name} is non-traditional for {zone}. "
-                    f"Consider water availability and market access."
-                )
-            elif zone == 'Konkan' and crop_name in ['Cotton', 'Wheat']:
-                calibrated['zone_validation']['warning'] = (
-                    f"{crop_name} is not commonly grown in {zone} due to high rainfall."
-                )
+        # Add zone suitability flag (and warning for non-traditional crops)
+        calibrated['zone_validation'] = _zone_validation(crop_name, district)
         
         if debug and calibrated['zone_validation']['warning']:
             logger.info(f"\nZONE WARNING: {calibrated['zone_validation']['warning']}")
@@ -505,6 +558,7 @@ def calibrate_crop_predictions(
         return error_prediction
 
 
+@timed('calibrate')
 def calibrate_comparison_results(
     comparison_data: list,
     district: str,
@@ -534,19 +588,132 @@ def calibrate_comparison_results(
         calibrated_comparison.append(calibrated)
     
     # Re-determine best crop based on calibrated ROI
-    # This preserves relative ranking (highest ROI remains highest)
-    best_crop = max(calibrated_comparison, 
-                   key=lambda x: x['economics']['roi_percentage'])
+    return {
+        'comparison': calibrated_comparison,
+        'recommendation': _comparison_recommendation(calibrated_comparison)
+    }
+
+
+def calibration_crop_ids(crop_names: List[str]) -> np.ndarray:
+    """Calibration table row of each crop (DEFAULT_CALIBRATION_ID if not configured)"""
+    return np.array(
+        [CALIBRATION_CROP_IDS.get(crop, DEFAULT_CALIBRATION_ID) for crop in crop_names],
+        dtype=np.int64
+    )
+
+
+def calibrate_batch(
+    crop_ids: np.ndarray,
+    raw_cost: np.ndarray,
+    raw_roi: np.ndarray,
+    raw_nutrients: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized economic / nutrient calibration for any number of crop rows.
     
+    Args:
+        crop_ids: Calibration crop ID per row (see calibration_crop_ids())
+        raw_cost: Raw total cost per row (Rs/ha)
+        raw_roi: Raw ROI percentage per row
+        raw_nutrients: Optional raw nutrient matrix (n_rows x n_nutrients)
+        
+    Returns:
+        Unrounded arrays: 'total_cost', 'roi_percentage', 'net_income',
+        'gross_income' and, if raw_nutrients was given, 'nutrients'
+    """
+    crop_ids = np.asarray(crop_ids, dtype=np.int64)
+    table = {key: column[crop_ids] for key, column in CALIBRATION_TABLE.items()}
+    
+    # Multiply, then clamp to realistic bounds
+    total_cost = np.clip(np.asarray(raw_cost) * table['costMultiplier'], table['minCost'], table['maxCost'])
+    roi = np.clip(np.asarray(raw_roi) * table['roiMultiplier'], table['minROI'], table['maxROI'])
+    net_income = total_cost * (roi / 100)
+    
+    calibrated = {
+        'total_cost': total_cost,
+        'roi_percentage': roi,
+        'net_income': net_income,
+        'gross_income': total_cost + net_income
+    }
+    if raw_nutrients is not None:
+        calibrated['nutrients'] = np.asarray(raw_nutrients) / table['nutrientDivisor'][:, np.newaxis]
+    
+    return calibrated
+
+
+@timed('calibrate')
+def calibrate_comparison_arrays(
+    crop_names: List[str],
+    district: str,
+    raw_cost: np.ndarray,
+    raw_roi: np.ndarray,
+    raw_nutrients: np.ndarray,
+    expected_yields: List[Any],
+    market_rates: List[Any],
+    risk_assessments: List[Dict[str, Any]],
+    debug: bool = True
+) -> Dict[str, Any]:
+    """
+    Array version of calibrate_comparison_results().
+    
+    Applies the same multipliers, bounds and nutrient divisors to all crops
+    at once with NumPy operations instead of one dict round-trip per crop.
+    
+    Args:
+        crop_names: Crop names, one per row
+        district: District name for zone validation
+        raw_cost: Raw total cost per crop (Rs/ha)
+        raw_roi: Raw ROI percentage per crop
+        raw_nutrients: Raw nutrient matrix (n_crops x 5: N, P, K, Zn, S)
+        expected_yields: Expected yield per crop (passed through)
+        market_rates: Market rate per crop (passed through)
+        risk_assessments: Risk assessment dict per crop (copied through)
+        debug: Enable debug logging
+        
+    Returns:
+        Same structure as calibrate_comparison_results()
+    """
+    
+    # Economic and nutrient calibration for all crops at once
+    calibrated = calibrate_batch(calibration_crop_ids(crop_names), raw_cost, raw_roi, raw_nutrients)
+    calibrated_cost = calibrated['total_cost']
+    calibrated_roi = calibrated['roi_percentage']
+    calibrated_net_income = calibrated['net_income']
+    calibrated_gross_income = calibrated['gross_income']
+    calibrated_nutrients = calibrated['nutrients']
+    
+    calibrated_comparison = []
+    for i, crop_name in enumerate(crop_names):
+        calibrated_comparison.append({
+            'crop_name': crop_name,
+            'economics': {
+                'total_cost': round(float(calibrated_cost[i]), 2),
+                'net_income': round(float(calibrated_net_income[i]), 2),
+                'roi_percentage': round(float(calibrated_roi[i]), 2),
+                'expected_yield': expected_yields[i],
+                'market_rate': market_rates[i],
+                'gross_income': round(float(calibrated_gross_income[i]), 2)
+            },
+            'nutrients': {
+                nutrient: round(float(calibrated_nutrients[i, j]), 2)
+                for j, nutrient in enumerate(['N', 'P', 'K', 'Zn', 'S'])
+            },
+            'risk_assessment': risk_assessments[i].copy(),
+            # District-specific validation
+            'zone_validation': _zone_validation(crop_name, district)
+        })
+        
+        if debug:
+            logger.info(
+                f"CALIBRATED: {crop_name} in {district} - "
+                f"cost ₹{raw_cost[i]:,.0f} → ₹{calibrated_cost[i]:,.0f}, "
+                f"ROI {raw_roi[i]:.2f}% → {calibrated_roi[i]:.2f}%"
+            )
+    
+    # Re-determine best crop based on calibrated ROI
     return {
         'comparison': calibrated_comparison,
-        'recommendation': {
-            'best_crop': best_crop['crop_name'],
-            'reason': f"Highest ROI of {best_crop['economics']['roi_percentage']:.2f}%",
-            'roi': best_crop['economics']['roi_percentage'],
-            'total_cost': best_crop['economics']['total_cost'],
-            'net_income': best_crop['economics']['net_income']
-        }
+        'recommendation': _comparison_recommendation(calibrated_comparison)
     }
 
 
@@ -11,16 +11,19 @@ Features:
 - Zone-specific risk assessment
 - Contextual warning messages
 - Alternative crop recommendations
+- Memoized crop x district suitability matrix with a batch API
 
 Author: Smart Farmer System
 Date: October 2025
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import sys
 import os
 
+import numpy as np
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -31,6 +34,7 @@ from config import (
     ZONE_CONSTRAINTS,
     AGRICULTURAL_ZONES
 )
+from utils.timing import timed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -430,6 +434,7 @@ def _get_default_validation(
 # BATCH VALIDATION FOR COMPARISON
 # ============================================================================
 
+@timed('suitability')
 def validate_crop_comparison(
     crops: List[str],
     district: str,
@@ -459,6 +464,109 @@ def validate_crop_comparison(
     return results
 
 
+# ============================================================================
+# SUITABILITY MATRIX (MEMOIZED)
+# ============================================================================
+# validate_crop_suitability() only depends on crop, district and zone (all
+# from config.py), so results are computed once per (crop, district) and
+# reused. Cached result dicts are shared between callers: do not modify them.
+
+WARNING_LEVELS = ['none', 'advisory', 'caution', 'high_risk']
+
+
+class SuitabilityMatrix:
+    """Crop x district suitability results, filled lazily or via precompute()."""
+
+    def __init__(self, districts: List[str], crops: List[str]):
+        self.districts = list(districts)
+        self.crops = list(crops)
+        self._district_index = {d: i for i, d in enumerate(self.districts)}
+        self._crop_index = {c: i for i, c in enumerate(self.crops)}
+        self._results: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+        # Scores / warning level IDs (index into WARNING_LEVELS); -1 = not computed yet
+        self.scores = np.full((len(self.districts), len(self.crops)), -1, dtype=np.int16)
+        self.warning_levels = np.full((len(self.districts), len(self.crops)), -1, dtype=np.int8)
+
+    def get(self, crop_name: str, district: str, zone: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Suitability of one crop in one district (same result as
+        validate_crop_suitability). Inputs outside the matrix, or an explicit
+        zone that differs from the district's zone, are computed uncached.
+        """
+        d = self._district_index.get(district)
+        c = self._crop_index.get(crop_name)
+        if d is None or c is None or (zone is not None and zone != get_zone_from_district(district)):
+            return validate_crop_suitability(crop_name, district, zone)
+
+        result = self._results.get((d, c))
+        if result is None:
+            result = validate_crop_suitability(crop_name, district)
+            self._results[(d, c)] = result
+            self.scores[d, c] = result['suitability_score']
+            self.warning_levels[d, c] = WARNING_LEVELS.index(result['warning_level'])
+        return result
+
+    def get_many(self, crops: List[str], district: str, zone: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Suitability of N crops in one district, in input order"""
+        return [self.get(crop, district, zone) for crop in crops]
+
+    def precompute(self) -> 'SuitabilityMatrix':
+        """Fill every (district, crop) cell"""
+        for district in self.districts:
+            for crop in self.crops:
+                self.get(crop, district)
+        return self
+
+
+_suitability_matrix: Optional[SuitabilityMatrix] = None
+
+
+def get_suitability_matrix() -> SuitabilityMatrix:
+    """
+    Shared matrix over all districts in DISTRICT_TRADITIONAL_CROPS and all crops
+    in CROP_IRRIGATION_NEEDS (cells are computed on first use).
+    """
+    global _suitability_matrix
+    if _suitability_matrix is None:
+        _suitability_matrix = SuitabilityMatrix(
+            list(DISTRICT_TRADITIONAL_CROPS.keys()),
+            list(CROP_IRRIGATION_NEEDS.keys())
+        )
+    return _suitability_matrix
+
+
+@timed('suitability')
+def validate_crop_suitability_batch(
+    crops: List[str],
+    district: str,
+    zone: Optional[str] = None,
+    debug: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Memoized suitability for N crops in one district.
+    
+    Args:
+        crops: List of crop names
+        district: District name
+        zone: Agricultural zone (optional, determined from district)
+        debug: Log a one-line summary of the results
+        
+    Returns:
+        List of validation results (see validate_crop_suitability), in input
+        order. Results are shared and must not be modified.
+    """
+    results = get_suitability_matrix().get_many(crops, district, zone)
+
+    if debug:
+        logger.info(
+            f"Suitability for {district}: " +
+            ', '.join(f"{crop}={r['suitability_score']} ({r['warning_level']})" for crop, r in zip(crops, results))
+        )
+
+    return results
+
+
 # ============================================================================
 # TESTING
 # ============================================================================
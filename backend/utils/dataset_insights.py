@@ -0,0 +1,189 @@
+"""
+Dataset Insights - Startup-Materialized Aggregates
+===================================================
+
+The dataset is read once in load_models() and never modified afterwards, so
+the aggregates behind /district-insights, /statistics and /dropdown-data are
+computed once (a single groupby('District') pass) and kept as pre-serialized
+JSON bodies.
+
+The same pass builds a per-district index of (soil, weather) -> crops used by
+/recommend-crop when no valid crop is found for the requested combination.
+
+Every payload carries an ETag derived from the dataset content hash, so
+clients can revalidate with If-None-Match and get a 304 without a body.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import hashlib
+import logging
+import os
+import time
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import AGRICULTURAL_ZONES, ZONE_CHARACTERISTICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Dataset columns averaged per district
+NUTRIENT_COLUMNS = ['N_kg_ha', 'P2O5_kg_ha', 'K2O_kg_ha', 'Zn_kg_ha', 'S_kg_ha']
+WATER_COLUMNS = {
+    'avg_pH': 'Recommended_pH',
+    'avg_turbidity': 'Turbidity_NTU',
+    'avg_temp': 'Water_Temp_C'
+}
+
+
+class CachedJSON(NamedTuple):
+    """Serialized response body plus its ETag"""
+    body: bytes
+    etag: str
+
+
+class DistrictCombinations(NamedTuple):
+    """Soil / weather combinations present in the dataset for one district"""
+    available_soils: List[str]
+    available_weather: List[str]
+    crops: Dict[Tuple[str, str], List[str]]   # (soil, weather) -> sorted crops
+    suggestions: List[Dict[str, Any]]         # response-ready, top 5 crops each
+
+
+def dataset_content_hash(dataset: pd.DataFrame) -> str:
+    """SHA-256 of the dataset contents (column names and row values)"""
+    digest = hashlib.sha256()
+    digest.update('|'.join(map(str, dataset.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(dataset, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+# ============================================================================
+# INSIGHTS STORE
+# ============================================================================
+
+class DatasetInsights:
+    """Pre-serialized dataset aggregates served by the insight endpoints."""
+
+    def __init__(
+        self,
+        dataset: pd.DataFrame,
+        get_zone: Callable[[str], str],
+        serialize: Callable[[Any], bytes]
+    ):
+        """
+        Args:
+            dataset: Training dataset loaded at startup
+            get_zone: District -> zone mapping used at serving time
+            serialize: Payload -> JSON bytes (the app's JSON provider, so
+                       bodies are byte-identical to jsonify())
+        """
+        start = time.perf_counter()
+
+        self.dataset_hash = dataset_content_hash(dataset)
+        self._serialize = serialize
+
+        self.dropdown = self._cache(self._dropdown_payload(dataset))
+        self.statistics = self._cache(self._statistics_payload(dataset))
+
+        self._districts: Dict[str, CachedJSON] = {}
+        self._combinations: Dict[str, DistrictCombinations] = {}
+        for district, district_data in dataset.groupby('District', sort=False):
+            payload = self._district_payload(district, district_data, get_zone(district))
+            self._districts[district] = self._cache(payload)
+            self._combinations[district] = self._district_combinations(district_data)
+
+        logger.info(
+            f"Dataset insights built in {time.perf_counter() - start:.2f}s "
+            f"({len(self._districts)} districts, hash {self.dataset_hash[:12]})"
+        )
+
+    def district(self, district_name: str) -> Optional[CachedJSON]:
+        """Insights of one district (None if the district is not in the dataset)"""
+        return self._districts.get(district_name)
+
+    def combinations(self, district_name: str) -> Optional[DistrictCombinations]:
+        """Soil / weather combinations of one district (None if not in the dataset)"""
+        return self._combinations.get(district_name)
+
+    def _cache(self, payload: Dict[str, Any]) -> CachedJSON:
+        body = self._serialize(payload)
+        return CachedJSON(body, f"{self.dataset_hash[:16]}-{zlib.crc32(body):08x}")
+
+    # ------------------------------------------------------------------
+    # Payloads (same structure as the original per-request computation)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _dropdown_payload(dataset: pd.DataFrame) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'data': {
+                'districts': sorted(dataset['District'].unique().tolist()),
+                'soil_types': sorted(dataset['Soil_Type'].unique().tolist()),
+                'crops': sorted(dataset['Crop_Name'].unique().tolist()),
+                'weather_conditions': sorted(dataset['Weather'].unique().tolist()),
+                'fertilizers': sorted(dataset['Fertilizer'].unique().tolist()),
+                'zones': list(AGRICULTURAL_ZONES.keys())
+            }
+        }
+
+    @staticmethod
+    def _statistics_payload(dataset: pd.DataFrame) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'data': {
+                'total_records': len(dataset),
+                'total_districts': dataset['District'].nunique(),
+                'total_crops': dataset['Crop_Name'].nunique(),
+                'total_soil_types': dataset['Soil_Type'].nunique(),
+                'total_weather_conditions': dataset['Weather'].nunique(),
+                'zones': len(AGRICULTURAL_ZONES),
+                'districts_by_zone': {zone: len(districts) for zone, districts in AGRICULTURAL_ZONES.items()}
+            }
+        }
+
+    @staticmethod
+    def _district_payload(district: str, district_data: pd.DataFrame, zone: str) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'data': {
+                'district': district,
+                'zone': zone,
+                'zone_characteristics': ZONE_CHARACTERISTICS.get(zone, {}),
+                'soil_distribution': district_data['Soil_Type'].value_counts().to_dict(),
+                'popular_crops': district_data['Crop_Name'].value_counts().head(10).to_dict(),
+                'weather_patterns': district_data['Weather'].value_counts().to_dict(),
+                'average_nutrients': {
+                    col: round(district_data[col].mean(), 2) for col in NUTRIENT_COLUMNS
+                },
+                'water_quality': {
+                    key: round(district_data[col].mean(), 2) for key, col in WATER_COLUMNS.items()
+                },
+                'total_records': len(district_data)
+            }
+        }
+
+    @staticmethod
+    def _district_combinations(district_data: pd.DataFrame) -> DistrictCombinations:
+        crops_by_combination = district_data.groupby(['Soil_Type', 'Weather'])['Crop_Name'].apply(
+            lambda x: sorted(x.unique().tolist())
+        )
+        crops = {(soil, weather): crop_list for (soil, weather), crop_list in crops_by_combination.items()}
+
+        return DistrictCombinations(
+            available_soils=sorted(district_data['Soil_Type'].unique().tolist()),
+            available_weather=sorted(district_data['Weather'].unique().tolist()),
+            crops=crops,
+            suggestions=[
+                {'soil_type': soil, 'weather': weather, 'crops': crop_list[:5]}
+                for (soil, weather), crop_list in crops.items()
+            ]
+        )
@@ -0,0 +1,133 @@
+"""
+Feature Encoder - Compiled Categorical Encoding
+================================================
+
+Replaces per-request calls to sklearn's LabelEncoder.transform() and
+inverse_transform() with plain dictionary / array lookups.
+
+The encoder is compiled once from encoders.pkl, or from the encoder classes
+recorded in the bundle manifest (which avoids importing sklearn to unpickle
+the LabelEncoders):
+- label -> ID maps are Python dicts (O(1) membership and encoding)
+- ID -> label maps are arrays (vectorized decoding)
+
+Encoded IDs are identical to the LabelEncoder ones (position in classes_).
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class FeatureEncoder:
+    """Dictionary-based encoder compiled from fitted LabelEncoders."""
+
+    def __init__(self, encoders: Dict[str, Any]):
+        """
+        Args:
+            encoders: Column name -> fitted LabelEncoder (as saved in encoders.pkl)
+        """
+        self._labels: Dict[str, List[str]] = {}
+        self._label_arrays: Dict[str, np.ndarray] = {}
+        self._index: Dict[str, Dict[str, int]] = {}
+
+        for column, encoder in encoders.items():
+            self._add_column(column, encoder.classes_)
+
+    @classmethod
+    def from_classes(cls, classes: Dict[str, Sequence[Any]]) -> 'FeatureEncoder':
+        """
+        Args:
+            classes: Column name -> LabelEncoder.classes_ (e.g. manifest['encoders'])
+        """
+        feature_encoder = cls({})
+        for column, labels in classes.items():
+            feature_encoder._add_column(column, labels)
+        return feature_encoder
+
+    def _add_column(self, column: str, classes: Sequence[Any]) -> None:
+        labels = [str(label) for label in classes]
+        self._labels[column] = labels
+        self._label_arrays[column] = np.array(labels, dtype=object)
+        self._index[column] = {label: i for i, label in enumerate(labels)}
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._index
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._index)
+
+    def labels(self, column: str) -> List[str]:
+        """Known labels of a column in ID order (do not modify the list)"""
+        return self._labels[column]
+
+    def size(self, column: str) -> int:
+        """Number of known labels of a column"""
+        return len(self._labels[column])
+
+    def is_known(self, column: str, value: Any) -> bool:
+        """True if `value` was seen during training for `column`"""
+        return value in self._index[column]
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def encode(self, column: str, value: Any) -> int:
+        """Encode a single label (raises ValueError for unseen labels)"""
+        try:
+            return self._index[column][value]
+        except (KeyError, TypeError):
+            raise ValueError(f"y contains previously unseen labels: {value!r}")
+
+    def encode_many(self, column: str, values: Iterable[Any]) -> np.ndarray:
+        """Encode a sequence of labels of one column"""
+        index = self._index[column]
+        try:
+            return np.array([index[value] for value in values], dtype=np.int64)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"y contains previously unseen labels: {e.args[0]!r}")
+
+    def encode_record(self, record: Dict[str, Any], columns: Sequence[str]) -> np.ndarray:
+        """
+        Encode one record into a feature row in `columns` order.
+        Columns without an encoder (numeric features) are passed through.
+        """
+        return self.encode_records([record], columns)[0]
+
+    def encode_records(self, records: Sequence[Dict[str, Any]], columns: Sequence[str]) -> np.ndarray:
+        """
+        Encode many records into a 2D feature matrix in `columns` order.
+        The matrix is integer if every column is categorical, float otherwise.
+        """
+        all_categorical = all(column in self._index for column in columns)
+        matrix = np.empty((len(records), len(columns)), dtype=np.int64 if all_categorical else float)
+
+        for j, column in enumerate(columns):
+            values = [record[column] for record in records]
+            if column in self._index:
+                matrix[:, j] = self.encode_many(column, values)
+            else:
+                matrix[:, j] = values
+
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+
+    def decode(self, column: str, index: int) -> str:
+        """Decode a single ID back to its label"""
+        return self._labels[column][index]
+
+    def decode_many(self, column: str, indices: Iterable[int]) -> List[str]:
+        """Decode an array of IDs back to labels"""
+        return self._label_arrays[column][np.asarray(indices, dtype=np.int64)].tolist()
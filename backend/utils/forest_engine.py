@@ -0,0 +1,377 @@
+"""
+Forest Engine - Pure-NumPy Random Forest Inference
+===================================================
+
+Flattens fitted sklearn forests (RandomForestClassifier / RandomForestRegressor)
+into contiguous NumPy arrays and evaluates all trees at once with vectorized
+level-by-level traversal:
+
+- feature, threshold: one entry per node, all trees concatenated
+- children: (left, right) per node, interleaved; leaves point to themselves
+- roots: index of the root node of every tree
+- values: leaf outputs (class probabilities or regression targets)
+
+Outputs are bit-identical to sklearn's predict / predict_proba (inputs are
+cast to float32 like sklearn does, trees are summed in estimator order). Note
+that sklearn itself sums trees in completion order when a model is served
+with n_jobs != 1, so its own last-bit rounding can vary between calls.
+
+Exported forests are stored as memory-mapped artifact directories
+(utils/artifact_store.py) shared by all worker processes.
+
+FlatForest duck-types the parts of the sklearn API used by the app
+(predict, predict_proba, classes_, n_features_in_).
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import logging
+import os
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.artifact_store import save_artifact, load_artifact
+from utils.model_bundle import load_pickle
+from utils.prediction_cube import model_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bound on the (trees x rows x outputs) leaf-value block gathered at once
+MAX_GATHER_ELEMENTS = 4_000_000
+
+# Up to this many rows, tree outputs are summed with one accumulate call
+# instead of a Python loop over the trees
+SMALL_BATCH_ROWS = 64
+
+
+# ============================================================================
+# FLAT FOREST
+# ============================================================================
+
+class FlatForest:
+    """Random forest stored as flat node arrays."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        leaf_index: np.ndarray,
+        roots: np.ndarray,
+        values: np.ndarray,
+        max_depth: int,
+        n_features_in: int,
+        classes: Optional[np.ndarray] = None,
+        fingerprint: str = ''
+    ):
+        """
+        Args:
+            feature: Split feature per node (0 for leaves)
+            threshold: Split threshold per node (float64, 0 for leaves)
+            children: (left, right) child per node, shape (n_nodes, 2);
+                      leaves point to themselves
+            leaf_index: Row in `values` per node (-1 for internal nodes)
+            roots: Root node of every tree, in estimator order
+            values: Leaf outputs (n_leaves x n_classes or n_leaves x n_outputs)
+            max_depth: Depth of the deepest tree
+            n_features_in: Number of input features
+            classes: Class labels for classifiers, None for regressors
+            fingerprint: Fingerprint of the source model file
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_index = leaf_index
+        self.roots = roots
+        self.values = values
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features_in)
+        self.classes_ = classes
+        self.fingerprint = fingerprint
+
+        # Flat view: child of node i is children_flat[2 * i + went_right]
+        self._children_flat = children.reshape(-1)
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.children[:, 0]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[:, 1]
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.feature, self.threshold, self.children,
+                  self.leaf_index, self.roots, self.values)
+        return sum(a.nbytes for a in arrays)
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def _check_input(self, X: Any) -> np.ndarray:
+        # sklearn evaluates trees on float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1] if X.ndim else 0} features, but FlatForest "
+                f"is expecting {self.n_features_in_} features as input."
+            )
+        return X.astype(np.float64)
+
+    def apply(self, X: Any) -> np.ndarray:
+        """Leaf node reached in every tree (n_samples x n_trees)"""
+        X = self._check_input(X)
+        return self._apply(X)
+
+    def _apply(self, X: np.ndarray) -> np.ndarray:
+        n_samples, n_trees = len(X), len(self.roots)
+
+        # Column-major X: feature f of sample i is X_cols[f * n_samples + i]
+        X_cols = X.T.ravel()
+
+        # Entry k is (tree k // n_samples, sample k % n_samples); tree-major
+        # order keeps neighbouring entries inside the same tree
+        nodes = np.repeat(self.roots, n_samples)
+        samples = np.tile(np.arange(n_samples), n_trees)
+
+        # One vectorized step per level (leaves loop back onto themselves)
+        for _ in range(self.max_depth):
+            went_right = ~(X_cols[self.feature[nodes] * n_samples + samples] <= self.threshold[nodes])
+            nodes = self._children_flat[2 * nodes + went_right]
+
+        return nodes.reshape(n_trees, n_samples).T
+
+    def _mean_leaf_values(self, X: Any) -> np.ndarray:
+        X = self._check_input(X)
+        n_trees, n_outputs = len(self.roots), self.values.shape[1]
+        result = np.empty((len(X), n_outputs))
+
+        # Trees are added one after another in estimator order, like sklearn
+        # (sum() would use pairwise summation and differ in the last bits)
+        chunk = max(1, MAX_GATHER_ELEMENTS // (n_trees * n_outputs))
+        for start in range(0, len(X), chunk):
+            leaf_rows = self.leaf_index[self._apply(X[start:start + chunk]).T]
+
+            if leaf_rows.shape[1] <= SMALL_BATCH_ROWS:
+                # Few rows: one (trees, rows, outputs) gather + accumulate
+                total = np.add.accumulate(self.values[leaf_rows], axis=0)[-1]
+            else:
+                total = np.zeros((leaf_rows.shape[1], n_outputs))
+                for tree_leaves in leaf_rows:
+                    total += self.values[tree_leaves]
+
+            result[start:start + chunk] = total
+
+        result /= n_trees
+        return result
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Class probabilities (classifiers only)"""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._mean_leaf_values(X)
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Class labels (classifiers) or regression outputs (regressors)"""
+        if self.is_classifier:
+            return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+        prediction = self._mean_leaf_values(X)
+        return prediction[:, 0] if prediction.shape[1] == 1 else prediction
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Save the flattened forest as an artifact directory of .npy files"""
+        arrays = {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'leaf_index': self.leaf_index,
+            'roots': self.roots,
+            'values': self.values
+        }
+        if self.classes_ is not None:
+            arrays['classes'] = self.classes_
+
+        meta = {
+            'fingerprint': self.fingerprint,
+            'max_depth': self.max_depth,
+            'n_features_in': self.n_features_in_
+        }
+        save_artifact(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None,
+             mmap: Optional[bool] = None) -> Optional['FlatForest']:
+        """
+        Load a forest saved with save() (memory-mapped by default). Returns
+        None if it is missing or was exported from a different model file
+        than `fingerprint`.
+        """
+        artifact = load_artifact(path, fingerprint, mmap)
+        if artifact is None:
+            return None
+
+        arrays, meta = artifact
+        return cls(
+            feature=arrays['feature'],
+            threshold=arrays['threshold'],
+            children=arrays['children'],
+            leaf_index=arrays['leaf_index'],
+            roots=arrays['roots'],
+            values=arrays['values'],
+            max_depth=meta['max_depth'],
+            n_features_in=meta['n_features_in'],
+            classes=arrays.get('classes'),
+            fingerprint=meta['fingerprint']
+        )
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def is_flattenable(model: Any) -> bool:
+    """True for fitted single-output-classifier / regressor tree forests"""
+    if not hasattr(model, 'estimators_') or not model.estimators_:
+        return False
+    if not hasattr(model.estimators_[0], 'tree_'):
+        return False
+    # Multi-output classifiers keep one class list per output
+    return not (hasattr(model, 'classes_') and isinstance(model.classes_, list))
+
+
+def flatten_forest(model: Any, fingerprint: str = '') -> FlatForest:
+    """
+    Flatten a fitted sklearn forest into a FlatForest.
+
+    Args:
+        model: Fitted RandomForestClassifier / RandomForestRegressor
+        fingerprint: Fingerprint of the source model file (stored with the arrays)
+    """
+    if not is_flattenable(model):
+        raise ValueError(f"Cannot flatten {type(model).__name__}: expected a fitted single-output forest")
+
+    is_classifier = hasattr(model, 'classes_')
+
+    # sklearn >= 1.4 stores class fractions in tree_.value; older versions
+    # store weighted counts and normalize inside predict_proba
+    import sklearn
+    from sklearn.utils.fixes import parse_version
+    normalize_values = parse_version(sklearn.__version__) < parse_version('1.4')
+
+    features, thresholds, children, leaf_indices, roots, values = [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+        leaf_index = np.full(n_nodes, -1, dtype=np.int64)
+        leaf_index[is_leaf] = n_leaves + np.arange(is_leaf.sum())
+
+        leaf_values = tree.value[is_leaf]
+        if is_classifier:
+            leaf_values = leaf_values[:, 0, :].copy()
+            if normalize_values:
+                # Same normalization as DecisionTreeClassifier.predict_proba
+                normalizer = leaf_values.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                leaf_values /= normalizer
+        else:
+            leaf_values = leaf_values[:, :, 0]
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        children.append(np.column_stack([left, right]))
+        leaf_indices.append(leaf_index)
+        roots.append(offset)
+        values.append(leaf_values)
+
+        offset += n_nodes
+        n_leaves += int(is_leaf.sum())
+        max_depth = max(max_depth, tree.max_depth)
+
+    # Native index width: fancy indexing with narrower ints converts every call
+    return FlatForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+        leaf_index=np.concatenate(leaf_indices).astype(np.intp),
+        roots=np.array(roots, dtype=np.intp),
+        values=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        max_depth=max_depth,
+        n_features_in=model.n_features_in_,
+        classes=np.asarray(model.classes_) if is_classifier else None,
+        fingerprint=fingerprint
+    )
+
+
+def load_or_flatten_forest(model_path: str, flat_path: str) -> Any:
+    """
+    Load the flattened forest exported for `model_path`, re-exporting it when
+    the model file changed. Falls back to the pickled model itself when it is
+    not a flattenable forest.
+
+    Returns:
+        FlatForest, or the unpickled model
+    """
+    if not os.path.exists(model_path):
+        # Deployments may ship only the exported arrays
+        forest = FlatForest.load(flat_path)
+        if forest is None:
+            raise FileNotFoundError(model_path)
+        return forest
+
+    fingerprint = model_fingerprint([model_path])
+    try:
+        forest = FlatForest.load(flat_path, fingerprint)
+        if forest is not None:
+            return forest
+    except Exception as e:
+        logger.warning(f"Could not read flattened forest {flat_path}: {str(e)}")
+
+    model = load_pickle(model_path)
+    if not is_flattenable(model):
+        return model
+
+    start = time.perf_counter()
+    forest = flatten_forest(model, fingerprint)
+    logger.info(
+        f"Flattened {os.path.basename(model_path)} in {time.perf_counter() - start:.2f}s "
+        f"({forest.n_estimators} trees, {len(forest.feature)} nodes, {forest.nbytes / 1e6:.1f} MB)"
+    )
+
+    try:
+        forest.save(flat_path)
+    except OSError as e:
+        logger.warning(f"Could not write flattened forest {flat_path}: {str(e)}")
+
+    return forest
@@ -0,0 +1,447 @@
+"""
+Metrics - Prometheus Text Exposition Across Workers
+===================================================
+
+Counters, log-bucketed histograms and gauges rendered in the Prometheus
+text format (version 0.0.4) by GET /metrics, without a client library or
+any network dependency.
+
+Gunicorn runs several worker processes and a scrape reaches only one of
+them, so every worker periodically writes a snapshot of its own metrics to
+METRICS_DIR (one JSON file per worker, replaced atomically). The worker
+answering the scrape merges all snapshots: counters and histogram buckets
+are summed, gauges keep one series per worker (`pid` label). When a worker
+starts recording, the snapshots of workers that no longer run are folded
+into an archive snapshot (counters and histograms only; their gauges are
+dropped) and removed, like prometheus_client's multiprocess mode. Merged
+counters therefore never go down when gunicorn restarts or recycles a
+worker, which Prometheus would read as a counter reset. Archiving and
+merging hold an flock on the directory's lock file, so a scrape never sees
+a worker's counts both in its snapshot and in the archive. Without a
+directory only the answering process is reported.
+
+Recording is a dict update under a lock; writing snapshots happens on a
+background thread every `flush_interval` seconds, and only when something
+changed.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl    # POSIX only
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets: 0.1 ms doubling up to ~13 s
+LATENCY_BUCKETS = tuple(0.0001 * 2 ** i for i in range(18))
+
+# Batch-size buckets: 1, 2, 4, ... 8192 records
+BATCH_BUCKETS = tuple(float(2 ** i) for i in range(14))
+
+SNAPSHOT_PREFIX = 'worker-'
+ARCHIVE_FILE = 'archive.json'   # counters / histograms of exited workers
+LOCK_FILE = 'metrics.lock'
+
+
+class _Metric:
+    """Base class: a named family of samples keyed by label values"""
+
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str,
+                 labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples: Dict[Tuple[str, ...], Any] = {}
+
+    def describe(self) -> Dict[str, Any]:
+        return {'type': self.kind, 'help': self.documentation, 'labels': list(self.labelnames)}
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        if not self.registry.enabled:
+            return
+        key = tuple(str(v) for v in labelvalues)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0.0) + amount
+            self.registry.dirty = True
+
+
+class Gauge(_Metric):
+    """Per-worker value (merged snapshots keep one series per pid)"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = tuple(str(v) for v in labelvalues)
+        with self.registry.lock:
+            self.samples[key] = float(value)
+            self.registry.dirty = True
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str,
+                 labelnames: Sequence[str], buckets: Sequence[float]):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), 'buckets': list(self.buckets)}
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = tuple(str(v) for v in labelvalues)
+        # Index of the first bucket with value <= upper bound (len = +Inf)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.registry.lock:
+            # [per-bucket counts..., +Inf count, sum]
+            entry = self.samples.get(key)
+            if entry is None:
+                entry = self.samples[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += value
+            self.registry.dirty = True
+
+
+class MetricsRegistry:
+    """All metrics of this process, plus snapshot files for the other workers"""
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0,
+                 enabled: bool = True):
+        """
+        Args:
+            directory: Shared directory for per-worker snapshots (None = this process only)
+            flush_interval: Seconds between snapshot writes
+            enabled: False makes every recording call a no-op
+        """
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.dirty = False
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._created_pid = os.getpid()
+        self._flusher_pid: Optional[int] = None
+        self._path: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Definition
+    # ------------------------------------------------------------------
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Callback run before every snapshot (e.g. to set gauges from live state)"""
+        self._collectors.append(collector)
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This process's metrics as a JSON-serializable dict"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+
+        with self.lock:
+            self.dirty = False
+            return {
+                'pid': os.getpid(),
+                'metrics': {
+                    name: {
+                        **metric.describe(),
+                        'samples': [[list(key), value] for key, value in metric.samples.items()]
+                    }
+                    for name, metric in self._metrics.items()
+                }
+            }
+
+    def ensure_flusher(self) -> None:
+        """Start the snapshot thread in this process (no-op after the first call)"""
+        if self.directory is None or not self.enabled or self._flusher_pid == os.getpid():
+            return
+        with self.lock:
+            if self._flusher_pid == os.getpid():
+                return
+            # Drop samples inherited from the parent process (gunicorn --preload),
+            # otherwise every forked worker would report them again
+            if os.getpid() != self._created_pid:
+                for metric in self._metrics.values():
+                    metric.samples.clear()
+            self._flusher_pid = os.getpid()
+            self._path = os.path.join(self.directory, f'{SNAPSHOT_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+
+        # Snapshots are read back and merged: keep other users out
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.prune()
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+        thread.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval)
+            if self.dirty:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write this process's snapshot (atomic replace)"""
+        if self._path is None or self._flusher_pid != os.getpid():
+            return
+        tmp_path = f'{self._path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def close(self) -> None:
+        """Write a final snapshot and stop the snapshot thread"""
+        self.flush()
+        self._flusher_pid = None
+        self._path = None
+        atexit.unregister(self.flush)
+
+    def _snapshot_files(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name) for name in names
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith('.json')
+        ]
+
+    @contextmanager
+    def _directory_lock(self, exclusive: bool):
+        """flock on the directory's lock file (archiving exclusive, merging shared)"""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read_archive(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, ARCHIVE_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read metrics archive: {e}")
+            return None
+
+    def prune(self) -> None:
+        """
+        Fold the snapshots of processes that are gone (and old ones of a
+        reused pid) into the archive and remove them
+        """
+        with self._directory_lock(exclusive=True):
+            stale = []
+            for path in self._snapshot_files():
+                if path == self._path:
+                    continue
+                pid = int(os.path.basename(path)[len(SNAPSHOT_PREFIX):].split('-')[0])
+                if pid == os.getpid() or not _pid_alive(pid):
+                    stale.append(path)
+            if not stale:
+                return
+
+            archive = self._read_archive()
+            merged = merge_snapshots([archive] if archive is not None else [])
+            for path in stale:
+                try:
+                    with open(path) as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    # Died while replacing its file: nothing readable to keep
+                    continue
+                merge_snapshots([snapshot], merged, gauges=False)
+
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            try:
+                with open(f'{archive_path}.tmp', 'w') as f:
+                    json.dump(_as_snapshot(merged), f, separators=(',', ':'))
+                os.replace(f'{archive_path}.tmp', archive_path)
+            except OSError as e:
+                # Keep the snapshots rather than lose their counts
+                logger.warning(f"Could not write metrics archive: {e}")
+                return
+            for path in stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Merging and exposition
+    # ------------------------------------------------------------------
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Metrics of all workers merged: {name: {type, help, labels, [buckets], samples}}
+        with samples as {label values tuple: value}
+        """
+        self.ensure_flusher()
+        if self.directory is None or self._path is None:
+            return merge_snapshots([self.snapshot()])
+
+        self.flush()
+        with self._directory_lock(exclusive=False):
+            archive = self._read_archive()
+            snapshots = [archive] if archive is not None else []
+            for path in self._snapshot_files():
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    # Worker is replacing its file right now
+                    continue
+        return merge_snapshots(snapshots)
+
+    def render(self, collected: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """Prometheus text exposition of collect() (or of an already collected dict)"""
+        if collected is None:
+            collected = self.collect()
+
+        lines = []
+        for name in sorted(collected):
+            family = collected[name]
+            lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family['labels']
+            for key in sorted(family['samples']):
+                value = family['samples'][key]
+                labels = list(zip(labelnames, key))
+                if family['type'] != 'histogram':
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*family['buckets'], math.inf], value[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]], merged: Optional[Dict[str, Dict[str, Any]]] = None,
+                    gauges: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Sum counters and histograms of snapshots into `merged` (a new dict by
+    default); gauges get one series per snapshot pid, or are left out
+    """
+    if merged is None:
+        merged = {}
+    for snapshot in snapshots:
+        for name, family in snapshot['metrics'].items():
+            if family['type'] == 'gauge' and not gauges:
+                continue
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**family, 'samples': {}}
+                if family['type'] == 'gauge':
+                    target['labels'] = family['labels'] + ['pid']
+            samples = target['samples']
+            for labelvalues, value in family['samples']:
+                key = tuple(labelvalues)
+                if family['type'] == 'gauge':
+                    samples[key + (str(snapshot['pid']),)] = value
+                elif family['type'] == 'histogram':
+                    current = samples.get(key)
+                    samples[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    samples[key] = samples.get(key, 0.0) + value
+    return merged
+
+
+def _as_snapshot(merged: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merged counters / histograms back in snapshot form (for the archive)"""
+    return {
+        'pid': 'archive',
+        'metrics': {
+            name: {**family, 'samples': [[list(key), value] for key, value in family['samples'].items()]}
+            for name, family in merged.items()
+        }
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,341 @@
+"""
+MLP Engine - NumPy Forward Pass for the Nutrient Predictor
+===========================================================
+
+Exports a fitted sklearn MLPRegressor to plain weight / bias matrices and runs
+the forward pass directly (matmul + bias + activation per layer) into
+preallocated per-thread buffers, skipping sklearn's validation stack.
+
+Input and output scaling can be folded into the first and last layers:
+
+- input  x' = (x - mean) / scale   ->  W0' = W0 / scale[:, None]
+                                       b0' = b0 - (mean / scale) @ W0
+- output y  = y' * scale + mean    ->  WL' = WL * scale,  bL' = bL * scale + mean
+  (only valid for the identity output activation)
+
+Weights are stored as a memory-mapped artifact directory
+(utils/artifact_store.py) shared by all worker processes.
+
+Without folding, outputs are bit-identical to MLPRegressor.predict; folded
+weights round differently and match to floating-point tolerance.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.artifact_store import save_artifact, load_artifact
+from utils.model_bundle import load_pickle
+from utils.prediction_cube import model_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows allocated per thread up front; larger batches grow the buffers
+INITIAL_BUFFER_ROWS = 64
+
+
+def _relu(X: np.ndarray) -> None:
+    np.maximum(X, 0, out=X)
+
+
+def _tanh(X: np.ndarray) -> None:
+    np.tanh(X, out=X)
+
+
+def _logistic(X: np.ndarray) -> None:
+    # 1 / (1 + exp(-x))
+    np.negative(X, out=X)
+    np.exp(X, out=X)
+    X += 1
+    np.reciprocal(X, out=X)
+
+
+def _identity(X: np.ndarray) -> None:
+    pass
+
+
+# In-place hidden activations (same set as sklearn's ACTIVATIONS)
+HIDDEN_ACTIVATIONS = {
+    'relu': _relu,
+    'tanh': _tanh,
+    'logistic': _logistic,
+    'identity': _identity
+}
+
+# (mean, scale) pair of a fitted StandardScaler
+Scaling = Tuple[np.ndarray, np.ndarray]
+
+
+# ============================================================================
+# MLP ENGINE
+# ============================================================================
+
+class MLPEngine:
+    """Multi-layer perceptron regressor stored as weight / bias matrices."""
+
+    def __init__(
+        self,
+        coefs: List[np.ndarray],
+        intercepts: List[np.ndarray],
+        activation: str = 'relu',
+        fingerprint: str = ''
+    ):
+        """
+        Args:
+            coefs: Weight matrix per layer (n_in x n_out), input layer first
+            intercepts: Bias vector per layer
+            activation: Hidden-layer activation ('relu', 'tanh', 'logistic', 'identity')
+            fingerprint: Fingerprint of the source model file
+        """
+        if activation not in HIDDEN_ACTIVATIONS:
+            raise ValueError(f"Unsupported activation '{activation}'")
+
+        self.coefs = [np.ascontiguousarray(c, dtype=np.float64) for c in coefs]
+        self.intercepts = [np.ascontiguousarray(b, dtype=np.float64) for b in intercepts]
+        self.activation = activation
+        self.fingerprint = fingerprint
+        self.n_features_in_ = self.coefs[0].shape[0]
+        self.n_outputs_ = self.coefs[-1].shape[1]
+
+        self._activate = HIDDEN_ACTIVATIONS[activation]
+        self._local = threading.local()
+
+    @property
+    def layer_sizes(self) -> List[int]:
+        return [self.n_features_in_] + [c.shape[1] for c in self.coefs]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self.coefs) + sum(b.nbytes for b in self.intercepts)
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def _buffers(self, n_rows: int) -> List[np.ndarray]:
+        """Per-thread layer output buffers with room for at least n_rows"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None or len(buffers[0]) < n_rows:
+            capacity = max(n_rows, INITIAL_BUFFER_ROWS)
+            buffers = [np.empty((capacity, c.shape[1])) for c in self.coefs]
+            self._local.buffers = buffers
+        return buffers
+
+    def forward(self, X: Any) -> np.ndarray:
+        """Raw network outputs (n_samples x n_outputs)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1] if X.ndim else 0} features, but MLPEngine "
+                f"is expecting {self.n_features_in_} features as input."
+            )
+
+        n_rows = len(X)
+        buffers = self._buffers(n_rows)
+        last_layer = len(self.coefs) - 1
+
+        activation = X
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            out = buffers[i][:n_rows]
+            np.matmul(activation, coef, out=out)
+            out += intercept
+            if i != last_layer:
+                self._activate(out)
+            activation = out
+
+        # The buffers are reused by the next call on this thread
+        return activation.copy()
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Regression outputs, shaped like MLPRegressor.predict"""
+        prediction = self.forward(X)
+        return prediction[:, 0] if self.n_outputs_ == 1 else prediction
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Save the weights as an artifact directory of .npy files"""
+        arrays = {}
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            arrays[f'coef_{i}'] = coef
+            arrays[f'intercept_{i}'] = intercept
+
+        meta = {
+            'fingerprint': self.fingerprint,
+            'activation': self.activation,
+            'n_layers': len(self.coefs)
+        }
+        save_artifact(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None,
+             mmap: Optional[bool] = None) -> Optional['MLPEngine']:
+        """
+        Load weights saved with save() (memory-mapped by default). Returns
+        None if they are missing or were exported from a different model
+        file than `fingerprint`.
+        """
+        artifact = load_artifact(path, fingerprint, mmap)
+        if artifact is None:
+            return None
+
+        arrays, meta = artifact
+        n_layers = meta['n_layers']
+        return cls(
+            coefs=[arrays[f'coef_{i}'] for i in range(n_layers)],
+            intercepts=[arrays[f'intercept_{i}'] for i in range(n_layers)],
+            activation=meta['activation'],
+            fingerprint=meta['fingerprint']
+        )
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def is_exportable(model: Any) -> bool:
+    """True for fitted MLP regressors with a supported activation"""
+    return (
+        hasattr(model, 'coefs_')
+        and getattr(model, 'out_activation_', None) == 'identity'
+        and getattr(model, 'activation', None) in HIDDEN_ACTIVATIONS
+    )
+
+
+def _scaling(scaler: Any) -> Optional[Scaling]:
+    """(mean, scale) of a fitted StandardScaler-like object, or None"""
+    if scaler is None:
+        return None
+    if isinstance(scaler, tuple):
+        return scaler
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    if mean is None and scale is None:
+        return None
+
+    n_features = len(mean if mean is not None else scale)
+    return (
+        np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64),
+        np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    )
+
+
+def _scaling_digest(*scalers: Any) -> str:
+    """Short hash of the scaling folded into an export ('' when none)"""
+    digest = hashlib.sha256()
+    folded = False
+    for scaling in map(_scaling, scalers):
+        digest.update(b'|')
+        if scaling is not None:
+            folded = True
+            for array in scaling:
+                digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16] if folded else ''
+
+
+def export_mlp(
+    model: Any,
+    input_scaler: Any = None,
+    output_scaler: Any = None,
+    fingerprint: str = ''
+) -> MLPEngine:
+    """
+    Export a fitted MLPRegressor, optionally folding scaling into its weights.
+
+    Args:
+        model: Fitted MLPRegressor
+        input_scaler: StandardScaler (or (mean, scale)) applied to inputs at
+                      serving time, folded into the first layer
+        output_scaler: StandardScaler (or (mean, scale)) whose inverse_transform
+                       is applied to outputs, folded into the last layer
+        fingerprint: Fingerprint of the source model file
+    """
+    if not is_exportable(model):
+        raise ValueError(f"Cannot export {type(model).__name__}: expected a fitted MLPRegressor")
+
+    coefs = [np.array(c, dtype=np.float64) for c in model.coefs_]
+    intercepts = [np.array(b, dtype=np.float64) for b in model.intercepts_]
+
+    input_scaling = _scaling(input_scaler)
+    if input_scaling is not None:
+        mean, scale = input_scaling
+        scale = np.where(scale == 0, 1.0, scale)
+        intercepts[0] = intercepts[0] - (mean / scale) @ coefs[0]
+        coefs[0] = coefs[0] / scale[:, np.newaxis]
+
+    output_scaling = _scaling(output_scaler)
+    if output_scaling is not None:
+        mean, scale = output_scaling
+        coefs[-1] = coefs[-1] * scale
+        intercepts[-1] = intercepts[-1] * scale + mean
+
+    return MLPEngine(coefs, intercepts, model.activation, fingerprint)
+
+
+def load_or_export_mlp(
+    model_path: str,
+    engine_path: str,
+    input_scaler: Any = None,
+    output_scaler: Any = None
+) -> Any:
+    """
+    Load the weights exported for `model_path`, re-exporting them when the
+    model file changed. Falls back to the pickled model itself when it is not
+    an exportable MLP regressor.
+
+    Scalers are folded at export time and are part of the export fingerprint,
+    so changing them also triggers a re-export.
+
+    Returns:
+        MLPEngine, or the unpickled model
+    """
+    if not os.path.exists(model_path):
+        # Deployments may ship only the exported weights
+        engine = MLPEngine.load(engine_path)
+        if engine is None:
+            raise FileNotFoundError(model_path)
+        return engine
+
+    fingerprint = model_fingerprint([model_path])
+    scaling_digest = _scaling_digest(input_scaler, output_scaler)
+    if scaling_digest:
+        fingerprint = f"{fingerprint}:{scaling_digest}"
+
+    try:
+        engine = MLPEngine.load(engine_path, fingerprint)
+        if engine is not None:
+            return engine
+    except Exception as e:
+        logger.warning(f"Could not read exported MLP {engine_path}: {str(e)}")
+
+    model = load_pickle(model_path)
+    if not is_exportable(model):
+        return model
+
+    start = time.perf_counter()
+    engine = export_mlp(model, input_scaler, output_scaler, fingerprint)
+    logger.info(
+        f"Exported {os.path.basename(model_path)} in {time.perf_counter() - start:.3f}s "
+        f"(layers {engine.layer_sizes}, {engine.nbytes / 1e3:.0f} KB)"
+    )
+
+    try:
+        engine.save(engine_path)
+    except OSError as e:
+        logger.warning(f"Could not write exported MLP {engine_path}: {str(e)}")
+
+    return engine
@@ -0,0 +1,222 @@
+"""
+Model Bundle - Versioned Model Directory with Manifest
+=======================================================
+
+A bundle is a model directory (MODEL_BUNDLE_DIR, by default MODEL_DIR) with a
+manifest.json written by the training script:
+
+    {
+      "version": "20251020-143000-1a2b3c4d",
+      "created_at": "2025-10-20T14:30:00+00:00",
+      "trainer": {"script": "train_models_research.py", "python": ..., "sklearn": ...},
+      "dataset": {"file": "maharashtra_....csv", "sha256": ..., "rows": 10000},
+      "features": {"crop": [...], "nutrient": [...], ...},
+      "encoders": {"District": [...classes...], ...},
+      "files": {"crop_recommender.pkl": {"sha256": ..., "size": ...}, ...}
+    }
+
+ModelBundle reads the manifest and checks the loaded components against
+it. Loading and load times are handled by LazyComponents (model_context.py),
+with load_pickle() as the thread-safe unpickler. Checksums are verified
+lazily in a background thread after startup (hashing the pickles would
+otherwise add to cold start); cheap structural checks (encoder classes,
+feature orders) run inline. Bundles without a manifest still load, unversioned.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_FORMAT = 1
+
+# Checksum read size
+HASH_CHUNK_BYTES = 1 << 20
+
+# Unpickling imports the model's modules (sklearn.ensemble, ...); concurrent
+# first imports of interdependent modules can deadlock on the import locks,
+# so pickles are loaded one at a time while other loaders run in parallel
+_PICKLE_LOCK = threading.Lock()
+
+
+def load_pickle(path: str) -> Any:
+    """joblib.load() that is safe to call from parallel loader threads"""
+    with _PICKLE_LOCK:
+        return joblib.load(path)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ============================================================================
+# MANIFEST WRITER (training side)
+# ============================================================================
+
+def write_manifest(
+    bundle_dir: str,
+    trainer: str,
+    dataset_path: str,
+    features: Dict[str, List[str]],
+    encoders: Dict[str, Any],
+    files: List[str],
+    dataset_rows: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Write manifest.json for the artifacts a training run produced.
+
+    Args:
+        bundle_dir: Directory holding the trained artifacts
+        trainer: Training script that produced them
+        dataset_path: Dataset the models were trained on
+        features: Model name -> input feature order used in training
+        encoders: Column -> fitted LabelEncoder
+        files: Artifact file names (relative to bundle_dir) to checksum
+        dataset_rows: Number of dataset rows used
+
+    Returns:
+        The manifest dict
+    """
+    import numpy
+    import sklearn
+
+    created_at = datetime.now(timezone.utc).replace(microsecond=0)
+    file_entries = {
+        name: {
+            'sha256': file_sha256(os.path.join(bundle_dir, name)),
+            'size': os.path.getsize(os.path.join(bundle_dir, name))
+        }
+        for name in sorted(files)
+    }
+    content_id = hashlib.sha256(
+        json.dumps({n: e['sha256'] for n, e in file_entries.items()}, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'version': f"{created_at:%Y%m%d-%H%M%S}-{content_id[:8]}",
+        'created_at': created_at.isoformat(),
+        'trainer': {
+            'script': os.path.basename(trainer),
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': numpy.__version__
+        },
+        'dataset': {
+            'file': os.path.basename(dataset_path),
+            'sha256': file_sha256(dataset_path),
+            'rows': dataset_rows
+        },
+        'features': {name: list(columns) for name, columns in features.items()},
+        'encoders': {col: [str(c) for c in encoder.classes_] for col, encoder in encoders.items()},
+        'files': file_entries
+    }
+
+    tmp_path = os.path.join(bundle_dir, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(bundle_dir, MANIFEST_FILE))
+
+    return manifest
+
+
+# ============================================================================
+# BUNDLE LOADER (serving side)
+# ============================================================================
+
+class ModelBundle:
+    """Model directory plus its (optional) manifest."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest: Optional[Dict[str, Any]] = None
+        self.verification: Dict[str, str] = {}      # file -> 'ok' / 'mismatch' / 'missing'
+
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version'] if self.manifest else 'unversioned'
+
+    def path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    # ------------------------------------------------------------------
+    # Consistency checks
+    # ------------------------------------------------------------------
+
+    def check_encoders(self, encoders: Dict[str, Any]) -> List[str]:
+        """Columns whose loaded encoder classes differ from the manifest"""
+        if not self.manifest:
+            return []
+        expected = self.manifest.get('encoders', {})
+        return [
+            col for col, classes in expected.items()
+            if col not in encoders or [str(c) for c in encoders[col].classes_] != classes
+        ]
+
+    def check_features(self, serving_features: Dict[str, List[str]]) -> List[str]:
+        """Models whose serving feature order differs from the training order"""
+        if not self.manifest:
+            return []
+        trained = self.manifest.get('features', {})
+        return [
+            name for name, columns in serving_features.items()
+            if name in trained and trained[name] != list(columns)
+        ]
+
+    def verify(self, dataset_path: Optional[str] = None) -> Dict[str, str]:
+        """
+        Check every file listed in the manifest (and the dataset, if given)
+        against its recorded SHA-256.
+        """
+        if not self.manifest:
+            return {}
+
+        expected = {name: entry['sha256'] for name, entry in self.manifest.get('files', {}).items()}
+        paths = {name: self.path(name) for name in expected}
+        if dataset_path is not None and 'dataset' in self.manifest:
+            expected['dataset'] = self.manifest['dataset']['sha256']
+            paths['dataset'] = dataset_path
+
+        for name, checksum in expected.items():
+            if not os.path.exists(paths[name]):
+                self.verification[name] = 'missing'
+            else:
+                self.verification[name] = 'ok' if file_sha256(paths[name]) == checksum else 'mismatch'
+
+            if self.verification[name] != 'ok':
+                logger.warning(f"Bundle {self.version}: {name} is {self.verification[name]} (manifest checksum)")
+
+        return self.verification
+
+    def verify_in_background(self, dataset_path: Optional[str] = None) -> Optional[threading.Thread]:
+        """Run verify() on a daemon thread (None when there is no manifest)"""
+        if not self.manifest:
+            return None
+        thread = threading.Thread(
+            target=self.verify, args=(dataset_path,), name='bundle-verify', daemon=True
+        )
+        thread.start()
+        return thread
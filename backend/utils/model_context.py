@@ -0,0 +1,336 @@
+"""
+Model Context - Immutable Serving State with Hot Reload
+========================================================
+
+Everything the request handlers read (models, encoders, dataset insights,
+prediction cube, ...) lives in one immutable ModelContext. The app keeps a
+single module-level reference to the current context; every handler reads
+that reference once at the start of the request and uses it throughout.
+
+Components are loaded lazily: each one is loaded on first use behind a
+per-component once-guard (LazyComponents), so a worker that only serves the
+insight endpoints never unpickles a model. An optional background prefetch
+loads the rest after startup; /health reports the state and load time of
+every component.
+
+A reload builds and warms up a complete new context in a background thread,
+then replaces the reference in one assignment. Requests already in flight
+keep the context they started with and finish on the old version; the old
+context is freed once the last of them returns.
+
+Reloads are triggered through the admin endpoint or by the optional file
+watcher (MODEL_WATCH_INTERVAL), which polls the bundle fingerprint. Each
+gunicorn worker holds its own context, so multi-worker deployments should
+enable the watcher: an admin request only reaches one worker.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# LAZY COMPONENTS
+# ============================================================================
+
+class LazyComponents(Mapping):
+    """
+    Read-only mapping of named components, each loaded on first access.
+
+    Every component is loaded at most once: concurrent first accesses wait
+    for the thread that is loading it. A failed load is remembered and
+    reported on every later access (until the next reload builds a new
+    context), so a missing file does not cost a disk hit per request.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self._loaders = dict(loaders)
+        self._locks = {name: threading.Lock() for name in loaders}
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._timings: Dict[str, float] = {}    # component -> load seconds
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._values[name]            # Fast path: already loaded
+        except KeyError:
+            pass
+        if name not in self._loaders:
+            raise KeyError(name)
+
+        with self._locks[name]:
+            if name in self._values:
+                return self._values[name]
+            if name not in self._errors:
+                self._load(name)
+            if name in self._errors:
+                raise RuntimeError(f"Model component '{name}' failed to load: {self._errors[name]}")
+            return self._values[name]
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            self._values[name] = self._loaders[name]()
+        except Exception as e:
+            self._errors[name] = e
+            logger.error(f"Could not load {name}: {str(e)}")
+        finally:
+            self._timings[name] = time.perf_counter() - start
+
+    def __contains__(self, name: object) -> bool:
+        # Mapping's default would load the component to answer
+        return name in self._loaders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._values
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State ('pending' / 'loading' / 'ready' / 'failed') and load time of each component"""
+        status = {}
+        for name in self._loaders:
+            if name in self._values:
+                state = 'ready'
+            elif name in self._errors:
+                state = 'failed'
+            elif self._locks[name].locked():
+                state = 'loading'
+            else:
+                state = 'pending'
+
+            entry = {'state': state}
+            if name in self._timings:
+                entry['load_ms'] = round(self._timings[name] * 1000, 1)
+            if name in self._errors:
+                entry['error'] = str(self._errors[name])
+            status[name] = entry
+        return status
+
+
+# ============================================================================
+# MODEL CONTEXT
+# ============================================================================
+
+class ModelContext(NamedTuple):
+    """Serving state of one model bundle (never replaced after construction)"""
+    version: str
+    bundle: Any                  # ModelBundle the context was loaded from
+    fingerprint: str             # Bundle file fingerprint when the context was built
+    models: LazyComponents       # 'crop', 'nutrient', 'water', 'fertilizer'
+    components: LazyComponents   # Encoders, dataset and everything derived from them
+    loaded_at: float             # time.time() when the context was built
+
+    # Lazily loaded components, read like plain attributes by the handlers
+
+    @property
+    def encoders(self) -> Dict[str, Any]:
+        return self.components['encoders']
+
+    @property
+    def scalers(self) -> Dict[str, Any]:
+        return self.components['scalers']
+
+    @property
+    def feature_encoder(self) -> Any:
+        """FeatureEncoder"""
+        return self.components['feature_encoder']
+
+    @property
+    def crop_rule_bits(self) -> np.ndarray:
+        """Validation-rule bitmask of each crop model class"""
+        return self.components['crop_rule_bits']
+
+    @property
+    def dataset(self) -> Any:
+        """pandas DataFrame (read-only)"""
+        return self.components['dataset']
+
+    @property
+    def dataset_insights(self) -> Any:
+        """DatasetInsights"""
+        return self.components['dataset_insights']
+
+    @property
+    def prediction_cube(self) -> Any:
+        """PredictionCube or None"""
+        return self.components['prediction_cube']
+
+    # Readiness and eager loading
+
+    def _group(self, name: str) -> LazyComponents:
+        return self.models if name in self.models else self.components
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {**self.models.status(), **self.components.status()}
+
+    def ready(self) -> List[str]:
+        """Names of the components loaded so far"""
+        return [name for name in [*self.models, *self.components] if self._group(name).is_ready(name)]
+
+    def load(self, names: Optional[Iterable[str]] = None, max_workers: int = 4) -> None:
+        """
+        Load components (all by default) in parallel threads and wait for
+        them. Raises the first load error.
+        """
+        names = list(names) if names is not None else [*self.models, *self.components]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='model-load') as pool:
+            futures = [pool.submit(self._group(name).__getitem__, name) for name in names]
+            for future in futures:
+                future.result()
+
+    def prefetch(self, names: Optional[Iterable[str]] = None, max_workers: int = 4) -> threading.Thread:
+        """load() on a daemon thread; failures only show up in status()"""
+        def run():
+            try:
+                self.load(names, max_workers)
+            except Exception:
+                pass    # Already logged and recorded by LazyComponents
+
+        thread = threading.Thread(target=run, name='model-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+
+# ============================================================================
+# RELOADER
+# ============================================================================
+
+class ModelReloader:
+    """Builds new contexts in the background and swaps them in atomically."""
+
+    def __init__(
+        self,
+        build: Callable[[], ModelContext],
+        swap: Callable[[ModelContext], None],
+        fingerprint: Callable[[], str],
+        warm_up: Optional[Callable[[ModelContext], None]] = None
+    ):
+        """
+        Args:
+            build: Loads a complete new context from the bundle directory
+            swap: Publishes a context (a single reference assignment)
+            fingerprint: Cheap fingerprint of the bundle files (watcher)
+            warm_up: Exercises a new context before it is published
+        """
+        self._build = build
+        self._swap = swap
+        self._fingerprint = fingerprint
+        self._warm_up = warm_up
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+
+        self.state = 'idle'               # idle / loading / failed
+        self.last_error: Optional[str] = None
+        self.last_reload_seconds: Optional[float] = None
+        self.reload_count = 0
+        self.loaded_fingerprint = fingerprint()
+        self.failed_fingerprint: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'last_error': self.last_error,
+            'last_reload_seconds': self.last_reload_seconds,
+            'reload_count': self.reload_count,
+            'watching': self._watcher is not None,
+            'worker_pid': os.getpid()
+        }
+
+    def reload(self, wait: bool = False) -> bool:
+        """
+        Start a reload unless one is already running.
+
+        Args:
+            wait: Block until the reload has finished
+
+        Returns:
+            True if this call started a reload
+        """
+        with self._lock:
+            started = self._thread is None or not self._thread.is_alive()
+            if started:
+                self.state = 'loading'
+                self._thread = threading.Thread(target=self._run, name='model-reload', daemon=True)
+                self._thread.start()
+            thread = self._thread
+
+        if wait:
+            thread.join()
+        return started
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        fingerprint = None
+        try:
+            fingerprint = self._fingerprint()
+            context = self._build()
+            if context is None:
+                raise RuntimeError('Model bundle could not be loaded')
+            if self._warm_up is not None:
+                self._warm_up(context)
+
+            self._swap(context)
+            self.loaded_fingerprint = fingerprint
+            self.reload_count += 1
+            self.last_error = None
+            self.state = 'idle'
+            logger.info(f"Model context {context.version} swapped in")
+        except Exception as e:
+            self.last_error = str(e)
+            self.failed_fingerprint = fingerprint
+            self.state = 'failed'
+            logger.error(f"Model reload failed, keeping the current context: {str(e)}")
+        finally:
+            self.last_reload_seconds = time.perf_counter() - start
+
+    # ------------------------------------------------------------------
+    # File watcher
+    # ------------------------------------------------------------------
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll the bundle fingerprint every `interval` seconds and reload on change"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name='model-watcher', daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, interval: float) -> None:
+        pending = None
+        while True:
+            time.sleep(interval)
+            try:
+                fingerprint = self._fingerprint()
+            except Exception as e:
+                logger.warning(f"Model watcher could not read the bundle: {str(e)}")
+                continue
+
+            if fingerprint in (self.loaded_fingerprint, self.failed_fingerprint):
+                # Nothing new (a failed bundle is retried once its files change)
+                pending = None
+            elif fingerprint == pending:
+                # Unchanged for a full interval: the new files are complete
+                logger.info("Model bundle changed on disk, reloading")
+                self.reload(wait=True)
+                pending = None
+            else:
+                pending = fingerprint
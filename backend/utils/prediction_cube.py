@@ -0,0 +1,282 @@
+"""
+Prediction Cube - Materialized Model Outputs
+=============================================
+
+The crop, water-quality and nutrient models only depend on categorical inputs
+(District, Soil_Type, Weather and, for nutrients, Crop_Name; Zone is derived
+from District). The whole input space is therefore small enough to be
+evaluated once at startup and served as plain NumPy array lookups.
+
+Arrays (indexed by encoded label IDs):
+- crop_proba: [district, soil, weather, crop_class]      -> probability
+- nutrients:  [district, soil, weather, crop, nutrient]  -> kg/ha
+- water:      [district, soil, weather, parameter]       -> pH, NTU, °C
+
+Each section depends on one model only and is built (or read from its cache)
+on first use, so a worker that only serves /predict-nutrients never loads the
+crop forest. Every section is persisted as its own memory-mapped artifact
+directory next to the models (shared by all worker processes) and is
+invalidated automatically when its model or the encoder file, the zone map,
+the constant nutrient features or the cube format changes.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    CROP_FEATURES,
+    NUTRIENT_FEATURES,
+    WATER_FEATURES,
+    NUTRIENT_FEATURE_DEFAULTS
+)
+from utils.artifact_store import save_artifact, load_artifact
+from utils.feature_encoder import FeatureEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Axes of the cube, in storage order
+CUBE_AXES = ['District', 'Soil_Type', 'Weather']
+
+# Cube section -> model it is evaluated from
+CUBE_SECTIONS = {'crop_proba': 'crop', 'nutrients': 'nutrient', 'water': 'water'}
+
+# Bump when the layout or construction of the sections changes
+CUBE_FORMAT_VERSION = 2
+
+
+# ============================================================================
+# FINGERPRINTING
+# ============================================================================
+
+def model_fingerprint(paths: List[str]) -> str:
+    """
+    Build a cheap fingerprint (name, size, mtime) of the model files the cube
+    was computed from. Any retrain or file replacement changes it.
+    """
+    parts = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{os.path.basename(path)}:missing")
+    return '|'.join(parts)
+
+
+def section_fingerprint(
+    section: str,
+    files_fingerprint: str,
+    feature_encoder: FeatureEncoder,
+    get_zone: Callable[[str], str]
+) -> str:
+    """
+    Fingerprint of everything a cube section is computed from besides the
+    model files: the cube format version, the district -> zone map and (for
+    the nutrient section) the constant feature values.
+    """
+    inputs = {'zones': {d: get_zone(d) for d in feature_encoder.labels('District')}}
+    if section == 'nutrients':
+        inputs['feature_defaults'] = NUTRIENT_FEATURE_DEFAULTS
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()[:16]
+    return f"v{CUBE_FORMAT_VERSION}|{files_fingerprint}|inputs:{digest}"
+
+
+# ============================================================================
+# PREDICTION CUBE
+# ============================================================================
+
+class PredictionCube:
+    """Dense lookup tables of model outputs over the categorical input space."""
+
+    def __init__(self, sections: Mapping[str, Any], keys: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            sections: Section arrays by key. A LazyComponents builds each
+                section on first access; a section that failed reads as None
+            keys: Section name -> key in `sections` (default: the section name)
+        """
+        self._sections = sections
+        self._keys = keys or {name: name for name in CUBE_SECTIONS}
+
+    def section(self, name: str) -> Optional[np.ndarray]:
+        """Array of one section, or None if it is not available"""
+        key = self._keys[name]
+        if key not in self._sections:
+            return None
+        try:
+            return self._sections[key]
+        except RuntimeError:
+            return None     # Failed to build (logged and recorded by LazyComponents)
+
+    @property
+    def crop_proba(self) -> Optional[np.ndarray]:
+        return self.section('crop_proba')
+
+    @property
+    def nutrients(self) -> Optional[np.ndarray]:
+        return self.section('nutrients')
+
+    @property
+    def water(self) -> Optional[np.ndarray]:
+        return self.section('water')
+
+    def crop_probabilities(self, district_id: int, soil_id: int, weather_id: int) -> np.ndarray:
+        """Class probabilities of the crop model (same as predict_proba()[0])"""
+        return self.crop_proba[district_id, soil_id, weather_id]
+
+    def nutrient_prediction(self, district_id: int, soil_id: int, weather_id: int,
+                            crop_id) -> np.ndarray:
+        """Nutrient model output for one crop ID (or an array of crop IDs)"""
+        return self.nutrients[district_id, soil_id, weather_id, crop_id]
+
+    def water_prediction(self, district_id: int, soil_id: int, weather_id: int) -> np.ndarray:
+        """Water-quality model output (pH, turbidity, temperature)"""
+        return self.water[district_id, soil_id, weather_id]
+
+
+# ============================================================================
+# CUBE CONSTRUCTION
+# ============================================================================
+
+def _grid(*sizes: int) -> List[np.ndarray]:
+    """Flattened index grid over the given axis sizes (C order)"""
+    mesh = np.meshgrid(*[np.arange(n) for n in sizes], indexing='ij')
+    return [m.ravel() for m in mesh]
+
+
+def build_cube_section(
+    section: str,
+    model: Any,
+    feature_encoder: FeatureEncoder,
+    get_zone: Callable[[str], str]
+) -> np.ndarray:
+    """
+    Evaluate one model over every (district, soil, weather) cell (and every
+    crop, for the nutrient model) in a single batched call.
+
+    Args:
+        section: 'crop_proba', 'nutrients' or 'water'
+        model: The loaded model of the section (CUBE_SECTIONS)
+        feature_encoder: Compiled categorical encoder
+        get_zone: District -> zone mapping used at serving time
+
+    Returns:
+        Array indexed by encoded label IDs (see the module docstring)
+    """
+    start = time.perf_counter()
+
+    districts = feature_encoder.labels('District')
+    n_districts = len(districts)
+    n_soils = feature_encoder.size('Soil_Type')
+    n_weather = feature_encoder.size('Weather')
+    cell_shape = (n_districts, n_soils, n_weather)
+
+    # Zone is fully determined by the district
+    zone_ids = feature_encoder.encode_many('Zone', [get_zone(d) for d in districts])
+
+    if section == 'nutrients':
+        n_crops = feature_encoder.size('Crop_Name')
+        d_idx, s_idx, w_idx, c_idx = _grid(n_districts, n_soils, n_weather, n_crops)
+        columns = {
+            'District': d_idx,
+            'Soil_Type': s_idx,
+            'Crop_Name': c_idx,
+            'Weather': w_idx,
+            'Zone': zone_ids[d_idx]
+        }
+        for col, default in NUTRIENT_FEATURE_DEFAULTS.items():
+            columns[col] = np.full(len(d_idx), default)
+
+        X = np.column_stack([columns[col] for col in NUTRIENT_FEATURES]).astype(float)
+        prediction = model.predict(X)
+        array = prediction.reshape(cell_shape + (n_crops, prediction.shape[1]))
+    else:
+        d_idx, s_idx, w_idx = _grid(n_districts, n_soils, n_weather)
+        columns = {
+            'District': d_idx,
+            'Soil_Type': s_idx,
+            'Weather': w_idx,
+            'Zone': zone_ids[d_idx]
+        }
+        if section == 'crop_proba':
+            prediction = model.predict_proba(np.column_stack([columns[col] for col in CROP_FEATURES]))
+        elif section == 'water':
+            prediction = model.predict(np.column_stack([columns[col] for col in WATER_FEATURES]))
+        else:
+            raise ValueError(f"Unknown prediction cube section: {section}")
+        array = prediction.reshape(cell_shape + (prediction.shape[1],))
+
+    logger.info(
+        f"Prediction cube section {section} built in {time.perf_counter() - start:.2f}s "
+        f"({n_districts}x{n_soils}x{n_weather} cells, {array.nbytes / 1e6:.1f} MB)"
+    )
+    return array
+
+
+def build_prediction_cube(
+    models: Dict[str, Any],
+    feature_encoder: FeatureEncoder,
+    get_zone: Callable[[str], str]
+) -> PredictionCube:
+    """
+    Build every section in memory (no cache). Sections whose model is missing
+    or fails to predict are left out; the other sections are still built.
+    """
+    sections = {}
+    for section, name in CUBE_SECTIONS.items():
+        if name not in models:
+            continue
+        try:
+            sections[section] = build_cube_section(section, models[name], feature_encoder, get_zone)
+        except Exception as e:
+            logger.warning(f"Prediction cube: no {section} section ({str(e)})")
+    return PredictionCube(sections)
+
+
+def load_or_build_cube_section(
+    cache_path: str,
+    section: str,
+    load_model: Callable[[], Any],
+    feature_encoder: FeatureEncoder,
+    get_zone: Callable[[str], str],
+    fingerprint: str
+) -> np.ndarray:
+    """
+    Load one section from `cache_path` if it matches `fingerprint` (of the
+    model and encoder files, extended by section_fingerprint()), otherwise
+    build it and (best effort) write it back to the cache.
+
+    The model is only loaded (load_model()) when the cache is missing or
+    stale. Errors are raised, so a section that fails is not cached and is
+    built again by the next model context.
+    """
+    fingerprint = section_fingerprint(section, fingerprint, feature_encoder, get_zone)
+    try:
+        artifact = load_artifact(cache_path, fingerprint)
+        if artifact is not None:
+            logger.info(f"Prediction cube section {section} loaded from {cache_path}")
+            return artifact[0][section]
+    except Exception as e:
+        logger.warning(f"Could not read prediction cube cache: {str(e)}")
+
+    array = build_cube_section(section, load_model(), feature_encoder, get_zone)
+
+    try:
+        save_artifact(cache_path, {section: array}, {'fingerprint': fingerprint})
+    except OSError as e:
+        logger.warning(f"Could not write prediction cube cache: {str(e)}")
+
+    return array
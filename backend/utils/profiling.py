@@ -0,0 +1,232 @@
+"""
+Request Profiling - Sampled / On-Demand cProfile Captures
+=========================================================
+
+Server-Timing shows which stage of a request is slow; this module shows
+which functions inside it. A request is profiled with cProfile when:
+
+- it is sampled (PROFILE_SAMPLE_RATE, e.g. 0.001 = 1 in 1000 requests), or
+- an operator asks for it with 'X-Profile: 1' plus the admin token
+
+Each capture keeps the top-N functions by cumulative time and the call
+graph as collapsed stacks ("frame;frame;frame <microseconds>", the input
+format of flamegraph.pl / speedscope) in a bounded ring buffer, served by
+the /admin/profiles endpoints.
+
+cProfile records caller -> callee edges, not full stacks, so collapsed
+stacks are reconstructed from the call graph: a callee's time is split
+between its callers in proportion to the time each call edge took. This
+is exact for tree-shaped call graphs and a good approximation otherwise.
+
+Only one request is profiled at a time per worker (Python allows a single
+active profiler); other requests that would be sampled meanwhile are not.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+PROFILE_HEADER = 'X-Profile'
+
+# Call graph paths contributing less than this many microseconds are dropped
+MIN_STACK_MICROSECONDS = 10
+MAX_STACK_DEPTH = 64
+
+FunctionKey = Tuple[str, int, str]
+
+
+class ProfileRecord(NamedTuple):
+    """One profiled request"""
+    id: int
+    timestamp: float
+    trigger: str                 # 'sampled' or 'requested'
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    top: List[Dict[str, Any]]    # top-N functions by cumulative time
+    collapsed: List[str]         # 'frame;frame;frame <microseconds>'
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'trigger': self.trigger,
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'status': self.status,
+            'duration_ms': self.duration_ms
+        }
+
+
+def function_label(func: FunctionKey) -> str:
+    """'utils/crop_prediction_calibrator.py:calibrate_batch:588' (or the builtin's name)"""
+    filename, line, name = func
+    if filename == '~':
+        return name
+    # Parent directory tells flask/app.py from backend/app.py
+    short_name = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+    return f'{short_name}:{name}:{line}'
+
+
+def top_functions(stats: pstats.Stats, n: int) -> List[Dict[str, Any]]:
+    """Top n functions by cumulative time"""
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:n]
+    return [
+        {
+            'function': function_label(func),
+            'ncalls': nc,
+            'primitive_calls': cc,
+            'tottime_ms': round(tt * 1000, 3),
+            'cumtime_ms': round(ct * 1000, 3)
+        }
+        for func, (cc, nc, tt, ct, _) in entries
+    ]
+
+
+def collapsed_stacks(stats: pstats.Stats, max_stacks: int) -> List[str]:
+    """Collapsed stack lines reconstructed from the call graph, heaviest first"""
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        known_callers = [caller for caller in callers if caller in stats.stats]
+        if not known_callers:
+            roots.append(func)
+        for caller in known_callers:
+            # callers[caller] = (cc, nc, tt, ct) of the caller -> func edge
+            callees.setdefault(caller, []).append((func, callers[caller][3]))
+
+    totals: Dict[Tuple[str, ...], float] = {}
+
+    def walk(func: FunctionKey, seconds: float, path: Tuple[str, ...], on_path: frozenset) -> None:
+        _, _, tt, ct, _ = stats.stats[func]
+        path = path + (function_label(func),)
+        share = seconds / ct if ct > 0 else 0.0
+        self_us = tt * share * 1e6
+        if self_us >= 1:
+            totals[path] = totals.get(path, 0.0) + self_us
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            child_seconds = edge_ct * share
+            if callee in on_path or child_seconds * 1e6 < MIN_STACK_MICROSECONDS:
+                continue
+            walk(callee, child_seconds, path, on_path | {callee})
+
+    for root in roots:
+        walk(root, stats.stats[root][3], (), frozenset([root]))
+
+    heaviest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:max_stacks]
+    return [f"{';'.join(path)} {int(round(us))}" for path, us in heaviest]
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the last captures"""
+
+    def __init__(self, sample_rate: float = 0.0, buffer_size: int = 50,
+                 top_n: int = 25, max_stacks: int = 500):
+        """
+        Args:
+            sample_rate: Fraction of requests profiled automatically (0 = only on demand)
+            buffer_size: Captures kept (oldest dropped first)
+            top_n: Functions kept per capture (by cumulative time)
+            max_stacks: Collapsed stack lines kept per capture
+        """
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.max_stacks = max_stacks
+        self._records: deque = deque(maxlen=buffer_size)
+        self._records_lock = threading.Lock()
+        # Only one active profiler per process
+        self._active = threading.Lock()
+        self._next_id = 1
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling the current thread (None if another request is being profiled)"""
+        if not self._active.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active
+            self._active.release()
+            self.skipped_busy += 1
+            return None
+        return profile
+
+    def abort(self, profile: cProfile.Profile) -> None:
+        """Stop without keeping a capture"""
+        profile.disable()
+        self._active.release()
+
+    def stop(self, profile: cProfile.Profile, trigger: str, method: str, path: str,
+             route: str, status: int, duration: float) -> ProfileRecord:
+        """Stop profiling and store the capture"""
+        profile.disable()
+        try:
+            stats = pstats.Stats(profile)
+            top = top_functions(stats, self.top_n)
+            collapsed = collapsed_stacks(stats, self.max_stacks)
+        finally:
+            self._active.release()
+
+        with self._records_lock:
+            record = ProfileRecord(
+                id=self._next_id,
+                timestamp=time.time(),
+                trigger=trigger,
+                method=method,
+                path=path,
+                route=route,
+                status=status,
+                duration_ms=round(duration * 1000, 3),
+                top=top,
+                collapsed=collapsed
+            )
+            self._next_id += 1
+            self._records.append(record)
+            self.profiled += 1
+        return record
+
+    def records(self) -> List[ProfileRecord]:
+        """Captures in the buffer, newest first"""
+        with self._records_lock:
+            return list(reversed(self._records))
+
+    def get(self, record_id: int) -> Optional[ProfileRecord]:
+        with self._records_lock:
+            for record in self._records:
+                if record.id == record_id:
+                    return record
+        return None
+
+    def clear(self) -> None:
+        with self._records_lock:
+            self._records.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'sample_rate': self.sample_rate,
+            'buffer_size': self._records.maxlen,
+            'buffered': len(self._records),
+            'profiled': self.profiled,
+            'skipped_busy': self.skipped_busy,
+            'worker_pid': os.getpid()
+        }
@@ -0,0 +1,207 @@
+"""
+Request Log - Structured JSONL Log of Served Requests
+=====================================================
+
+backend_log.txt and the gunicorn access log say that requests happened, but
+not what was asked, so they cannot be replayed. With REQUEST_LOG_PATH set,
+every request (warm-up traffic excluded) is appended to a JSON Lines file:
+
+    {"bytes":2114,"cache":"MISS","latency_ms":1.84,"method":"POST","path":"/recommend-crop",
+     "payload":{"District":"Pune","Soil_Type":"Black","Weather":"Dry"},"pid":4242,
+     "query":"","route":"/recommend-crop","status":200,"ts":1760000000.123}
+
+`ts` is the arrival time (epoch seconds) and `payload` the parsed JSON body
+with sorted keys, so identical requests produce identical lines. Bodies
+that would make the line longer than `max_payload_bytes` are left out
+(`"payload_omitted": true`). Headers are not logged (no admin tokens).
+
+All gunicorn workers append to the same file. Each line is one write() on
+an O_APPEND descriptor, and size checks and rotation happen under an flock
+on '<path>.lock', so lines are never interleaved and the file is rotated
+once: '<path>' -> '<path>.1' -> ... -> '<path>.<backups>'. A worker whose
+descriptor still points at a rotated file reopens '<path>' before writing.
+Without fcntl (Windows) only the threads of one process are coordinated.
+
+read_request_log() reads a log and its rotated files back, oldest first,
+for replay_traffic.py.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl    # POSIX only
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLog:
+    """Appends one JSON line per request to a size-rotated file"""
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backups: int = 5,
+                 max_payload_bytes: int = 65536):
+        """
+        Args:
+            path: Log file (rotated files get '.1', '.2', ... appended)
+            max_bytes: Size at which the file is rotated (0 = never)
+            backups: Rotated files kept (0 = the full file is discarded)
+            max_payload_bytes: Longer lines are logged without payload
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_payload_bytes = max_payload_bytes
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def log(self, method: str, route: str, path: str, query: str, payload: Any,
+            status: int, latency: float, response_bytes: Optional[int],
+            cache: Optional[str] = None) -> None:
+        """Append one request (latency in seconds; ts is derived as now - latency)"""
+        record = {
+            'ts': round(time.time() - latency, 6),
+            'method': method,
+            'route': route,
+            'path': path,
+            'query': query,
+            'payload': payload,
+            'status': status,
+            'latency_ms': round(latency * 1000, 3),
+            'bytes': response_bytes,
+            'cache': cache,
+            'pid': os.getpid()
+        }
+        try:
+            line = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+            if payload is not None and len(line) > self.max_payload_bytes:
+                record['payload'] = None
+                record['payload_omitted'] = True
+                line = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        except (TypeError, ValueError):
+            self.dropped += 1
+            return
+        self.write_line(line)
+
+    def write_line(self, line: str) -> None:
+        """Append one line (newline added); errors are counted, never raised"""
+        data = (line + '\n').encode('utf-8')
+        with self._lock:
+            try:
+                self._lock_file()
+                try:
+                    fd = self._current_fd()
+                    os.write(fd, data)
+                    if self.max_bytes and os.lseek(fd, 0, os.SEEK_CUR) >= self.max_bytes:
+                        self._rotate()
+                finally:
+                    self._unlock_file()
+                self.written += 1
+            except OSError as e:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning(f"Could not write request log {self.path}: {e} ({self.dropped} dropped)")
+
+    def _lock_file(self) -> None:
+        if fcntl is None:
+            return
+        if self._lock_fd is None or self._pid != os.getpid():
+            # Descriptors inherited over fork share the parent's flock
+            for fd in (self._fd, self._lock_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._lock_fd = os.open(f'{self.path}.lock', os.O_RDWR | os.O_CREAT, 0o644)
+            self._fd = None
+            self._pid = os.getpid()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+
+    def _unlock_file(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _current_fd(self) -> int:
+        """Descriptor of '<path>', reopened if another process rotated the file"""
+        if self._fd is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._fd).st_ino:
+                    return self._fd
+            except FileNotFoundError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _rotate(self) -> None:
+        os.close(self._fd)
+        self._fd = None
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f'{self.path}.{i}'):
+                    os.replace(f'{self.path}.{i}', f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in (self._fd, self._lock_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._fd = self._lock_fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'written': self.written,
+            'dropped': self.dropped,
+            'rotations': self.rotations
+        }
+
+
+def request_log_files(path: str) -> List[str]:
+    """'<path>' and its rotated files that exist, oldest first"""
+    files = []
+    i = 1
+    while os.path.exists(f'{path}.{i}'):
+        files.append(f'{path}.{i}')
+        i += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_request_log(path: str, include_rotated: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Records of a request log, file by file (oldest first). Lines that are
+    not valid JSON (e.g. cut off by a crash) are skipped.
+    """
+    paths = request_log_files(path) if include_rotated else [path]
+    for file_path in paths:
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and 'ts' in record and 'path' in record:
+                    yield record
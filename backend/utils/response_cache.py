@@ -0,0 +1,499 @@
+"""
+Response Cache - Bounded LRU/TTL Cache for Inference Responses
+==============================================================
+
+The POST inference endpoints are deterministic for a given model bundle and
+request body, and traffic concentrates on a few hundred popular
+(district, soil, weather) combinations. Successful responses are cached as
+serialized JSON bytes under a key built from:
+
+- the endpoint path
+- the model bundle version (a reload changes every key)
+- the request body, normalized (sorted keys, no whitespace)
+
+Three backends share the same get() / put() API:
+
+- memory: dict in each worker process (LRU, fastest, not shared)
+- shm:    fixed-size hash table in a multiprocessing.shared_memory segment,
+          8-way set-associative with per-set LRU, guarded by fcntl byte-range
+          locks; every gunicorn worker on the host reuses the same entries
+- sqlite: local SQLite file in WAL mode; shared by the workers, survives
+          restarts
+
+All backends are bounded by entry count and support an optional time-to-live.
+Hit / miss / eviction / expiry counters (per worker) are kept for monitoring.
+Backend errors never fail a request: they count as misses.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import abc
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_BACKENDS = ('memory', 'shm', 'sqlite')
+
+
+def response_cache_key(path: str, version: str, payload: Any) -> Optional[bytes]:
+    """
+    16-byte cache key of a request (None when the body is not JSON-serializable).
+
+    Dictionary key order and whitespace do not matter; values are compared
+    exactly (list order included), since the handlers use them as given.
+    """
+    try:
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (path, version, body):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.digest()
+
+
+class ResponseCache(abc.ABC):
+    """Common counters and error handling of the cache backends."""
+
+    backend = ''
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid (0 = until evicted)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._counter_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        try:
+            body, expired = self._lookup(key)
+        except Exception as e:
+            logger.warning(f"Response cache ({self.backend}) read failed: {str(e)}")
+            body, expired = None, False
+            self._count(errors=1)
+
+        self._count(hits=int(body is not None), misses=int(body is None), expirations=int(expired))
+        return body
+
+    def put(self, key: bytes, body: bytes) -> None:
+        try:
+            evicted = self._store(key, body)
+        except Exception as e:
+            logger.warning(f"Response cache ({self.backend}) write failed: {str(e)}")
+            self._count(errors=1)
+            return
+        self._count(evictions=evicted)
+
+    def _count(self, **increments: int) -> None:
+        with self._counter_lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _expires_at(self) -> float:
+        """Absolute expiry time of an entry stored now (0 = never)"""
+        return time.time() + self.ttl if self.ttl > 0 else 0.0
+
+    # Backend interface
+    @abc.abstractmethod
+    def _lookup(self, key: bytes) -> Tuple[Optional[bytes], bool]:
+        """(body or None, whether an expired entry was dropped)"""
+
+    @abc.abstractmethod
+    def _store(self, key: bytes, body: bytes) -> int:
+        """Store an entry; returns the number of entries evicted"""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of entries stored"""
+
+    def close(self) -> None:
+        """Release OS resources (shared memory, files)"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring (hits / misses are counted per worker)"""
+        lookups = self.hits + self.misses
+        try:
+            entries = len(self)
+        except Exception:
+            entries = None
+        return {
+            'backend': self.backend,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'errors': self.errors,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# ============================================================================
+# IN-PROCESS BACKEND
+# ============================================================================
+
+class MemoryCache(ResponseCache):
+    """Thread-safe LRU dict in the worker process."""
+
+    backend = 'memory'
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0):
+        super().__init__(max_entries, ttl)
+        self._entries: 'OrderedDict[bytes, tuple]' = OrderedDict()   # key -> (expires_at, body)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: bytes) -> Tuple[Optional[bytes], bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+
+            expires_at, body = entry
+            if expires_at and time.time() >= expires_at:
+                del self._entries[key]
+                return None, True
+
+            self._entries.move_to_end(key)
+            return body, False
+
+    def _store(self, key: bytes, body: bytes) -> int:
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (self._expires_at(), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ============================================================================
+# SHARED MEMORY BACKEND
+# ============================================================================
+
+class SharedMemoryCache(ResponseCache):
+    """
+    Hash table in a named shared memory segment, shared by all processes
+    that open it with the same name and geometry.
+
+    Layout (n slots, grouped into sets of WAYS slots):
+        keys     uint64[n, 2]   16-byte cache key
+        expires  float64[n]     absolute expiry time (0 = never)
+        used     float64[n]     last access time (per-set LRU)
+        lengths  uint32[n]      body length (0 = empty slot)
+        data     n * slot_bytes response bodies
+
+    A key maps to one set; lookups and stores lock only that set (an fcntl
+    byte-range lock on a lock file for other processes, plus a thread lock
+    within this one). Bodies larger than slot_bytes are not cached. The new
+    segment is zero-filled, i.e. an empty table, so it needs no setup.
+    """
+
+    backend = 'shm'
+    WAYS = 8
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0, name: str = 'smart_farmer_responses',
+                 slot_bytes: int = 16384):
+        import fcntl    # POSIX only
+        from multiprocessing import shared_memory, resource_tracker
+
+        super().__init__(max_entries, ttl)
+        self._fcntl = fcntl
+        self.slot_bytes = slot_bytes
+        self.oversize = 0
+
+        n_sets = 1
+        while n_sets * self.WAYS < max_entries:
+            n_sets *= 2
+        self._n_sets = n_sets
+        n = self._n_slots = n_sets * self.WAYS
+        self.max_entries = n
+
+        data_offset = -(-36 * n // 64) * 64
+        size = data_offset + n * slot_bytes
+        self.segment_name = f"{name}-{n}x{slot_bytes}"
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.segment_name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=self.segment_name)
+        # Workers come and go; the segment must outlive the one that created it
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+
+        buf = self._shm.buf
+        self._keys = buf[0:16 * n].cast('Q')
+        self._expires = buf[16 * n:24 * n].cast('d')
+        self._used = buf[24 * n:32 * n].cast('d')
+        self._lengths = buf[32 * n:36 * n].cast('I')
+        self._data = buf[data_offset:data_offset + n * slot_bytes]
+        self._lengths_offset = 32 * n
+
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.segment_name}.lock")
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        # fcntl locks are held per process, so threads also need their own
+        self._thread_locks = [threading.Lock() for _ in range(min(n_sets, 64))]
+
+        # The views must be released before the segment is closed at exit
+        atexit.register(self.close)
+
+    @contextmanager
+    def _locked(self, set_index: int):
+        with self._thread_locks[set_index % len(self._thread_locks)]:
+            self._fcntl.lockf(self._lock_fd, self._fcntl.LOCK_EX, 1, set_index)
+            try:
+                yield
+            finally:
+                self._fcntl.lockf(self._lock_fd, self._fcntl.LOCK_UN, 1, set_index)
+
+    def _find(self, first: int, k0: int, k1: int) -> int:
+        """Slot holding the key in the set starting at `first` (-1 if none)"""
+        keys, lengths = self._keys, self._lengths
+        for slot in range(first, first + self.WAYS):
+            if lengths[slot] and keys[2 * slot] == k0 and keys[2 * slot + 1] == k1:
+                return slot
+        return -1
+
+    def _lookup(self, key: bytes) -> Tuple[Optional[bytes], bool]:
+        k0, k1 = struct.unpack('<QQ', key)
+        set_index = k0 & (self._n_sets - 1)
+        with self._locked(set_index):
+            slot = self._find(set_index * self.WAYS, k0, k1)
+            if slot < 0:
+                return None, False
+
+            now = time.time()
+            expires_at = self._expires[slot]
+            if expires_at and now >= expires_at:
+                self._lengths[slot] = 0
+                return None, True
+
+            self._used[slot] = now
+            start = slot * self.slot_bytes
+            return bytes(self._data[start:start + self._lengths[slot]]), False
+
+    def _store(self, key: bytes, body: bytes) -> int:
+        if len(body) > self.slot_bytes:
+            self._count(oversize=1)
+            return 0
+
+        k0, k1 = struct.unpack('<QQ', key)
+        set_index = k0 & (self._n_sets - 1)
+        first = set_index * self.WAYS
+        evicted = 0
+        with self._locked(set_index):
+            now = time.time()
+            slot = self._find(first, k0, k1)
+            if slot < 0:
+                # Empty or expired slot, else the least recently used one
+                ways = range(first, first + self.WAYS)
+                slot = next((i for i in ways if not self._lengths[i]), -1)
+                if slot < 0:
+                    slot = next((i for i in ways if self._expires[i] and now >= self._expires[i]), -1)
+                if slot < 0:
+                    slot = min(ways, key=lambda i: self._used[i])
+                    evicted = 1
+
+            # Invalidate first: a process killed mid-write leaves an empty slot
+            self._lengths[slot] = 0
+            start = slot * self.slot_bytes
+            self._data[start:start + len(body)] = body
+            self._keys[2 * slot] = k0
+            self._keys[2 * slot + 1] = k1
+            self._expires[slot] = self._expires_at()
+            self._used[slot] = now
+            self._lengths[slot] = len(body)
+        return evicted
+
+    def clear(self) -> None:
+        for set_index in range(self._n_sets):
+            with self._locked(set_index):
+                for slot in range(set_index * self.WAYS, (set_index + 1) * self.WAYS):
+                    self._lengths[slot] = 0
+
+    def __len__(self) -> int:
+        lengths = np.frombuffer(self._shm.buf, dtype=np.uint32, count=self._n_slots,
+                                offset=self._lengths_offset)
+        return int(np.count_nonzero(lengths))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['oversize'] = self.oversize
+        stats['slot_bytes'] = self.slot_bytes
+        return stats
+
+    def close(self) -> None:
+        if self._lock_fd < 0:
+            return
+        for view in (self._keys, self._expires, self._used, self._lengths, self._data):
+            view.release()
+        self._shm.close()
+        os.close(self._lock_fd)
+        self._lock_fd = -1
+        atexit.unregister(self.close)
+
+    def unlink(self) -> None:
+        """Remove the segment (entries are lost for every process)"""
+        from multiprocessing import shared_memory
+        segment = shared_memory.SharedMemory(name=self.segment_name)
+        segment.close()
+        segment.unlink()
+        try:
+            os.remove(self._lock_path)
+        except OSError:
+            pass
+
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+
+class SQLiteCache(ResponseCache):
+    """
+    Cache table in a local SQLite database in WAL mode (readers never block
+    on the writer). Each thread of each process uses its own connection.
+    """
+
+    backend = 'sqlite'
+
+    # Hits refresh the LRU timestamp at most this often (saves a write per hit)
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0, path: Optional[str] = None):
+        super().__init__(max_entries, ttl)
+        self.path = path or os.path.join(tempfile.gettempdir(), 'smart_farmer_responses.sqlite3')
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache ('
+            'key BLOB PRIMARY KEY, body BLOB NOT NULL, expires REAL NOT NULL, used REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS response_cache_used ON response_cache (used)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork (gunicorn --preload)
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')     # A cache does not need durability
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _lookup(self, key: bytes) -> Tuple[Optional[bytes], bool]:
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT body, expires, used FROM response_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None, False
+
+        body, expires_at, used = row
+        now = time.time()
+        if expires_at and now >= expires_at:
+            connection.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            return None, True
+
+        if now - used > self.TOUCH_INTERVAL:
+            connection.execute('UPDATE response_cache SET used = ? WHERE key = ?', (now, key))
+        return bytes(body), False
+
+    def _store(self, key: bytes, body: bytes) -> int:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO response_cache (key, body, expires, used) VALUES (?, ?, ?, ?)',
+                (key, body, self._expires_at(), time.time())
+            )
+            (count,) = connection.execute('SELECT COUNT(*) FROM response_cache').fetchone()
+            evicted = max(0, count - self.max_entries)
+            if evicted:
+                connection.execute(
+                    'DELETE FROM response_cache WHERE key IN '
+                    '(SELECT key FROM response_cache ORDER BY used LIMIT ?)', (evicted,)
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return evicted
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM response_cache')
+
+    def __len__(self) -> int:
+        (count,) = self._connection().execute('SELECT COUNT(*) FROM response_cache').fetchone()
+        return count
+
+    def close(self) -> None:
+        if getattr(self._local, 'pid', None) == os.getpid():
+            self._local.connection.close()
+            self._local.pid = None
+
+
+def create_response_cache(
+    backend: str,
+    max_entries: int,
+    ttl: float = 0,
+    shm_name: str = 'smart_farmer_responses',
+    shm_slot_bytes: int = 16384,
+    sqlite_path: Optional[str] = None
+) -> ResponseCache:
+    """
+    Create a cache backend ('memory', 'shm' or 'sqlite'). Falls back to the
+    in-process cache when the shared backend cannot be opened (e.g. no
+    fcntl on Windows).
+    """
+    if backend not in RESPONSE_CACHE_BACKENDS:
+        raise ValueError(f"Unknown response cache backend '{backend}' (use one of {RESPONSE_CACHE_BACKENDS})")
+
+    try:
+        if backend == 'shm':
+            return SharedMemoryCache(max_entries, ttl, shm_name, shm_slot_bytes)
+        if backend == 'sqlite':
+            return SQLiteCache(max_entries, ttl, sqlite_path)
+    except (ImportError, OSError, sqlite3.Error) as e:
+        logger.warning(f"Response cache backend '{backend}' unavailable, using memory: {str(e)}")
+
+    return MemoryCache(max_entries, ttl)
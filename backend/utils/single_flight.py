@@ -0,0 +1,130 @@
+"""
+Single Flight - Coalescing of Identical Concurrent Requests
+===========================================================
+
+During extension-camp events hundreds of phones submit the same district /
+soil / weather within seconds. Without coordination every one of those
+requests runs the full inference pipeline, even though the response cache
+would have the answer a moment later.
+
+SingleFlight lets the first request for a key (the leader) do the work while
+identical requests arriving before it finishes (followers) wait for it and
+share its result. If the leader fails, every follower raises its own copy of
+the leader's exception. Followers wait up to the request timeout and then
+give up (SingleFlightTimeout) rather than start a second computation, which
+would defeat the coalescing exactly when the pipeline is slowest. Keys are
+the response cache keys, so "identical" means same endpoint, bundle version
+and normalized body.
+
+Coalescing is per worker process (threaded workers); across workers the
+shared response cache backends serve the result once it is stored.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlightTimeout(TimeoutError):
+    """A follower waited longer than the request timeout for its leader"""
+
+
+class SingleFlightError(RuntimeError):
+    """The leader's exception, for exception types that cannot be copied"""
+
+
+def _follower_error(error: BaseException) -> BaseException:
+    """A fresh copy of the leader's exception (one per follower)"""
+    try:
+        return type(error)(*error.args)
+    except Exception:
+        return SingleFlightError(f"Coalesced request failed: {error!r}")
+
+
+class _Call:
+    """One in-flight computation"""
+
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time."""
+
+    def __init__(self, wait_timeout: float = 30.0):
+        """
+        Args:
+            wait_timeout: Seconds a follower waits for the leader (the request
+                timeout) before raising SingleFlightTimeout
+        """
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run `compute` unless an identical call is in flight, in which case
+        wait for that one.
+
+        Returns:
+            (result, shared): shared is True if the result came from another
+            request's computation
+
+        Raises:
+            SingleFlightTimeout: a follower's leader did not finish within
+                wait_timeout
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise SingleFlightTimeout(
+                    f"Identical request still in flight after {self.wait_timeout:g}s"
+                )
+            if call.error is not None:
+                # Raising the leader's object from several threads would mix
+                # up its traceback and context
+                raise _follower_error(call.error) from call.error
+            return call.result, True
+
+        try:
+            call.result = compute()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later requests start a new call (and normally hit the cache)
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'timeouts': self.timeouts
+        }
@@ -0,0 +1,196 @@
+"""
+Request Timing - Per-Stage Latency Spans
+========================================
+
+A slow /compare-crops call can be spent in encoding, the nutrient model,
+calibration, suitability validation or JSON serialization, and the total
+latency alone does not say which. Handlers, validation.py and the utils
+modules mark their stages with spans:
+
+    with span('nutrient_model'):
+        nutrients = model.predict(X)
+
+    @timed('calibrate')
+    def calibrate_comparison_arrays(...):
+
+While a request is being timed (start_timing() / stop_timing() around it),
+each span adds its monotonic duration to the request's RequestTimings,
+which is kept in a ContextVar so concurrent requests on other threads do
+not interfere. Repeated stages (one span per crop) are summed. The result
+is sent as a Server-Timing header (shown per request in the browser's
+network panel) and aggregated per route in TimingStats.
+
+Outside a timed request span() returns a shared no-op object and timed()
+calls straight through, so instrumentation costs one ContextVar lookup
+when timing is disabled.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import threading
+import time
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RequestTimings:
+    """Stage durations of one request"""
+
+    __slots__ = ('start', 'stages')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # stage -> [total seconds, number of spans]
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def elapsed(self) -> float:
+        """Seconds since the request started"""
+        return time.perf_counter() - self.start
+
+    def items(self) -> List[Tuple[str, float, int]]:
+        """(stage, seconds, spans) in the order stages first ran"""
+        return [(stage, seconds, int(count)) for stage, (seconds, count) in self.stages.items()]
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """
+        Server-Timing header value, e.g.
+        'encode;dur=0.12, nutrient_model;dur=1.84, validate;dur=0.40;desc="x3", total;dur=3.10'
+        """
+        parts = []
+        for stage, seconds, count in self.items():
+            part = f'{stage};dur={seconds * 1000:.2f}'
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        parts.append(f'total;dur={(self.elapsed() if total is None else total) * 1000:.2f}')
+        return ', '.join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+class _NoSpan:
+    """Shared span used outside timed requests"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('timings', 'stage', 'start')
+
+    def __init__(self, timings: RequestTimings, stage: str):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def span(stage: str):
+    """Context manager timing one stage of the current request"""
+    timings = _current.get()
+    if timings is None:
+        return _NO_SPAN
+    return _Span(timings, stage)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator: every call of the function is a span of `stage`"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def start_timing() -> Token:
+    """Start timing the current request (pass the token to stop_timing())"""
+    return _current.set(RequestTimings())
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled (None if it is not timed)"""
+    return _current.get()
+
+
+def stop_timing(token: Token) -> None:
+    """Stop timing; spans after this are no-ops again"""
+    _current.reset(token)
+
+
+class TimingStats:
+    """In-process aggregate of request timings per route and stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # route -> stage -> [requests, total seconds, max seconds]
+        self._routes: Dict[str, Dict[str, List[float]]] = {}
+
+    def record(self, route: str, timings: RequestTimings, total: float) -> None:
+        with self._lock:
+            stages = self._routes.setdefault(route, {})
+            for stage, seconds, _ in timings.items():
+                self._add(stages, stage, seconds)
+            self._add(stages, 'total', total)
+
+    @staticmethod
+    def _add(stages: Dict[str, List[float]], stage: str, seconds: float) -> None:
+        entry = stages.get(stage)
+        if entry is None:
+            stages[stage] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{route: {stage: {count, total_ms, mean_ms, max_ms}}}"""
+        with self._lock:
+            return {
+                route: {
+                    stage: {
+                        'count': int(count),
+                        'total_ms': round(total * 1000, 3),
+                        'mean_ms': round(total / count * 1000, 3),
+                        'max_ms': round(maximum * 1000, 3)
+                    }
+                    for stage, (count, total, maximum) in stages.items()
+                }
+                for route, stages in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
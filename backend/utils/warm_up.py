@@ -0,0 +1,122 @@
+"""
+Warm-Up - Synthetic Requests Before a Worker Takes Traffic
+==========================================================
+
+The first request to each endpoint is several times slower than steady state:
+components load lazily, sklearn / NumPy code paths run for the first time and
+the memory-mapped artifacts are not in the page cache yet. On a worker's
+first request the app replays a fixed set of synthetic requests through every
+handler (batch shapes included) on a background thread, using Flask's test
+client, and records how long each one took cold and warm.
+
+/ready answers 503 until the warm-up has finished, so load balancers keep
+traffic away from cold workers; /health always answers 200, reports the
+warm-up state and lists the warm-up requests that did not return 200. Warm-up
+requests are marked with the WARM_UP_ENVIRON key in their WSGI environ (not
+a header, which any HTTP client could send) so the response cache, metrics,
+profiling and request logging can leave them out.
+
+Author: Smart Farmer System
+Date: October 2025
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WARM_UP_ENVIRON = 'smartfarmer.warm_up'
+
+
+class WarmUpRequest(NamedTuple):
+    """One synthetic request"""
+    method: str
+    path: str
+    payload: Optional[Any] = None   # JSON body (POST)
+
+
+class WarmUp:
+    """Runs the warm-up requests once and tracks readiness."""
+
+    def __init__(self, client_factory: Callable[[], Any], requests: List[WarmUpRequest]):
+        """
+        Args:
+            client_factory: Returns a Flask test client (app.test_client)
+            requests: Synthetic requests, each sent twice (cold, then warm)
+        """
+        self._client_factory = client_factory
+        self._requests = list(requests)
+        self._done = threading.Event()
+
+        self.state = 'pending'              # pending / running / done
+        self.seconds: Optional[float] = None
+        self.results: List[Dict[str, Any]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def skip(self) -> None:
+        """Mark the worker ready without warming up"""
+        self.state = 'skipped'
+        self._done.set()
+
+    @property
+    def failed(self) -> List[str]:
+        """Warm-up requests that did not return 200 ('POST /path: 500')"""
+        return [f"{r['method']} {r['path']}: {r['status']}" for r in self.results if r['status'] != 200]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'failed': self.failed,
+            'requests': list(self.results)
+        }
+
+    @staticmethod
+    def is_warm_up(environ: Dict[str, Any]) -> bool:
+        """True for requests sent by the warm-up (WSGI environ of the request)"""
+        return bool(environ.get(WARM_UP_ENVIRON))
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name='warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def run(self) -> None:
+        """Send every request twice and record the status and timings"""
+        self.state = 'running'
+        start = time.perf_counter()
+        try:
+            client = self._client_factory()
+            for request in self._requests:
+                result = {'method': request.method, 'path': request.path}
+                try:
+                    for key in ('first_ms', 'warm_ms'):
+                        t = time.perf_counter()
+                        response = client.open(
+                            request.path, method=request.method, json=request.payload,
+                            environ_overrides={WARM_UP_ENVIRON: True}
+                        )
+                        result[key] = round((time.perf_counter() - t) * 1000, 1)
+                        result['status'] = response.status_code
+                except Exception as e:
+                    result['status'] = 'error'
+                    result['error'] = str(e)
+                self.results.append(result)
+
+                if result['status'] != 200:
+                    logger.warning(f"Warm-up {request.method} {request.path}: {result['status']}")
+        finally:
+            # A failed warm-up must not keep the worker out of rotation forever
+            self.seconds = time.perf_counter() - start
+            self.state = 'done'
+            self._done.set()
+            logger.info(f"Warm-up finished in {self.seconds:.2f}s")
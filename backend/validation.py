@@ -3,6 +3,12 @@ Agricultural Validation Layer for Maharashtra Smart Farmer System
 Ensures scientific accuracy by enforcing district-crop-soil compatibility rules
 """
 
+from functools import lru_cache
+
+import numpy as np
+
+from utils.timing import timed
+
 # ==================================================================
 # REGIONAL MAPPING - BASED ON RESEARCH DATA
 # ==================================================================
@@ -98,6 +104,56 @@ WEATHER_COMPATIBLE_CROPS = {
     'Summer': ['Sorghum', 'Sunflower', 'Groundnut', 'Vegetables']
 }
 
+# ==================================================================
+# COMPILED RULE BITMASKS
+# ==================================================================
+# Every rule table is compiled into an integer bitmask over a crop ID space
+# (bit i = CROPS_BY_ID[i]). IDs follow alphabetical order, so decoding a mask
+# bit by bit yields a sorted crop list.
+
+def _crop_id_space(*tables):
+    """Sorted crops mentioned in the rule tables (bit i = crop i)"""
+    crops = sorted(set().union(*[crops for table in tables for crops in table.values()]))
+    # Masks are also used as int64 NumPy arrays (bit 63 is the sign)
+    if len(crops) >= 63:
+        raise ValueError(
+            f"Crop ID space no longer fits in an int64 bitmask: {len(crops)} crops (maximum 62)"
+        )
+    return crops
+
+
+CROPS_BY_ID = _crop_id_space(REGION_ALLOWED_CROPS, REGION_FORBIDDEN_CROPS,
+                             SOIL_COMPATIBLE_CROPS, WEATHER_COMPATIBLE_CROPS)
+CROP_IDS = {crop: i for i, crop in enumerate(CROPS_BY_ID)}
+
+
+def crop_bit(crop):
+    """Bitmask of a single crop (0 for crops not mentioned in any rule)"""
+    crop_id = CROP_IDS.get(crop)
+    return 0 if crop_id is None else 1 << crop_id
+
+
+def _compile_masks(table):
+    masks = {}
+    for key, crops in table.items():
+        mask = 0
+        for crop in crops:
+            mask |= crop_bit(crop)
+        masks[key] = mask
+    return masks
+
+
+REGION_ALLOWED_MASKS = _compile_masks(REGION_ALLOWED_CROPS)
+REGION_FORBIDDEN_MASKS = _compile_masks(REGION_FORBIDDEN_CROPS)
+SOIL_COMPATIBLE_MASKS = _compile_masks(SOIL_COMPATIBLE_CROPS)
+WEATHER_COMPATIBLE_MASKS = _compile_masks(WEATHER_COMPATIBLE_CROPS)
+
+# Allowed and not forbidden, per region
+REGION_VALID_MASKS = {
+    region: mask & ~REGION_FORBIDDEN_MASKS.get(region, 0)
+    for region, mask in REGION_ALLOWED_MASKS.items()
+}
+
 # ==================================================================
 # CROP-SPECIFIC NUTRIENT RANGES (Research-Based)
 # ==================================================================
@@ -177,13 +233,12 @@ def validate_crop_for_district(crop, district):
     if region == 'Unknown':
         return False, f"District '{district}' not found in database"
     
-    allowed_crops = REGION_ALLOWED_CROPS.get(region, [])
-    forbidden_crops = REGION_FORBIDDEN_CROPS.get(region, [])
+    bit = crop_bit(crop)
     
-    if crop in forbidden_crops:
+    if bit & REGION_FORBIDDEN_MASKS.get(region, 0):
         return False, f"{crop} is not suitable for {region} region (District: {district})"
     
-    if crop not in allowed_crops:
+    if not bit & REGION_ALLOWED_MASKS.get(region, 0):
         return False, f"{crop} is not commonly grown in {region} region"
     
     return True, f"{crop} is suitable for {region} region"
@@ -191,9 +246,7 @@ def validate_crop_for_district(crop, district):
 
 def validate_crop_for_soil(crop, soil_type):
     """Check if crop is compatible with soil type"""
-    compatible_crops = SOIL_COMPATIBLE_CROPS.get(soil_type, [])
-    
-    if crop not in compatible_crops:
+    if not crop_bit(crop) & SOIL_COMPATIBLE_MASKS.get(soil_type, 0):
         return False, f"{crop} is not compatible with {soil_type} soil"
     
     return True, f"{crop} grows well in {soil_type} soil"
@@ -201,14 +254,13 @@ def validate_crop_for_soil(crop, soil_type):
 
 def validate_crop_for_weather(crop, weather):
     """Check if crop is suitable for weather condition"""
-    compatible_crops = WEATHER_COMPATIBLE_CROPS.get(weather, [])
-    
-    if crop not in compatible_crops:
+    if not crop_bit(crop) & WEATHER_COMPATIBLE_MASKS.get(weather, 0):
         return False, f"{crop} is not suitable for {weather} weather conditions"
     
     return True, f"{crop} thrives in {weather} conditions"
 
 
+@timed('validate')
 def validate_prediction(district, soil_type, crop, weather):
     """
     Comprehensive validation of crop prediction
@@ -270,36 +322,70 @@ def validate_prediction(district, soil_type, crop, weather):
     return validation_results
 
 
+def valid_crop_mask(district, soil_type, weather):
+    """Bitmask of the crops valid for given conditions (region & soil & weather, minus forbidden)"""
+    return (
+        REGION_VALID_MASKS.get(get_region(district), 0)
+        & SOIL_COMPATIBLE_MASKS.get(soil_type, 0)
+        & WEATHER_COMPATIBLE_MASKS.get(weather, 0)
+    )
+
+
+def valid_crop_masks(districts, soil_types, weathers):
+    """valid_crop_mask() for a batch of requests, as an int64 array"""
+    return np.array([
+        valid_crop_mask(district, soil_type, weather)
+        for district, soil_type, weather in zip(districts, soil_types, weathers)
+    ], dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def _crops_from_mask(mask):
+    return tuple(crop for i, crop in enumerate(CROPS_BY_ID) if mask >> i & 1)
+
+
+def crop_class_bits(class_labels):
+    """
+    Per-class crop bits for a model's class labels (0 for crops without rules).
+    Pair with valid_class_mask() to validate a whole probability vector at once.
+    """
+    return np.array([crop_bit(crop) for crop in class_labels], dtype=np.int64)
+
+
+@timed('validate')
+def valid_class_mask(class_bits, district, soil_type, weather):
+    """Boolean array over model classes: True where the crop is valid"""
+    return (class_bits & valid_crop_mask(district, soil_type, weather)) != 0
+
+
+@timed('validate')
+def valid_class_masks(class_bits, districts, soil_types, weathers):
+    """valid_class_mask() for a batch of requests -> (n_requests, n_classes) bool array"""
+    masks = valid_crop_masks(districts, soil_types, weathers)
+    return (masks[:, None] & class_bits[None, :]) != 0
+
+
+@timed('validate')
 def get_alternative_crops(district, soil_type, weather):
     """Get valid alternative crops for given conditions"""
-    region = get_region(district)
-    
-    # Get intersection of all compatible crops
-    allowed_by_region = set(REGION_ALLOWED_CROPS.get(region, []))
-    allowed_by_soil = set(SOIL_COMPATIBLE_CROPS.get(soil_type, []))
-    allowed_by_weather = set(WEATHER_COMPATIBLE_CROPS.get(weather, []))
-    
-    # Intersection
-    valid_crops = allowed_by_region & allowed_by_soil & allowed_by_weather
-    
-    # Remove forbidden crops
-    forbidden = set(REGION_FORBIDDEN_CROPS.get(region, []))
-    valid_crops = valid_crops - forbidden
-    
-    return sorted(list(valid_crops))
+    return list(_crops_from_mask(valid_crop_mask(district, soil_type, weather)))
 
 
-def filter_invalid_crops(predictions, district, soil_type, weather):
+def filter_invalid_crops(predictions, district, soil_type, weather, limit=None):
     """
     Filter crop predictions to return only valid ones
     predictions: list of (crop_name, probability) tuples
+    limit: stop after this many valid predictions (validation details are
+           only built for the predictions that are returned)
     Returns: filtered list of valid predictions
     """
-    valid_crops = get_alternative_crops(district, soil_type, weather)
+    valid_mask = valid_crop_mask(district, soil_type, weather)
     
     filtered = []
     for crop, prob in predictions:
-        if crop in valid_crops:
+        if limit is not None and len(filtered) >= limit:
+            break
+        if crop_bit(crop) & valid_mask:
             validation = validate_prediction(district, soil_type, crop, weather)
             filtered.append({
                 'crop': crop,
@@ -310,6 +396,7 @@ def filter_invalid_crops(predictions, district, soil_type, weather):
     return filtered
 
 
+@timed('validate')
 def validate_nutrients(crop, nutrients):
     """Validate if predicted nutrients are within research-based ranges"""
     if crop not in CROP_NUTRIENT_RANGES:
@@ -52,6 +52,12 @@ export const compareCrops = async (data) => {
   return response.data;
 };
 
+// Complete Advisory (crops, nutrients, fertilizers, water quality)
+export const getAdvisory = async (data) => {
+  const response = await api.post('/advisory', data);
+  return response.data;
+};
+
 // District Insights
 export const getDistrictInsights = async (districtName) => {
   const response = await api.get(`/district-insights/${districtName}`);